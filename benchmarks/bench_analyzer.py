@@ -0,0 +1,143 @@
+# benchmarks/bench_analyzer.py
+# Rejoue les diffs de l'historique d'un dépôt dans le pipeline complet de gemini_code_analyzer
+# (pré-filtre, cache, regroupement, appels au modèle), avec le backend hors ligne à la place du
+# service réel, et mesure la latence de bout en bout du hook (percentiles) et le débit.
+# Les fichiers sont lus tels qu'au commit rejoué (git cat-file), quelle que soit la copie de travail.
+# Lancer depuis la racine : python -m benchmarks.bench_analyzer --depot . --commits 50
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import gemini_code_analyzer as analyseur
+
+
+class BackendCompteur(analyseur.OfflineBackend):
+    """Backend hors ligne qui compte les requêtes reçues (une requête groupée compte pour une)."""
+
+    def __init__(self, **parametres) -> None:
+        super().__init__(**parametres)
+        self.requetes = 0
+        self._verrou_compteur = threading.Lock()
+
+    def _compter(self) -> None:
+        with self._verrou_compteur:
+            self.requetes += 1
+
+    def generate(self, prompt):
+        self._compter()
+        return super().generate(prompt)
+
+    def generate_stream(self, prompt):
+        self._compter()
+        return super().generate_stream(prompt)
+
+
+def collecter_diffs(config: dict, nb_commits: int) -> list[dict]:
+    """Un jeu de patchs par commit (premier parent), comme si chaque commit avait été poussé seul."""
+    commits = subprocess.run(["git", "rev-list", "--first-parent", f"--max-count={nb_commits}", "--parents", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.split('\n')
+    jeux = []
+    for ligne in commits:
+        shas = ligne.split()
+        if not shas:
+            continue
+        commit, parent = shas[0], shas[1] if len(shas) > 1 else '0' * 40
+        refs = f"refs/heads/bench {commit} refs/heads/bench {parent}"
+        jeux.append({'commit': commit, 'files': analyseur.get_files_and_patches(config, refs)})
+    return jeux
+
+
+def percentile(valeurs: list[float], p: float) -> float:
+    """Percentile au rang le plus proche."""
+    triees = sorted(valeurs)
+    return triees[max(0, min(len(triees) - 1, round(p / 100 * len(triees) + 0.5) - 1))]
+
+
+def rejouer(jeux: list[dict], config: dict, backend: BackendCompteur, avec_cache: bool) -> list[float]:
+    """Latence (s) de chaque push rejoué ; la sortie console du pipeline est écartée."""
+    _, contexte, regles = analyseur.get_project_rules(config)
+    latences = []
+    with tempfile.TemporaryDirectory() as dossier:
+        cache = analyseur.AnalysisCache(os.path.join(dossier, 'cache.sqlite3')) if avec_cache else None
+        try:
+            for jeu in jeux:
+                with open(os.devnull, 'w') as nul, contextlib.redirect_stdout(nul), contextlib.redirect_stderr(nul):
+                    debut = time.perf_counter()
+                    analyseur.run_analysis(jeu['files'], config, contexte, regles, backend, cache)
+                    latences.append(time.perf_counter() - debut)
+        finally:
+            if cache is not None:
+                cache.close()
+    return latences
+
+
+def main(arguments: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Banc d'essai du hook d'analyse, rejouant l'historique d'un dépôt.")
+    parser.add_argument('--depot', default='.', help="Dépôt git dont l'historique est rejoué")
+    parser.add_argument('--commits', type=int, default=50, help="Nombre de commits rejoués (les plus récents)")
+    parser.add_argument('--enregistrer', help="Enregistre les jeux de patchs collectés (JSON Lines)")
+    parser.add_argument('--rejouer', help="Rejoue des jeux de patchs enregistrés au lieu de lire l'historique")
+    parser.add_argument('--latence-ms', type=float, default=800, help="Latence moyenne d'une requête au modèle")
+    parser.add_argument('--gigue-ms', type=float, default=300, help="Écart maximal autour de la latence moyenne")
+    parser.add_argument('--taux-erreur', type=float, default=0.0, help="Probabilité d'échec d'une requête")
+    parser.add_argument('--concurrence', type=int, default=None, help="Analyses simultanées (défaut : configuration)")
+    parser.add_argument('--rpm', type=int, default=0, help="Quota en requêtes par minute (0 : sans limite)")
+    parser.add_argument('--sans-streaming', action='store_true', help="Réponses en un bloc plutôt qu'en streaming")
+    parser.add_argument('--cache', action='store_true', help="Active le cache d'analyse (fichier temporaire)")
+    parser.add_argument('--graine', type=int, default=0, help="Graine de la latence et des échecs simulés")
+    args = parser.parse_args(arguments)
+
+    chemin_rejeu = os.path.abspath(args.rejouer) if args.rejouer else None
+    chemin_enregistrement = os.path.abspath(args.enregistrer) if args.enregistrer else None
+    # Le pipeline lit la configuration et les fichiers relativement au dépôt analysé
+    os.chdir(args.depot)
+    with open(os.devnull, 'w') as nul, contextlib.redirect_stderr(nul):
+        config = analyseur.load_config()
+    parametres = config['analyzer']
+    parametres.update({'streaming': not args.sans_streaming, 'live_output': False, 'requests_per_minute': args.rpm})
+    if args.concurrence:
+        parametres['max_concurrency'] = args.concurrence
+
+    if chemin_rejeu:
+        with open(chemin_rejeu, encoding='utf-8') as f:
+            jeux = [json.loads(ligne) for ligne in f if ligne.strip()]
+        for jeu in jeux:
+            # Enregistrements sans commit par patch : le fichier est lu au commit rejoué
+            for fichier in jeu['files']:
+                fichier.setdefault('patches', [{'rev': jeu['commit'], 'patch': fichier['patch']}])
+    else:
+        jeux = collecter_diffs(config, args.commits)
+    if chemin_enregistrement:
+        with open(chemin_enregistrement, 'w', encoding='utf-8') as f:
+            for jeu in jeux:
+                f.write(json.dumps(jeu, ensure_ascii=False) + '\n')
+
+    jeux = [jeu for jeu in jeux if jeu['files']]
+    if not jeux:
+        print("Aucun fichier analysable dans les commits rejoués.")
+        return
+
+    backend = BackendCompteur(latency_ms=args.latence_ms, jitter_ms=args.gigue_ms,
+                              error_rate=args.taux_erreur, seed=args.graine)
+    debut = time.perf_counter()
+    latences = rejouer(jeux, config, backend, args.cache)
+    duree = time.perf_counter() - debut
+
+    nb_fichiers = sum(len(jeu['files']) for jeu in jeux)
+    print(f"Pushs rejoués : {len(jeux)} ({nb_fichiers} fichiers, {backend.requetes} requêtes au modèle)")
+    print(f"Backend hors ligne : {args.latence_ms:g} ± {args.gigue_ms:g} ms, taux d'erreur {args.taux_erreur:g}, "
+          f"concurrence {parametres['max_concurrency']}, streaming {'non' if args.sans_streaming else 'oui'}")
+    print("Latence du hook (ms) : " + ", ".join(
+        f"p{p} {percentile(latences, p) * 1000:.0f}" for p in (50, 90, 99)) + f", max {max(latences) * 1000:.0f}")
+    print(f"Débit : {len(jeux) / duree:.2f} pushs/s, {nb_fichiers / duree:.1f} fichiers/s")
+
+
+if __name__ == "__main__":
+    main()
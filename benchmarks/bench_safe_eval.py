@@ -0,0 +1,61 @@
+# benchmarks/bench_safe_eval.py
+# Compare l'évaluation avec et sans optimisation (repliement de constantes + sous-expressions communes)
+# sur des formules générées. Lancer depuis la racine : python -m benchmarks.bench_safe_eval
+
+import random
+import timeit
+
+from calculator.safe_eval import compiler_expression
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VARIABLES = ('a', 'b', 'c', 'd')
+
+
+def generer_formule(rng: random.Random, nb_termes: int = 6) -> str:
+    """Formule typique des générateurs : préfixe constant et sous-termes répétés."""
+    sous_termes = [f"({rng.choice(VARIABLES)} {rng.choice('+-*')} {rng.choice(VARIABLES)})" for _ in range(3)]
+    prefixe = f"{rng.randint(2, 9)} * {rng.randint(2, 9)} / {rng.randint(2, 9)}"
+    termes = [f"{prefixe} * {rng.choice(sous_termes)} * {rng.choice(sous_termes)}" for _ in range(nb_termes)]
+    return " + ".join(termes)
+
+
+def mesurer(formules: list[str], variables: dict, optimiser: bool, repetitions: int) -> float:
+    compilees = [compiler_expression(formule, optimiser=optimiser) for formule in formules]
+
+    def executer() -> None:
+        for compilee in compilees:
+            compilee(variables)
+
+    return min(timeit.repeat(executer, number=repetitions, repeat=3)) / (repetitions * len(formules))
+
+
+def main() -> None:
+    rng = random.Random(42)
+    formules = [generer_formule(rng) for _ in range(200)]
+
+    exemple = compiler_expression(formules[0])
+    print(f"Formule : {formules[0]}")
+    print(f"Cases : {len(compiler_expression(formules[0], optimiser=False).constantes)} sans optimisation, "
+          f"{len(exemple.constantes)} avec")
+    print("\n".join(exemple.plan()))
+    print()
+
+    scalaires = {nom: rng.uniform(1, 10) for nom in VARIABLES}
+    jeux = [("scalaires", scalaires, 200)]
+    if np is not None:
+        colonnes = {nom: np.random.default_rng(0).uniform(1, 10, 100_000) for nom in VARIABLES}
+        jeux.append(("colonnes NumPy (100 000 lignes)", colonnes, 1))
+
+    for nom, variables, repetitions in jeux:
+        brut = mesurer(formules, variables, False, repetitions)
+        optimise = mesurer(formules, variables, True, repetitions)
+        print(f"{nom:>32} : {brut * 1e6:10.1f} µs -> {optimise * 1e6:10.1f} µs par formule "
+              f"(x{brut / optimise:.2f})")
+
+
+if __name__ == "__main__":
+    main()
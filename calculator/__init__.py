@@ -1,3 +1,32 @@
 # calculator/__init__.py
+# Exports résolus au premier accès : 'import calculator.safe_eval' ne charge ni NumPy ni multiprocessing
 
-from .safe_eval import evaluer_expression
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+_EXPORTS: dict[str, str] = {
+    'evaluer_expression': 'safe_eval',
+    'compiler_expression': 'safe_eval',
+    'statistiques_cache': 'safe_eval',
+    'vider_cache': 'safe_eval',
+    'Limites': 'safe_eval',
+    'LimiteDepassee': 'safe_eval',
+    'evaluer_vectorise': 'vectorise',
+    'evaluer_lot': 'lot',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nom: str) -> Any:
+    try:
+        module = _EXPORTS[nom]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}") from None
+    valeur = getattr(import_module(f'.{module}', __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
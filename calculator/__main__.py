@@ -0,0 +1,8 @@
+# calculator/__main__.py
+# Point d'entrée en ligne de commande : python -m calculator expressions.txt
+
+import sys
+
+from .lot import main
+
+sys.exit(main())
@@ -0,0 +1,105 @@
+# calculator/lot.py
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
+
+from .safe_eval import evaluer_expression
+
+TAILLE_BLOC: int = 256
+FORMATS: tuple[str, ...] = ('texte', 'jsonl')
+
+
+def _evaluer_ligne(numero: int, ligne: str, format: str) -> dict[str, Any]:
+    """Évalue une ligne et renvoie un enregistrement ; une erreur ne sort jamais d'ici."""
+    enregistrement: dict[str, Any] = {'ligne': numero}
+    try:
+        variables = None
+        if format == 'jsonl':
+            donnees = json.loads(ligne)
+            if isinstance(donnees, dict):
+                expression = donnees['expression']
+                variables = donnees.get('variables')
+            else:
+                expression = donnees
+        else:
+            expression = ligne
+        enregistrement['expression'] = expression
+        enregistrement['resultat'] = evaluer_expression(expression, variables)
+    except Exception as e:
+        enregistrement.setdefault('expression', ligne)
+        enregistrement['erreur'] = f"{type(e).__name__}: {e}"
+    return enregistrement
+
+
+def _evaluer_bloc(bloc: list[tuple[int, str]], format: str) -> list[dict[str, Any]]:
+    return [_evaluer_ligne(numero, ligne, format) for numero, ligne in bloc]
+
+
+def _decouper(lignes: Iterable[str], taille_bloc: int) -> Iterator[list[tuple[int, str]]]:
+    """Regroupe les lignes non vides en blocs numérotés (numéros de ligne d'origine)."""
+    numerotees = ((numero, ligne.strip()) for numero, ligne in enumerate(lignes, 1))
+    non_vides = ((numero, ligne) for numero, ligne in numerotees if ligne)
+    while True:
+        bloc = list(islice(non_vides, taille_bloc))
+        if not bloc:
+            return
+        yield bloc
+
+
+def evaluer_lot(lignes: Iterable[str], processus: Optional[int] = None,
+                taille_bloc: int = TAILLE_BLOC, format: str = 'texte') -> Iterator[dict[str, Any]]:
+    """
+    Évalue un flux d'expressions et renvoie les enregistrements dans l'ordre d'entrée.
+    Les blocs sont répartis sur un pool de processus ; le nombre de blocs en vol est borné
+    pour que la mémoire reste constante, quelle que soit la taille de l'entrée.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Format non reconnu : {format}")
+
+    blocs = _decouper(lignes, taille_bloc)
+    nb_processus = processus or os.cpu_count() or 1
+
+    if nb_processus == 1:
+        for bloc in blocs:
+            yield from _evaluer_bloc(bloc, format)
+        return
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+        en_cours = deque()
+        for bloc in blocs:
+            en_cours.append(pool.submit(_evaluer_bloc, bloc, format))
+            if len(en_cours) >= 2 * nb_processus:
+                yield from en_cours.popleft().result()
+        while en_cours:
+            yield from en_cours.popleft().result()
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Évaluation d'expressions en lot (une par ligne ou JSONL).")
+    parser.add_argument('entree', help="Fichier d'expressions ('-' pour l'entrée standard)")
+    parser.add_argument('-o', '--sortie', help="Fichier JSONL de résultats (sortie standard par défaut)")
+    parser.add_argument('-p', '--processus', type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument('-b', '--taille-bloc', type=int, default=TAILLE_BLOC, help="Nombre de lignes par bloc envoyé à un processus")
+    parser.add_argument('-f', '--format', choices=FORMATS, default=None, help="Format d'entrée (déduit de l'extension par défaut)")
+    args = parser.parse_args(arguments)
+
+    format = args.format or ('jsonl' if args.entree.endswith('.jsonl') else 'texte')
+    entree = sys.stdin if args.entree == '-' else open(args.entree, 'r', encoding='utf-8')
+    sortie = open(args.sortie, 'w', encoding='utf-8') if args.sortie else sys.stdout
+
+    try:
+        for enregistrement in evaluer_lot(entree, args.processus, args.taille_bloc, format):
+            sortie.write(json.dumps(enregistrement, ensure_ascii=False, default=str) + '\n')
+    finally:
+        if entree is not sys.stdin:
+            entree.close()
+        if sortie is not sys.stdout:
+            sortie.close()
+
+    return 0
@@ -1,8 +1,13 @@
 # calculator/safe_eval.py
 
 import ast
+import math
+import numbers
 import operator
-from typing import Union
+from dataclasses import dataclass
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Callable, Mapping, Optional, Union
 
 # Opérateurs autorisés
 OPERATEURS: dict[type, callable] = {
@@ -15,23 +20,301 @@ OPERATEURS: dict[type, callable] = {
     ast.Mod: operator.mod
 }
 
-def evaluer_expression(expression: str) -> Union[int, float]:
-    def _eval(node: ast.AST) -> Union[int, float]:
-        if isinstance(node, ast.Num):  # Python <3.8
-            return node.n
-        elif isinstance(node, ast.Constant):  # Python >=3.8
-            return node.value
-        elif isinstance(node, ast.BinOp):
-            gauche = _eval(node.left)
-            droite = _eval(node.right)
-            operateur = OPERATEURS[type(node.op)]
-            return operateur(gauche, droite)
-        elif isinstance(node, ast.UnaryOp):
-            operateur = OPERATEURS[type(node.op)]
-            operand = _eval(node.operand)
-            return operateur(operand)
+# Nombre maximal d'expressions compilées conservées en mémoire
+TAILLE_CACHE: int = 1024
+
+Nombre = Union[int, float]
+Variables = Mapping[str, Any]
+
+# Genres (dtype.kind) de tableaux acceptés comme variables : booléens, entiers, flottants, complexes
+GENRES_NUMERIQUES: str = 'biufc'
+
+# Symboles utilisés pour afficher le plan d'une expression compilée
+SYMBOLES: dict[type, str] = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.Pow: '**',
+    ast.USub: '-',
+    ast.Mod: '%'
+}
+
+
+class LimiteDepassee(ValueError):
+    """L'expression dépasse l'un des budgets fixés par Limites."""
+
+
+@dataclass(frozen=True)
+class Limites:
+    """Budgets appliqués à la compilation puis à l'évaluation d'une expression."""
+    max_longueur: int = 2_000      # caractères, vérifié avant ast.parse
+    max_noeuds: int = 2_000        # nœuds de l'arbre syntaxique
+    max_profondeur: int = 1_000    # imbrication de l'arbre
+    # Taille d'un entier intermédiaire (puissances, produits) : environ 315 000 chiffres, calculés
+    # en quelques dizaines de ms ; 2**5000 et les grands entiers usuels restent acceptés
+    max_bits: int = 1 << 20
+    delai: Optional[float] = None  # secondes, par évaluation
+
+
+LIMITES_DEFAUT = Limites()
+
+
+def _est_numerique(valeur: Any) -> bool:
+    """Nombre ou tableau de nombres (NumPy) : 'x * y' sur une chaîne ou une liste grossirait sans borne."""
+    if isinstance(valeur, numbers.Number):
+        return True
+    genre = getattr(getattr(valeur, 'dtype', None), 'kind', None)
+    return isinstance(genre, str) and genre in GENRES_NUMERIQUES
+
+
+def _puissance_bornee(max_bits: int) -> Callable[[Any, Any], Any]:
+    def puissance(base: Any, exposant: Any) -> Any:
+        # Estimation de la taille du résultat avant de le calculer : 9**9**9 est rejeté sans être évalué
+        if isinstance(base, int) and isinstance(exposant, int) and exposant > 0 and abs(base) > 1:
+            if exposant * math.log2(abs(base)) > max_bits:
+                raise LimiteDepassee(f"Puissance trop grande : résultat estimé au-delà de {max_bits} bits")
+        return operator.pow(base, exposant)
+    return puissance
+
+
+def _produit_borne(max_bits: int) -> Callable[[Any, Any], Any]:
+    def produit(gauche: Any, droite: Any) -> Any:
+        if isinstance(gauche, int) and isinstance(droite, int):
+            if gauche.bit_length() + droite.bit_length() > max_bits:
+                raise LimiteDepassee(f"Produit trop grand : résultat au-delà de {max_bits} bits")
+        return operator.mul(gauche, droite)
+    return produit
+
+
+def _operateur(op: ast.AST, limites: Limites) -> Callable[..., Any]:
+    if isinstance(op, ast.Pow):
+        return _puissance_bornee(limites.max_bits)
+    if isinstance(op, ast.Mult):
+        return _produit_borne(limites.max_bits)
+    try:
+        return OPERATEURS[type(op)]
+    except KeyError:
+        raise TypeError(f"Opérateur non pris en charge : {type(op)}") from None
+
+
+class ExpressionCompilee:
+    """
+    Plan d'évaluation issu d'un arbre validé et optimisé : chaque valeur occupe une case,
+    les constantes sont pré-remplies et les opérations s'exécutent dans l'ordre, sans récursion.
+    Une sous-expression répétée n'occupe qu'une case et n'est donc calculée qu'une fois.
+    """
+
+    __slots__ = ('constantes', 'variables', 'operations', 'resultat', 'limites', '_symboles')
+
+    def __init__(self, constantes: list[Any], variables: list[tuple[int, str]],
+                 operations: list[tuple[int, Callable[..., Any], int, int]], resultat: int,
+                 limites: Limites, symboles: list[str]) -> None:
+        self.constantes = constantes
+        self.variables = variables
+        self.operations = operations
+        self.resultat = resultat
+        self.limites = limites
+        self._symboles = symboles
+
+    def __call__(self, variables: Variables, echeance: Optional[float] = None) -> Any:
+        """'echeance' : instant monotonic() à ne pas dépasser, en plus du délai de Limites (lots de requêtes)."""
+        if echeance is not None and monotonic() > echeance:
+            raise LimiteDepassee("Délai d'évaluation dépassé (échéance de la requête)")
+        if not self.operations and not self.variables:
+            return self.constantes[self.resultat]
+
+        if self.limites.delai is not None:
+            propre = monotonic() + self.limites.delai
+            echeance = propre if echeance is None else min(echeance, propre)
+        valeurs = self.constantes.copy()
+
+        for case, nom in self.variables:
+            try:
+                valeur = variables[nom]
+            except KeyError:
+                raise NameError(f"Variable non définie : {nom}") from None
+            if not _est_numerique(valeur):
+                raise TypeError(f"Variable non numérique : {nom} ({type(valeur).__name__})")
+            valeurs[case] = valeur
+
+        for case, operateur, gauche, droite in self.operations:
+            if droite < 0:
+                valeurs[case] = operateur(valeurs[gauche])
+            else:
+                valeurs[case] = operateur(valeurs[gauche], valeurs[droite])
+
+            if echeance is not None and monotonic() > echeance:
+                if self.limites.delai is None:
+                    raise LimiteDepassee("Délai d'évaluation dépassé (échéance de la requête)")
+                raise LimiteDepassee(f"Délai d'évaluation dépassé ({self.limites.delai} s)")
+
+        return valeurs[self.resultat]
+
+    def plan(self) -> list[str]:
+        """Plan lisible, une ligne par case : '%2 = %0 + %1'."""
+        lignes = [f"%{case} = {nom}" for case, nom in self.variables]
+        lignes += [f"%{case} = {valeur!r}" for case, valeur in enumerate(self.constantes)
+                   if valeur is not None]
+        for (case, _, gauche, droite), symbole in zip(self.operations, self._symboles):
+            if droite < 0:
+                lignes.append(f"%{case} = {symbole}%{gauche}")
+            else:
+                lignes.append(f"%{case} = %{gauche} {symbole} %{droite}")
+        lignes.sort(key=lambda ligne: int(ligne[1:ligne.index(' ')]))
+        lignes.append(f"résultat = %{self.resultat}")
+        return lignes
+
+
+def _cle_constante(valeur: Any) -> tuple:
+    # repr distingue 1, 1.0, True et -0.0, que l'égalité confondrait
+    return ('constante', type(valeur), repr(valeur))
+
+
+def _compiler_arbre(racine: ast.AST, limites: Limites, optimiser: bool = True) -> ExpressionCompilee:
+    """
+    Valide l'arbre par un parcours itératif et le numérote en valeurs.
+    Avec optimiser, les sous-arbres constants sont calculés à la compilation et les
+    sous-expressions identiques partagent le même numéro. L'ordre des opérations
+    n'est jamais modifié, donc le résultat flottant reste celui de l'expression écrite.
+    """
+    # Définition de chaque valeur : ('constante', v), ('variable', nom) ou ('operation', f, g, d, symbole)
+    definitions: list[tuple] = []
+    numeros: dict[tuple, int] = {}
+
+    def numeroter(cle: tuple, definition: tuple) -> int:
+        if optimiser and cle in numeros:
+            return numeros[cle]
+        numeros[cle] = len(definitions)
+        definitions.append(definition)
+        return len(definitions) - 1
+
+    def constante(numero: int) -> Optional[tuple]:
+        definition = definitions[numero]
+        return definition if definition[0] == 'constante' else None
+
+    nb_noeuds = 0
+    resultats: list[int] = []
+    # (nœud, profondeur, enfants déjà numérotés)
+    a_visiter: list[tuple[ast.AST, int, bool]] = [(racine, 1, False)]
+
+    while a_visiter:
+        node, profondeur, enfants_numerotes = a_visiter.pop()
+
+        if enfants_numerotes:
+            operateur = _operateur(node.op, limites)
+            symbole = SYMBOLES[type(node.op)]
+            if isinstance(node, ast.BinOp):
+                droite = resultats.pop()
+                gauche = resultats.pop()
+            else:
+                gauche, droite = resultats.pop(), -1
+            operandes = [constante(gauche)] + ([constante(droite)] if droite >= 0 else [])
+
+            if optimiser and all(operandes):
+                try:
+                    valeur = operateur(*(definition[1] for definition in operandes))
+                except (ArithmeticError, ValueError):
+                    pass  # l'erreur sera levée à l'évaluation, comme sans optimisation
+                else:
+                    resultats.append(numeroter(_cle_constante(valeur), ('constante', valeur)))
+                    continue
+
+            cle = ('operation', type(node.op), gauche, droite)
+            resultats.append(numeroter(cle, ('operation', operateur, gauche, droite, symbole)))
+            continue
+
+        nb_noeuds += 1
+        if nb_noeuds > limites.max_noeuds:
+            raise LimiteDepassee(f"Expression trop grande : plus de {limites.max_noeuds} nœuds")
+        if profondeur > limites.max_profondeur:
+            raise LimiteDepassee(f"Expression trop imbriquée : profondeur supérieure à {limites.max_profondeur}")
+
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, complex)):
+                raise TypeError(f"Type de constante non pris en charge : {type(node.value)}")
+            resultats.append(numeroter(_cle_constante(node.value), ('constante', node.value)))
+        elif isinstance(node, ast.Name):
+            resultats.append(numeroter(('variable', node.id), ('variable', node.id)))
+        elif isinstance(node, (ast.BinOp, ast.UnaryOp)):
+            if type(node.op) not in OPERATEURS:
+                raise TypeError(f"Opérateur non pris en charge : {type(node.op)}")
+            a_visiter.append((node, profondeur, True))
+            if isinstance(node, ast.BinOp):
+                a_visiter.append((node.right, profondeur + 1, False))
+                a_visiter.append((node.left, profondeur + 1, False))
+            else:
+                a_visiter.append((node.operand, profondeur + 1, False))
         else:
             raise TypeError(f"Type de nœud non pris en charge : {type(node)}")
 
-    arbre: ast.Expression = ast.parse(expression, mode='eval')
-    return _eval(arbre.body)
\ No newline at end of file
+    return _assembler(definitions, resultats.pop(), limites)
+
+
+def _assembler(definitions: list[tuple], racine: int, limites: Limites) -> ExpressionCompilee:
+    """Ne garde que les valeurs utiles au résultat et les renumérote de façon compacte."""
+    utiles = [False] * len(definitions)
+    utiles[racine] = True
+    # Les numéros des opérandes sont toujours inférieurs à celui de l'opération
+    for numero in range(racine, -1, -1):
+        definition = definitions[numero]
+        if utiles[numero] and definition[0] == 'operation':
+            utiles[definition[2]] = True
+            if definition[3] >= 0:
+                utiles[definition[3]] = True
+
+    cases: dict[int, int] = {}
+    constantes: list[Any] = []
+    variables: list[tuple[int, str]] = []
+    operations: list[tuple[int, Callable[..., Any], int, int]] = []
+    symboles: list[str] = []
+
+    for numero, definition in enumerate(definitions):
+        if not utiles[numero]:
+            continue
+        case = cases[numero] = len(constantes)
+        if definition[0] == 'constante':
+            constantes.append(definition[1])
+            continue
+        constantes.append(None)
+        if definition[0] == 'variable':
+            variables.append((case, definition[1]))
+        else:
+            _, operateur, gauche, droite, symbole = definition
+            operations.append((case, operateur, cases[gauche], cases[droite] if droite >= 0 else -1))
+            symboles.append(symbole)
+
+    return ExpressionCompilee(constantes, variables, operations, cases[racine], limites, symboles)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def compiler_expression(expression: str, limites: Limites = LIMITES_DEFAUT,
+                        optimiser: bool = True) -> ExpressionCompilee:
+    """Analyse et valide l'expression une seule fois, puis renvoie un appelable réutilisable."""
+    if len(expression) > limites.max_longueur:
+        raise LimiteDepassee(f"Expression trop longue : plus de {limites.max_longueur} caractères")
+    try:
+        arbre: ast.Expression = ast.parse(expression, mode='eval')
+    except (RecursionError, MemoryError):
+        raise LimiteDepassee("Expression trop imbriquée pour être analysée") from None
+    return _compiler_arbre(arbre.body, limites, optimiser)
+
+
+def statistiques_cache() -> dict[str, int]:
+    """Compteurs du cache de compilation, utiles pour dimensionner TAILLE_CACHE."""
+    infos = compiler_expression.cache_info()
+    return {
+        'succes': infos.hits,
+        'echecs': infos.misses,
+        'taille': infos.currsize,
+        'taille_max': infos.maxsize,
+    }
+
+
+def vider_cache() -> None:
+    compiler_expression.cache_clear()
+
+
+def evaluer_expression(expression: str, variables: Optional[Variables] = None,
+                       limites: Limites = LIMITES_DEFAUT, echeance: Optional[float] = None) -> Nombre:
+    return compiler_expression(expression, limites)(variables or {}, echeance)
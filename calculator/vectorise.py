@@ -0,0 +1,35 @@
+# calculator/vectorise.py
+
+from typing import Any, Mapping
+
+from .safe_eval import LIMITES_DEFAUT, Limites, compiler_expression
+
+try:
+    import numpy as np
+except ImportError:  # NumPy reste optionnel pour le reste du paquet
+    np = None
+
+
+def _en_tableau(valeur: Any) -> Any:
+    """Expose une variable sous forme de tableau NumPy, sans copie quand c'est possible."""
+    if isinstance(valeur, (int, float, complex, np.ndarray, np.generic)):
+        return valeur
+    try:
+        # array.array, memoryview, bytearray... : vue directe sur le tampon
+        return np.asarray(memoryview(valeur))
+    except TypeError:
+        return np.asarray(valeur)
+
+
+def evaluer_vectorise(expression: str, variables: Mapping[str, Any],
+                      limites: Limites = LIMITES_DEFAUT) -> Any:
+    """
+    Évalue l'expression une seule fois sur des colonnes entières.
+    Chaque opérateur autorisé (OPERATEURS) s'applique directement aux tableaux NumPy,
+    donc le coût par ligne est celui de NumPy et non celui d'une boucle Python.
+    """
+    if np is None:
+        raise ImportError("Le mode vectorisé nécessite NumPy (pip install numpy)")
+
+    colonnes = {nom: _en_tableau(valeur) for nom, valeur in variables.items()}
+    return compiler_expression(expression, limites)(colonnes)
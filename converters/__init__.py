@@ -1,4 +1,47 @@
 # converters/__init__.py
+# Exports résolus au premier accès : importer un convertisseur ne charge pas NumPy ni les autres modules
 
-from .units import convertir_longueur, convertir_masse, convertir_temperature
-from .currency import convertir_devise
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+_EXPORTS: dict[str, str] = {
+    'convertir_longueur': 'units',
+    'convertir_masse': 'units',
+    'convertir_temperature': 'units',
+    'get_converter': 'units',
+    'REGISTRE': 'units',
+    'convertir_tableau': 'vectorise',
+    'convertir_longueur_tableau': 'vectorise',
+    'convertir_masse_tableau': 'vectorise',
+    'convertir_temperature_tableau': 'vectorise',
+    'convertir_devise': 'currency',
+    'configurer_fournisseur': 'currency',
+    'FournisseurTaux': 'taux',
+    'FournisseurStatique': 'taux',
+    'FournisseurFichier': 'taux',
+    'FournisseurHTTP': 'taux',
+    'MagasinTaux': 'taux',
+    'TableHistorique': 'taux_historiques',
+    'ecrire_table': 'taux_historiques',
+    'GrapheDevises': 'graphe_devises',
+    'Montants': 'monnaie',
+    'EXPOSANTS': 'monnaie',
+    'convertir_compose': 'dimensions',
+    'compiler_conversion': 'dimensions',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nom: str) -> Any:
+    try:
+        module = _EXPORTS[nom]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}") from None
+    valeur = getattr(import_module(f'.{module}', __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,8 @@
+# converters/__main__.py
+# Point d'entrée en ligne de commande : python -m converters donnees.csv -c distance:mi->km
+
+import sys
+
+from .flux_csv import main
+
+sys.exit(main())
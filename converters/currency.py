@@ -1,16 +1,25 @@
+from typing import Optional
+
+from .taux import FournisseurStatique, FournisseurTaux, MagasinTaux
+
+# Sans configuration, les taux restent ceux de TAUX_PAR_DEFAUT et ne sont jamais rafraîchis
+_magasin = MagasinTaux(FournisseurStatique(), ttl=None)
+
+
+def configurer_fournisseur(fournisseur: FournisseurTaux, ttl: Optional[float] = 3600.0,
+                           expiration: Optional[float] = None) -> MagasinTaux:
+    """Branche une nouvelle source de taux ; le premier chargement se fait en arrière-plan."""
+    global _magasin
+    magasin = MagasinTaux(fournisseur, ttl=ttl, expiration=expiration, initial=_magasin.taux())
+    magasin.rafraichir_en_arriere_plan()
+    _magasin = magasin
+    return magasin
+
+
+def magasin_taux() -> MagasinTaux:
+    return _magasin
+
+
 def convertir_devise(montant, de, vers):
-    taux = {
-        "EUR": 1.00,
-        "USD": 1.08,   # 1 EUR = 1.08 USD
-        "XAF": 655.96, # 1 EUR = 655.96 FCFA
-        "GBP": 0.86,   # 1 EUR = 0.86 GBP
-        "CAD": 1.47,   # 1 EUR = 1.47 CAD
-        "JPY": 162.50  # 1 EUR = 162.50 JPY
-    }
-
-    if de not in taux or vers not in taux:
-        raise ValueError("Devise non supportée")
-
-    # Convertir en EUR puis vers la devise cible
-    montant_eur = montant / taux[de]
-    return montant_eur * taux[vers]
+    # Taux croisé précalculé à la publication des taux : une seule multiplication, sans passer par l'EUR
+    return _magasin.instantane().graphe.convertir(montant, de, vers)
@@ -0,0 +1,111 @@
+# converters/dimensions.py
+
+import re
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+from .units import LONGUEUR, MASSE, TEMPERATURE
+
+# Vecteur de dimension : exposants de (longueur, masse, temps, température)
+Vecteur = Tuple[int, int, int, int]
+SANS_DIMENSION: Vecteur = (0, 0, 0, 0)
+NOMS_DIMENSIONS: Tuple[str, ...] = ('m', 'kg', 's', 'K')
+
+# Unité atomique : (facteur vers les unités de base SI, vecteur de dimension)
+UniteAtomique = Tuple[Fraction, Vecteur]
+
+_L, _M, _T, _K = (1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1)
+
+
+def _combiner(a: Vecteur, b: Vecteur, puissance: int = 1) -> Vecteur:
+    return tuple(x + puissance * y for x, y in zip(a, b))
+
+
+# Les longueurs et les masses reprennent les tables de converters.units (bases m et kg)
+UNITES: Dict[str, UniteAtomique] = {}
+UNITES.update({unite: (echelle, _L) for unite, (echelle, _) in LONGUEUR.vers_base.items()})
+UNITES.update({unite: (echelle, _M) for unite, (echelle, _) in MASSE.vers_base.items()})
+# Dans une unité composée, une température est un écart : 1 C = 1 K, 1 F = 5/9 K
+UNITES.update({unite: (echelle, _K) for unite, (echelle, _) in TEMPERATURE.vers_base.items()})
+UNITES.update({
+    's': (Fraction(1), _T),
+    'ms': (Fraction(1, 1000), _T),
+    'min': (Fraction(60), _T),
+    'h': (Fraction(3600), _T),
+    'd': (Fraction(86400), _T),
+    'L': (Fraction(1, 1000), (3, 0, 0, 0)),
+    'Hz': (Fraction(1), (0, 0, -1, 0)),
+    'N': (Fraction(1), (1, 1, -2, 0)),
+    'J': (Fraction(1), (2, 1, -2, 0)),
+    'W': (Fraction(1), (2, 1, -3, 0)),
+    'Pa': (Fraction(1), (-1, 1, -2, 0)),
+})
+
+_FACTEUR = re.compile(r'\s*([*/])?\s*([A-Za-z]+)\s*(?:\^\s*(-?\d+))?\s*')
+
+# Bornes des expressions d'unités : facteur ** puissance est calculé en fractions exactes,
+# qu'un exposant ou un nombre de facteurs démesurés feraient grossir sans limite
+PUISSANCE_MAX: int = 12
+LONGUEUR_MAX: int = 200
+
+
+def analyser_unite(expression: str) -> UniteAtomique:
+    """
+    'kg*m/s^2' -> (facteur vers SI, vecteur de dimension).
+    Les facteurs se lisent de gauche à droite : tout facteur précédé de '/' est au dénominateur.
+    """
+    if len(expression) > LONGUEUR_MAX:
+        raise ValueError(f"Expression d'unité trop longue : plus de {LONGUEUR_MAX} caractères")
+    facteur, vecteur = Fraction(1), SANS_DIMENSION
+    position = 0
+    while position < len(expression):
+        correspondance = _FACTEUR.match(expression, position)
+        if not correspondance or (position == 0) == bool(correspondance.group(1)):
+            raise ValueError(f"Expression d'unité invalide : {expression}")
+        operateur, nom, puissance = correspondance.groups()
+        try:
+            facteur_unite, vecteur_unite = UNITES[nom]
+        except KeyError:
+            raise ValueError(f"Unité non reconnue : {nom}") from None
+        puissance = int(puissance or 1) * (-1 if operateur == '/' else 1)
+        if abs(puissance) > PUISSANCE_MAX:
+            raise ValueError(f"Exposant d'unité trop grand : {nom}^{puissance} (limite : ±{PUISSANCE_MAX})")
+        facteur *= facteur_unite ** puissance
+        vecteur = _combiner(vecteur, vecteur_unite, puissance)
+        position = correspondance.end()
+
+    if position == 0:
+        raise ValueError("Expression d'unité vide")
+    return facteur, vecteur
+
+
+def _decrire(vecteur: Vecteur) -> str:
+    return '*'.join(f"{nom}^{p}" if p != 1 else nom for nom, p in zip(NOMS_DIMENSIONS, vecteur) if p) or '1'
+
+
+@lru_cache(maxsize=1024)
+def compiler_conversion(de: str, vers: str) -> Tuple[float, float]:
+    """
+    Compile la paire (de, vers) en (échelle, décalage) : vers = valeur * échelle + décalage.
+    Mémoïsé : une conversion répétée ne coûte qu'une recherche dans le cache.
+    """
+    # Une température seule garde sa transformation affine (C -> F) ; composée, c'est un écart
+    if de in TEMPERATURE.index and vers in TEMPERATURE.index:
+        return TEMPERATURE.transformation(de, vers)
+
+    facteur_de, vecteur_de = analyser_unite(de)
+    facteur_vers, vecteur_vers = analyser_unite(vers)
+    if vecteur_de != vecteur_vers:
+        raise ValueError(f"Unités incompatibles : {de} ({_decrire(vecteur_de)}) et {vers} ({_decrire(vecteur_vers)})")
+    return float(facteur_de / facteur_vers), 0.0
+
+
+def get_converter_compose(de: str, vers: str) -> Callable[[float], float]:
+    echelle, decalage = compiler_conversion(de, vers)
+    return lambda valeur: valeur * echelle + decalage
+
+
+def convertir_compose(valeur: float, de: str, vers: str) -> float:
+    echelle, decalage = compiler_conversion(de, vers)
+    return valeur * echelle + decalage
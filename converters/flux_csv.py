@@ -0,0 +1,192 @@
+# converters/flux_csv.py
+
+import argparse
+import csv
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from .currency import convertir_devise
+from .dimensions import get_converter_compose
+from .units import REGISTRE, get_converter
+
+TAILLE_BLOC: int = 10_000
+CODE_DEVISE = re.compile(r'[A-Z]{3}')
+
+Conversion = tuple[str, Callable[[float], float]]
+
+
+def analyser_specification(specification: str) -> Conversion:
+    """
+    'distance:mi->km', 'vitesse:km/h->m/s' ou 'montant:USD->EUR' -> (colonne, convertisseur).
+    Les unités (registre, puis unités composées comme 'h' ou 'kg*m/s^2') passent avant les devises :
+    une paire n'est lue comme devises que si les deux côtés ressemblent à des codes ISO (trois lettres).
+    """
+    try:
+        colonne, paire = specification.rsplit(':', 1)
+        de, vers = (partie.strip() for partie in paire.split('->'))
+    except ValueError:
+        raise ValueError(f"Spécification invalide : {specification} (attendu colonne:de->vers)") from None
+
+    if de in REGISTRE and vers in REGISTRE:
+        return colonne, get_converter(de, vers)
+    try:
+        return colonne, get_converter_compose(de, vers)
+    except ValueError:
+        if not (CODE_DEVISE.fullmatch(de.upper()) and CODE_DEVISE.fullmatch(vers.upper())):
+            raise
+
+    de, vers = de.upper(), vers.upper()
+    convertir_devise(1.0, de, vers)  # valide la paire avant de lire le fichier
+    return colonne, lambda montant: convertir_devise(montant, de, vers)
+
+
+def _indexer(en_tete: list[str], conversions: list[Conversion]) -> list[tuple[int, Callable[[float], float]]]:
+    absentes = [colonne for colonne, _ in conversions if colonne not in en_tete]
+    if absentes:
+        raise ValueError(f"Colonnes absentes de l'en-tête : {', '.join(absentes)}")
+    return [(en_tete.index(colonne), convertisseur) for colonne, convertisseur in conversions]
+
+
+def _convertir_lignes(lignes: Iterable[list[str]], colonnes: list[tuple[int, Callable[[float], float]]],
+                      sortie: TextIO, taille_bloc: int, delimiteur: str) -> tuple[int, int]:
+    """Convertit et écrit les lignes bloc par bloc ; renvoie (lignes écrites, cellules invalides)."""
+    ecrivain = csv.writer(sortie, delimiter=delimiteur, lineterminator='\n')
+    lignes = iter(lignes)
+    nb_lignes = nb_invalides = 0
+
+    while True:
+        bloc = list(islice(lignes, taille_bloc))
+        if not bloc:
+            return nb_lignes, nb_invalides
+        for ligne in bloc:
+            for index, convertisseur in colonnes:
+                if index < len(ligne) and ligne[index].strip():
+                    try:
+                        ligne[index] = repr(convertisseur(float(ligne[index])))
+                    except ValueError:
+                        nb_invalides += 1  # cellule non numérique : laissée telle quelle
+        ecrivain.writerows(bloc)
+        nb_lignes += len(bloc)
+
+
+def convertir_flux(entree: TextIO, sortie: TextIO, specifications: list[str],
+                   taille_bloc: int = TAILLE_BLOC, delimiteur: str = ',') -> tuple[int, int]:
+    """Version mono-processus : lecture et écriture en continu, mémoire bornée par taille_bloc."""
+    conversions = [analyser_specification(spec) for spec in specifications]
+    lecteur = csv.reader(entree, delimiter=delimiteur)
+    en_tete = next(lecteur, None)
+    if en_tete is None:
+        return 0, 0
+    colonnes = _indexer(en_tete, conversions)
+    csv.writer(sortie, delimiter=delimiteur, lineterminator='\n').writerow(en_tete)
+    return _convertir_lignes(lecteur, colonnes, sortie, taille_bloc, delimiteur)
+
+
+def _plages(chemin: str, debut: int, nb_parts: int) -> list[tuple[int, int]]:
+    """Découpe [debut, fin du fichier] en plages d'octets alignées sur des fins de ligne."""
+    taille = os.path.getsize(chemin)
+    bornes = [debut]
+    with open(chemin, 'rb') as f:
+        for k in range(1, nb_parts):
+            f.seek(max(debut + (taille - debut) * k // nb_parts, bornes[-1]))
+            f.readline()
+            bornes.append(min(f.tell(), taille))
+    bornes.append(taille)
+    return [(a, b) for a, b in zip(bornes, bornes[1:]) if b > a]
+
+
+def _lire_plage(chemin: str, debut: int, fin: int) -> Iterator[str]:
+    with open(chemin, 'rb') as f:
+        f.seek(debut)
+        position = debut
+        while position < fin:
+            ligne = f.readline()
+            if not ligne:
+                return
+            position += len(ligne)
+            yield ligne.decode('utf-8')
+
+
+def _traiter_plage(chemin: str, debut: int, fin: int, specifications: list[str], en_tete: list[str],
+                   chemin_partiel: str, taille_bloc: int, delimiteur: str) -> tuple[int, int]:
+    # Les convertisseurs ne se sérialisent pas : chaque processus les reconstruit
+    colonnes = _indexer(en_tete, [analyser_specification(spec) for spec in specifications])
+    lecteur = csv.reader(_lire_plage(chemin, debut, fin), delimiter=delimiteur)
+    with open(chemin_partiel, 'w', encoding='utf-8', newline='') as sortie:
+        return _convertir_lignes(lecteur, colonnes, sortie, taille_bloc, delimiteur)
+
+
+def convertir_fichier(chemin: str, sortie: TextIO, specifications: list[str], processus: int = 1,
+                      taille_bloc: int = TAILLE_BLOC, delimiteur: str = ',') -> tuple[int, int]:
+    """
+    Convertit un fichier CSV. Avec plusieurs processus, le fichier est découpé en plages d'octets
+    traitées en parallèle puis recollées dans l'ordre. Ce découpage suppose qu'aucune cellule
+    ne contient de retour à la ligne entre guillemets.
+    """
+    if processus <= 1:
+        with open(chemin, 'r', encoding='utf-8', newline='') as entree:
+            return convertir_flux(entree, sortie, specifications, taille_bloc, delimiteur)
+
+    with open(chemin, 'rb') as f:
+        premiere_ligne = f.readline()
+    en_tete = next(csv.reader([premiere_ligne.decode('utf-8')], delimiter=delimiteur), None)
+    if en_tete is None:
+        return 0, 0
+    # Erreurs de spécification ou de colonne signalées avant de lancer les processus
+    _indexer(en_tete, [analyser_specification(spec) for spec in specifications])
+    csv.writer(sortie, delimiter=delimiteur, lineterminator='\n').writerow(en_tete)
+
+    plages = _plages(chemin, len(premiere_ligne), processus)
+    with tempfile.TemporaryDirectory() as dossier, ProcessPoolExecutor(max_workers=processus) as pool:
+        parties = [os.path.join(dossier, f"partie_{i}.csv") for i in range(len(plages))]
+        futurs = [pool.submit(_traiter_plage, chemin, debut, fin, specifications, en_tete,
+                              partie, taille_bloc, delimiteur)
+                  for (debut, fin), partie in zip(plages, parties)]
+
+        nb_lignes = nb_invalides = 0
+        for futur, partie in zip(futurs, parties):
+            lignes, invalides = futur.result()
+            nb_lignes += lignes
+            nb_invalides += invalides
+            with open(partie, 'r', encoding='utf-8', newline='') as f:
+                shutil.copyfileobj(f, sortie)
+    return nb_lignes, nb_invalides
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Conversion de colonnes d'un CSV en continu.")
+    parser.add_argument('entree', help="Fichier CSV avec en-tête ('-' pour l'entrée standard)")
+    parser.add_argument('-c', '--colonne', action='append', required=True, dest='specifications',
+                        help="Conversion colonne:de->vers, par ex. distance:mi->km ou montant:USD->EUR (répétable)")
+    parser.add_argument('-o', '--sortie', help="Fichier CSV de sortie (sortie standard par défaut)")
+    parser.add_argument('-p', '--processus', type=int, default=1, help="Nombre de processus (découpage par plages d'octets)")
+    parser.add_argument('-b', '--taille-bloc', type=int, default=TAILLE_BLOC, help="Nombre de lignes traitées par bloc")
+    parser.add_argument('-d', '--delimiteur', default=',', help="Séparateur de colonnes")
+    args = parser.parse_args(arguments)
+
+    sortie = open(args.sortie, 'w', encoding='utf-8', newline='') if args.sortie else sys.stdout
+    try:
+        if args.entree == '-':
+            entree = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+            nb_lignes, nb_invalides = convertir_flux(entree, sortie, args.specifications,
+                                                     args.taille_bloc, args.delimiteur)
+        else:
+            nb_lignes, nb_invalides = convertir_fichier(args.entree, sortie, args.specifications, args.processus,
+                                                        args.taille_bloc, args.delimiteur)
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        if sortie is not sys.stdout:
+            sortie.close()
+
+    print(f"{nb_lignes} lignes converties, {nb_invalides} cellules non numériques laissées telles quelles.",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,188 @@
+# converters/graphe_devises.py
+
+import math
+from collections import deque
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # matrice en listes de listes, mêmes résultats
+    np = None
+
+
+class GrapheDevises:
+    """
+    Graphe de cotations quelconques (1 base = taux cotée) et matrice de tous les taux croisés.
+
+    Chaque composante connexe est couverte par un arbre en largeur issu de sa devise la plus
+    cotée (le pivot) : la valeur de chaque devise en pivot en découle, et
+    matrice[i][j] = valeur[i] / valeur[j]. Une conversion est donc une seule multiplication.
+    Une paire cotée directement garde toujours sa cotation, même hors de l'arbre : seules les
+    paires sans cotation directe sont triangulées. Deux devises sans chemin entre elles ont un
+    taux croisé NaN.
+    """
+
+    def __init__(self, cotations: Iterable[tuple[str, str, float]] = ()) -> None:
+        self.devises: list[str] = []
+        self.index: dict[str, int] = {}
+        self._voisins: list[dict[int, float]] = []  # voisins[i][j] = unités de j pour 1 i
+        self._parent: list[int] = []
+        self._composante: list[int] = []
+        self._valeurs: list[float] = []
+        self.matrice: Any = [] if np is None else np.empty((0, 0))
+
+        for base, cotee, taux in cotations:
+            self._enregistrer(base, cotee, taux)
+        self.reconstruire()
+
+    @classmethod
+    def depuis_taux(cls, taux: Mapping[str, float], base: str = "EUR") -> 'GrapheDevises':
+        """Construit le graphe depuis une table {devise: unités pour 1 base}, comme TAUX_PAR_DEFAUT."""
+        graphe = cls((base, devise, valeur) for devise, valeur in taux.items() if devise != base)
+        if graphe._ajouter_devise(base):  # table réduite à la base
+            graphe.reconstruire()
+        return graphe
+
+    def indice(self, devise: str) -> int:
+        try:
+            return self.index[devise]
+        except KeyError:
+            raise ValueError("Devise non supportée") from None
+
+    def indices(self, devises: Iterable[str]) -> Any:
+        """Encode des codes en indices une fois pour toutes, à passer ensuite à convert_many."""
+        indices = [self.indice(devise) for devise in devises]
+        return indices if np is None else np.asarray(indices, dtype=np.intp)
+
+    def _ajouter_devise(self, devise: str) -> bool:
+        if devise in self.index:
+            return False
+        self.index[devise] = len(self.devises)
+        self.devises.append(devise)
+        self._voisins.append({})
+        return True
+
+    def _enregistrer(self, base: str, cotee: str, taux: float) -> bool:
+        """Ajoute la cotation ; renvoie True si une nouvelle devise est apparue."""
+        # NaN échappe à toute comparaison : seul isfinite l'écarte
+        if not (math.isfinite(taux) and taux > 0):
+            raise ValueError(f"Taux invalide pour {base}/{cotee} : {taux}")
+        nouvelle = self._ajouter_devise(base)
+        nouvelle = self._ajouter_devise(cotee) or nouvelle
+        i, j = self.index[base], self.index[cotee]
+        self._voisins[i][j] = taux
+        self._voisins[j][i] = 1.0 / taux
+        return nouvelle
+
+    def reconstruire(self) -> None:
+        """Recalcule arbres, valeurs et matrice complète (O(n²))."""
+        n = len(self.devises)
+        self._parent = [-1] * n
+        self._composante = [-1] * n
+        self._valeurs = [float('nan')] * n
+
+        # Les pivots les plus cotés d'abord : leurs cotations directes sont utilisées telles quelles
+        for pivot in sorted(range(n), key=lambda i: -len(self._voisins[i])):
+            if self._composante[pivot] >= 0:
+                continue
+            self._composante[pivot] = pivot
+            self._valeurs[pivot] = 1.0
+            file = deque([pivot])
+            while file:
+                i = file.popleft()
+                for j, taux in self._voisins[i].items():
+                    if self._composante[j] < 0:
+                        self._composante[j] = pivot
+                        self._parent[j] = i
+                        # 1 i = taux j  =>  valeur(j) = valeur(i) / taux
+                        self._valeurs[j] = self._valeurs[i] / taux
+                        file.append(j)
+
+        if np is None:
+            self.matrice = [[0.0] * n for _ in range(n)]
+        else:
+            self.matrice = np.empty((n, n))
+        self._recalculer(range(n))
+
+    def _recalculer(self, modifiees: Iterable[int]) -> None:
+        """Met à jour les lignes et colonnes des devises dont la valeur a changé (O(k·n))."""
+        modifiees = list(modifiees)
+        valeurs, composantes = self._valeurs, self._composante
+
+        if np is not None:
+            v = np.asarray(valeurs)
+            c = np.asarray(composantes)
+            k = np.asarray(modifiees, dtype=np.intp)
+            self.matrice[k, :] = np.where(c[k, None] == c[None, :], v[k, None] / v[None, :], np.nan)
+            self.matrice[:, k] = np.where(c[:, None] == c[None, k], v[:, None] / v[None, k], np.nan)
+        else:
+            nan = float('nan')
+            for i in modifiees:
+                self.matrice[i] = [valeurs[i] / vj if composantes[i] == cj else nan
+                                   for vj, cj in zip(valeurs, composantes)]
+            for ligne, vi, ci in zip(self.matrice, valeurs, composantes):
+                for j in modifiees:
+                    ligne[j] = vi / valeurs[j] if ci == composantes[j] else nan
+
+        # Les cotations directes des lignes et colonnes recalculées priment sur la triangulation
+        for i in modifiees:
+            for j, taux in self._voisins[i].items():
+                self._coter(i, j, taux)
+
+    def _coter(self, i: int, j: int, taux: float) -> None:
+        self.matrice[i][j] = taux
+        self.matrice[j][i] = 1.0 / taux
+
+    def _sous_arbre(self, racine: int) -> list[int]:
+        enfants: dict[int, list[int]] = {}
+        for i, parent in enumerate(self._parent):
+            enfants.setdefault(parent, []).append(i)
+        sous_arbre, a_visiter = [], [racine]
+        while a_visiter:
+            i = a_visiter.pop()
+            sous_arbre.append(i)
+            a_visiter.extend(enfants.get(i, ()))
+        return sous_arbre
+
+    def ajouter_cotation(self, base: str, cotee: str, taux: float) -> None:
+        """
+        Ajoute ou met à jour une cotation. La mise à jour d'une arête de l'arbre ne recalcule
+        que le sous-arbre concerné, celle d'une cotation hors arbre que sa paire ; une nouvelle
+        devise ou un nouveau lien entre deux composantes déclenche une reconstruction complète.
+        """
+        relie = base in self.index and cotee in self.index \
+            and self._composante[self.index[base]] == self._composante[self.index[cotee]]
+        if self._enregistrer(base, cotee, taux) or not relie:
+            self.reconstruire()
+            return
+
+        i, j = self.index[base], self.index[cotee]
+        if self._parent[i] == j:
+            enfant, nouvelle_valeur = i, self._valeurs[j] * taux
+        elif self._parent[j] == i:
+            enfant, nouvelle_valeur = j, self._valeurs[i] / taux
+        else:
+            self._coter(i, j, taux)  # cotation hors arbre : seule sa paire change
+            return
+
+        facteur = nouvelle_valeur / self._valeurs[enfant]
+        sous_arbre = self._sous_arbre(enfant)
+        for k in sous_arbre:
+            self._valeurs[k] *= facteur
+        self._recalculer(sous_arbre)
+
+    def taux(self, de: str, vers: str) -> float:
+        taux = self.matrice[self.indice(de)][self.indice(vers)]
+        if taux != taux:
+            raise ValueError(f"Aucune cotation ne relie {de} à {vers}")
+        return float(taux)
+
+    def convertir(self, montant: float, de: str, vers: str) -> float:
+        return montant * self.taux(de, vers)
+
+    def convert_many(self, montants: Any, de: Sequence[int], vers: Sequence[int],
+                     sortie: Optional[Any] = None) -> Any:
+        """Conversion en masse ; de et vers sont des indices obtenus avec indices()."""
+        if np is None:
+            return [montant * self.matrice[i][j] for montant, i, j in zip(montants, de, vers)]
+        return np.multiply(montants, self.matrice[de, vers], out=sortie)
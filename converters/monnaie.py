@@ -0,0 +1,130 @@
+# converters/monnaie.py
+
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+from fractions import Fraction
+from typing import Any, Iterable, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Nombre de décimales de l'unité mineure de chaque devise (ISO 4217)
+EXPOSANTS: dict[str, int] = {
+    "EUR": 2,
+    "USD": 2,
+    "XAF": 0,
+    "GBP": 2,
+    "CAD": 2,
+    "JPY": 0
+}
+
+ARRONDIS: tuple[str, ...] = (ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_DOWN)
+
+_INT64_MAX = 2 ** 63 - 1
+
+Taux = Union[str, int, float, Decimal, Fraction]
+
+
+def exposant(devise: str) -> int:
+    try:
+        return EXPOSANTS[devise]
+    except KeyError:
+        raise ValueError("Devise non supportée") from None
+
+
+def _fraction(taux: Taux) -> Fraction:
+    # Un flottant est lu par son écriture décimale (1.08 et non 1.0800000000000000710...)
+    return Fraction(str(taux)) if isinstance(taux, float) else Fraction(taux)
+
+
+def _diviser_arrondi(numerateurs: Any, denominateur: int, arrondi: str) -> Any:
+    """Division entière exacte, élément par élément, selon le mode d'arrondi du module decimal."""
+    # Division plancher (0 <= reste < d), valable pour les tableaux int64 comme pour les tableaux d'objets
+    quotients, restes = numerateurs // denominateur, numerateurs % denominateur
+    if arrondi == ROUND_HALF_EVEN:
+        return quotients + ((2 * restes > denominateur)
+                            | ((2 * restes == denominateur) & (quotients % 2 == 1)))
+    if arrondi == ROUND_HALF_UP:  # moitié : on s'éloigne de zéro
+        return quotients + ((2 * restes > denominateur) | ((2 * restes == denominateur) & (quotients >= 0)))
+    if arrondi == ROUND_DOWN:  # vers zéro
+        return quotients + ((quotients < 0) & (restes > 0))
+    raise ValueError(f"Mode d'arrondi non pris en charge : {arrondi}")
+
+
+class Montants:
+    """
+    Tableau de montants d'une même devise, en unités mineures int64 (centimes, yens...).
+    Aucun flottant n'intervient : les conversions arrondissent une seule fois, selon un mode
+    explicite, et les totaux sont exacts.
+    """
+
+    __slots__ = ('devise', 'mineures')
+
+    def __init__(self, mineures: Any, devise: str) -> None:
+        if np is None:
+            raise ImportError("Les tableaux de montants nécessitent NumPy (pip install numpy)")
+        exposant(devise)
+        self.devise = devise
+        self.mineures = np.asarray(mineures, dtype=np.int64)
+
+    @classmethod
+    def depuis_textes(cls, textes: Iterable[str], devise: str,
+                      arrondi: str = ROUND_HALF_EVEN) -> 'Montants':
+        """Lecture exacte de montants décimaux ('12.34'), arrondis à l'unité mineure si besoin."""
+        e = exposant(devise)
+        return cls([int(Decimal(texte).scaleb(e).to_integral_value(rounding=arrondi)) for texte in textes], devise)
+
+    @classmethod
+    def depuis_flottants(cls, valeurs: Any, devise: str) -> 'Montants':
+        """Depuis des flottants, arrondis au plus proche (demi au pair) ; à réserver aux sources déjà flottantes."""
+        return cls(np.rint(np.asarray(valeurs, dtype=np.float64) * 10 ** exposant(devise)), devise)
+
+    def __len__(self) -> int:
+        return len(self.mineures)
+
+    def total(self) -> int:
+        """Somme exacte en unités mineures (entier Python, jamais de débordement silencieux)."""
+        if not len(self.mineures):
+            return 0
+        plus_grand = max(int(self.mineures.max()), -int(self.mineures.min()), 1)
+        taille_bloc = _INT64_MAX // plus_grand
+        if taille_bloc >= len(self.mineures):
+            return int(self.mineures.sum())
+        return sum(int(self.mineures[i:i + taille_bloc].sum())
+                   for i in range(0, len(self.mineures), taille_bloc))
+
+    def total_decimal(self) -> Decimal:
+        return Decimal(self.total()).scaleb(-exposant(self.devise))
+
+    def formater(self) -> list[str]:
+        e = exposant(self.devise)
+        if e == 0:
+            return [str(int(m)) for m in self.mineures]
+        return [f"{'-' if m < 0 else ''}{abs(int(m)) // 10 ** e}.{abs(int(m)) % 10 ** e:0{e}d}"
+                for m in self.mineures]
+
+    def convertir(self, vers: str, taux: Taux, arrondi: str = ROUND_HALF_EVEN) -> 'Montants':
+        """
+        Convertit avec un taux exact (unités de 'vers' pour 1 unité de la devise courante).
+        Le calcul reste en int64 tant qu'il ne peut pas déborder, sinon il passe par des
+        entiers Python : plus lent, mais toujours exact.
+        """
+        fraction = _fraction(taux)
+        if fraction <= 0:
+            raise ValueError(f"Taux invalide : {taux}")
+        ecart = exposant(vers) - exposant(self.devise)
+        numerateur = fraction.numerator * 10 ** max(ecart, 0)
+        denominateur = fraction.denominator * 10 ** max(-ecart, 0)
+
+        # Magnitude en entiers Python : np.abs(INT64_MIN) déborde et resterait négatif
+        plus_grand = max(int(self.mineures.max()), -int(self.mineures.min()), 1) if len(self.mineures) else 1
+        if plus_grand * numerateur + 2 * denominateur <= _INT64_MAX:
+            produits = self.mineures * np.int64(numerateur)
+            return Montants(_diviser_arrondi(produits, np.int64(denominateur), arrondi), vers)
+
+        produits = self.mineures.astype(object) * numerateur
+        resultat = _diviser_arrondi(produits, denominateur, arrondi)
+        if resultat.size and (resultat.max() > _INT64_MAX or resultat.min() < -_INT64_MAX - 1):
+            raise OverflowError("Montant converti hors de la plage int64")
+        return Montants(resultat.astype(np.int64), vers)
@@ -0,0 +1,199 @@
+# converters/taux.py
+
+import json
+import math
+import threading
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional
+
+from .graphe_devises import GrapheDevises
+
+# Taux pour 1 EUR, utilisés tant qu'aucune source n'a répondu
+TAUX_PAR_DEFAUT: dict[str, float] = {
+    "EUR": 1.00,
+    "USD": 1.08,   # 1 EUR = 1.08 USD
+    "XAF": 655.96, # 1 EUR = 655.96 FCFA
+    "GBP": 0.86,   # 1 EUR = 0.86 GBP
+    "CAD": 1.47,   # 1 EUR = 1.47 CAD
+    "JPY": 162.50  # 1 EUR = 162.50 JPY
+}
+
+
+def _valider_taux(donnees: Mapping[Any, Any]) -> dict[str, float]:
+    """
+    Garde les taux finis et strictement positifs : un taux nul, négatif, NaN ou illisible est écarté
+    (il produirait une division par zéro ou des résultats NaN), les autres devises restent à jour.
+    """
+    taux = {}
+    for devise, valeur in donnees.items():
+        try:
+            valeur = float(valeur)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(valeur) and valeur > 0:
+            taux[str(devise).upper()] = valeur
+    if not taux:
+        raise ValueError("Aucun taux valide dans la réponse de la source")
+    return taux
+
+
+def _extraire_taux(donnees: Any) -> dict[str, float]:
+    """Accepte {'USD': 1.08, ...} ou {'rates': {...}} / {'taux': {...}} ; la base est l'EUR."""
+    if isinstance(donnees, dict):
+        donnees = donnees.get('rates', donnees.get('taux', donnees))
+    if not isinstance(donnees, dict):
+        raise ValueError("Format de taux inattendu")
+    taux = _valider_taux(donnees)
+    taux.setdefault("EUR", 1.0)
+    return taux
+
+
+class FournisseurTaux:
+    """Source de taux de change. recuperer() renvoie {devise: nombre d'unités pour 1 EUR}."""
+
+    def recuperer(self) -> dict[str, float]:
+        raise NotImplementedError
+
+
+class FournisseurStatique(FournisseurTaux):
+    def __init__(self, taux: Optional[Mapping[str, float]] = None) -> None:
+        self.taux = dict(taux if taux is not None else TAUX_PAR_DEFAUT)
+
+    def recuperer(self) -> dict[str, float]:
+        return dict(self.taux)
+
+
+class FournisseurFichier(FournisseurTaux):
+    """Fichier JSON local, relu à chaque rafraîchissement."""
+
+    def __init__(self, chemin: str) -> None:
+        self.chemin = chemin
+
+    def recuperer(self) -> dict[str, float]:
+        with open(self.chemin, 'r', encoding='utf-8') as f:
+            return _extraire_taux(json.load(f))
+
+
+class FournisseurHTTP(FournisseurTaux):
+    """Point d'accès HTTP renvoyant du JSON. La session (et son pool de connexions) est réutilisée."""
+
+    def __init__(self, url: str, delai: float = 5.0, session: Any = None) -> None:
+        import requests  # dépendance chargée seulement si une source HTTP est configurée
+
+        self.url = url
+        self.delai = delai
+        self.session = session or requests.Session()
+
+    def recuperer(self) -> dict[str, float]:
+        reponse = self.session.get(self.url, timeout=self.delai)
+        reponse.raise_for_status()
+        return _extraire_taux(reponse.json())
+
+
+class Instantane(NamedTuple):
+    """Photo immuable des taux et de leurs taux croisés : les lectures n'ont jamais besoin de verrou."""
+    taux: Mapping[str, float]
+    horodatages: Mapping[str, float]
+    date: float
+    graphe: GrapheDevises
+    expire: float = float('inf')  # premier instant où une devise de la photo dépasse l'expiration
+
+
+class MagasinTaux:
+    """
+    Cache des taux avec durée de vie (ttl) et éviction des devises trop anciennes (expiration).
+    Une lecture renvoie l'instantané courant ; s'il est périmé, un rafraîchissement est lancé
+    en arrière-plan et l'ancien instantané reste servi en attendant : une conversion
+    n'attend jamais le réseau. Une devise dont le dernier taux reçu a dépassé 'expiration'
+    n'est plus servie, même tant que la source reste en échec.
+    La matrice des taux croisés (GrapheDevises) est calculée à chaque publication d'un instantané,
+    hors du chemin de lecture : une conversion n'est qu'une multiplication.
+    """
+
+    def __init__(self, fournisseur: FournisseurTaux, ttl: Optional[float] = 3600.0,
+                 expiration: Optional[float] = None, initial: Optional[Mapping[str, float]] = None,
+                 delai_reessai: float = 30.0) -> None:
+        self.fournisseur = fournisseur
+        self.ttl = ttl
+        self.expiration = expiration
+        self.delai_reessai = delai_reessai
+        self.derniere_erreur: Optional[Exception] = None
+        self._verrou = threading.Lock()  # un seul rafraîchissement à la fois, jamais pris en lecture
+        self._verrou_publication = threading.Lock()  # remplacement de l'instantané (bref, hors réseau)
+
+        maintenant = monotonic()
+        taux = dict(initial if initial is not None else TAUX_PAR_DEFAUT)
+        self._instantane = self._photographier(taux, dict.fromkeys(taux, maintenant), maintenant)
+        self._echeance = maintenant + ttl if ttl is not None else float('inf')
+
+    def _photographier(self, taux: dict[str, float], horodatages: dict[str, float], maintenant: float) -> Instantane:
+        """Instantané sans les devises expirées, avec ses taux croisés et l'instant de la prochaine expiration."""
+        expire = float('inf')
+        if self.expiration is not None:
+            for devise, date in list(horodatages.items()):
+                if maintenant - date > self.expiration and devise != "EUR":
+                    del taux[devise], horodatages[devise]
+            dates = [date for devise, date in horodatages.items() if devise != "EUR"]
+            expire = min(dates) + self.expiration if dates else float('inf')
+        return Instantane(MappingProxyType(taux), MappingProxyType(horodatages), maintenant,
+                          GrapheDevises.depuis_taux(taux), expire)
+
+    def _retirer_expires(self, maintenant: float) -> Instantane:
+        with self._verrou_publication:
+            instantane = self._instantane
+            if maintenant > instantane.expire:
+                instantane = self._photographier(dict(instantane.taux), dict(instantane.horodatages), maintenant)
+                self._instantane = instantane
+            return instantane
+
+    def instantane(self) -> Instantane:
+        maintenant = monotonic()
+        instantane = self._instantane
+        if maintenant > instantane.expire:
+            instantane = self._retirer_expires(maintenant)
+        if maintenant > self._echeance:
+            self.rafraichir_en_arriere_plan()
+        return instantane
+
+    def taux(self) -> Mapping[str, float]:
+        return self.instantane().taux
+
+    def rafraichir_en_arriere_plan(self) -> None:
+        if self._verrou.acquire(blocking=False):
+            threading.Thread(target=self._rafraichir_puis_liberer, daemon=True,
+                             name="rafraichissement-taux").start()
+
+    def _rafraichir_puis_liberer(self) -> None:
+        try:
+            self._rafraichir()
+        finally:
+            self._verrou.release()
+
+    def rafraichir(self) -> None:
+        """Rafraîchissement synchrone (au démarrage ou dans les tests)."""
+        with self._verrou:
+            self._rafraichir()
+
+    def _rafraichir(self) -> None:
+        try:
+            # Validés ici aussi : un fournisseur personnalisé ne passe pas forcément par _extraire_taux
+            nouveaux = _valider_taux(self.fournisseur.recuperer())
+        except Exception as e:
+            self.derniere_erreur = e
+            self._echeance = monotonic() + self.delai_reessai
+            self._retirer_expires(monotonic())
+            return
+
+        with self._verrou_publication:
+            maintenant = monotonic()
+            ancien = self._instantane
+            taux = dict(ancien.taux)
+            horodatages = dict(ancien.horodatages)
+            taux.update(nouveaux)
+            horodatages.update(dict.fromkeys(nouveaux, maintenant))
+
+            # Remplacement atomique de la référence : les lecteurs voient l'ancien ou le nouveau, jamais un mélange
+            self._instantane = self._photographier(taux, horodatages, maintenant)
+        self.derniere_erreur = None
+        self._echeance = maintenant + self.ttl if self.ttl is not None else float('inf')
@@ -0,0 +1,155 @@
+# converters/taux_historiques.py
+
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from datetime import date
+from typing import Any, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # la conversion en masse retombe sur une boucle Python
+    np = None
+
+# Format binaire (little-endian), lu directement par mmap, sans aucune analyse au démarrage :
+#   en-tête  : 'FXH1', nombre de dates (uint32), nombre de devises (uint32), 4 octets de bourrage
+#   devises  : codes ISO de 3 caractères ASCII, bourrés jusqu'à un multiple de 8 octets
+#   dates    : int32, jours depuis le 1970-01-01, triés, bourrés jusqu'à un multiple de 8 octets
+#   taux     : float64, matrice dates × devises (ligne par date), unités pour 1 EUR
+MAGIQUE = b'FXH1'
+EN_TETE = struct.Struct('<4sII4x')
+EPOQUE = date(1970, 1, 1)
+
+Jour = Union[date, int]
+
+
+def _bourrer(taille: int) -> int:
+    return -taille % 8
+
+
+def _jour(jour: Jour) -> int:
+    return jour if isinstance(jour, int) else (jour - EPOQUE).days
+
+
+def ecrire_table(chemin: str, dates: Sequence[date], devises: Sequence[str],
+                 taux: Sequence[Sequence[float]]) -> None:
+    """Écrit une table historique ; taux[i][j] est le taux de devises[j] à dates[i] (NaN si absent)."""
+    if any(len(code) != 3 or not code.isascii() for code in devises):
+        raise ValueError("Les devises doivent être des codes ISO de 3 caractères")
+    lignes = sorted(zip((_jour(jour) for jour in dates), taux))
+
+    codes = ''.join(devises).upper().encode('ascii')
+    jours = array('i', (jour for jour, _ in lignes))
+    valeurs = array('d', (float(valeur) for _, ligne in lignes for valeur in ligne))
+    if len(valeurs) != len(jours) * len(devises):
+        raise ValueError("La matrice des taux doit avoir une ligne par date et une colonne par devise")
+
+    with open(chemin, 'wb') as f:
+        f.write(EN_TETE.pack(MAGIQUE, len(jours), len(devises)))
+        f.write(codes + bytes(_bourrer(len(codes))))
+        f.write(jours.tobytes() + bytes(_bourrer(4 * len(jours))))
+        f.write(valeurs.tobytes())
+
+
+class TableHistorique:
+    """
+    Table de taux historiques projetée en mémoire : l'ouverture ne lit que l'en-tête,
+    les pages utiles sont chargées par le système au fil des recherches.
+    Le taux d'un jour est celui de la dernière date connue à ce jour ou avant.
+    """
+
+    def __init__(self, chemin: str) -> None:
+        self._fichier = open(chemin, 'rb')
+        self._mmap = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magique, nb_dates, nb_devises = EN_TETE.unpack_from(self._mmap)
+        if magique != MAGIQUE:
+            self.fermer()
+            raise ValueError(f"Fichier de taux historiques invalide : {chemin}")
+
+        debut_codes = EN_TETE.size
+        codes = self._mmap[debut_codes:debut_codes + 3 * nb_devises].decode('ascii')
+        self.devises: list[str] = [codes[i:i + 3] for i in range(0, len(codes), 3)]
+        self.index: dict[str, int] = {code: i for i, code in enumerate(self.devises)}
+
+        debut_dates = debut_codes + 3 * nb_devises + _bourrer(3 * nb_devises)
+        debut_taux = debut_dates + 4 * nb_dates + _bourrer(4 * nb_dates)
+        vue = memoryview(self._mmap)
+        self.jours = vue[debut_dates:debut_dates + 4 * nb_dates].cast('i')
+        self._taux = vue[debut_taux:debut_taux + 8 * nb_dates * nb_devises].cast('d')
+        self.nb_devises = nb_devises
+
+        if np is not None:
+            self._jours_np = np.frombuffer(self._mmap, dtype='<i4', count=nb_dates, offset=debut_dates)
+            self._taux_np = np.frombuffer(self._mmap, dtype='<f8', count=nb_dates * nb_devises,
+                                          offset=debut_taux).reshape(nb_dates, nb_devises)
+
+    def __enter__(self) -> 'TableHistorique':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.fermer()
+
+    def fermer(self) -> None:
+        for attribut in ('jours', '_taux'):
+            if hasattr(self, attribut):
+                getattr(self, attribut).release()
+        self.__dict__.pop('_jours_np', None)
+        self.__dict__.pop('_taux_np', None)
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # des tableaux NumPy renvoyés par l'appelant référencent encore la projection
+        self._fichier.close()
+
+    def _ligne(self, jour: Jour) -> int:
+        ligne = bisect_right(self.jours, _jour(jour)) - 1
+        if ligne < 0:
+            raise ValueError(f"Aucun taux connu au {jour}")
+        return ligne
+
+    def _colonne(self, devise: str) -> int:
+        try:
+            return self.index[devise]
+        except KeyError:
+            raise ValueError("Devise non supportée") from None
+
+    def taux(self, devise: str, jour: Jour) -> float:
+        return self._taux[self._ligne(jour) * self.nb_devises + self._colonne(devise)]
+
+    def convertir(self, montant: float, de: str, vers: str, jour: Jour) -> float:
+        ligne = self._ligne(jour) * self.nb_devises
+        return montant / self._taux[ligne + self._colonne(de)] * self._taux[ligne + self._colonne(vers)]
+
+    def indices_devises(self, devises: Any) -> Any:
+        """Codes de devises -> indices de colonne (pour réutiliser un encodage entre plusieurs lots)."""
+        uniques, inverses = np.unique(np.asarray(devises), return_inverse=True)
+        return np.array([self._colonne(str(code)) for code in uniques], dtype=np.intp)[inverses]
+
+    def convertir_lot(self, montants: Any, de: Any, vers: Any, jours: Any) -> Any:
+        """
+        Convertit des tableaux (montant, devise, date) en une passe vectorisée.
+        de / vers : un code, un tableau de codes ou un tableau d'indices (indices_devises) ;
+        jours : tableau datetime64[D] ou jours depuis le 1970-01-01.
+        """
+        if np is None:
+            return [self.convertir(m, d, v, j) for m, d, v, j in zip(montants, de, vers, jours)]
+
+        jours = np.asarray(jours)
+        if np.issubdtype(jours.dtype, np.datetime64):
+            jours = jours.astype('datetime64[D]').astype(np.int64)
+        lignes = np.searchsorted(self._jours_np, jours, side='right') - 1
+        if lignes.size and lignes.min() < 0:
+            raise ValueError("Certaines dates précèdent la première date de la table")
+
+        colonnes = []
+        for devises in (de, vers):
+            if isinstance(devises, str):
+                colonnes.append(self._colonne(devises))
+            else:
+                devises = np.asarray(devises)
+                colonnes.append(devises if np.issubdtype(devises.dtype, np.integer)
+                                else self.indices_devises(devises))
+
+        return np.asarray(montants, dtype=np.float64) / self._taux_np[lignes, colonnes[0]] \
+            * self._taux_np[lignes, colonnes[1]]
@@ -1,57 +1,154 @@
 # converters/units.py
 
-from typing import Dict
+import operator
+from fractions import Fraction
+from functools import partial
+from typing import Callable, Dict, Tuple, Union
+
+# Une unité est définie par sa transformation vers l'unité de base de sa dimension :
+# base = valeur * échelle + décalage (le décalage n'est utile que pour les températures)
+Definition = Union[float, Tuple[float, float]]
+Convertisseur = Callable[[float], float]
+
+
+def _exact(nombre: Union[float, Fraction]) -> Fraction:
+    # str() redonne le littéral décimal écrit dans la table (0.0254 et non son arrondi binaire)
+    return nombre if isinstance(nombre, Fraction) else Fraction(str(nombre))
+
+
+class Dimension:
+    """
+    Unités d'une même grandeur et matrices denses des conversions entre elles.
+    Les matrices sont calculées une fois, en fractions exactes, à la création :
+    convertir revient ensuite à une multiplication (et une addition pour les affines).
+    """
+
+    def __init__(self, nom: str, unites: Dict[str, Definition]) -> None:
+        self.nom = nom
+        self.index: Dict[str, int] = {unite: i for i, unite in enumerate(unites)}
+        self.vers_base: Dict[str, Tuple[Fraction, Fraction]] = {}
+        for unite, definition in unites.items():
+            echelle, decalage = definition if isinstance(definition, tuple) else (definition, 0)
+            self.vers_base[unite] = (_exact(echelle), _exact(decalage))
+
+        self.echelles: list[list[float]] = []
+        self.decalages: list[list[float]] = []
+        for a_de, b_de in self.vers_base.values():
+            ligne_echelles, ligne_decalages = [], []
+            for a_vers, b_vers in self.vers_base.values():
+                # vers = (valeur * a_de + b_de - b_vers) / a_vers
+                ligne_echelles.append(float(a_de / a_vers))
+                ligne_decalages.append(float((b_de - b_vers) / a_vers))
+            self.echelles.append(ligne_echelles)
+            self.decalages.append(ligne_decalages)
+
+        self.affine = any(decalage for _, decalage in self.vers_base.values())
+
+    def indices(self, de: str, vers: str) -> Tuple[int, int]:
+        try:
+            return self.index[de], self.index[vers]
+        except KeyError:
+            raise ValueError(f"Unité de {self.nom} non reconnue : {de} ou {vers}") from None
+
+    def transformation(self, de: str, vers: str) -> Tuple[float, float]:
+        """(échelle, décalage) tels que vers = valeur * échelle + décalage."""
+        i, j = self.indices(de, vers)
+        return self.echelles[i][j], self.decalages[i][j]
+
+
+class RegistreUnites:
+    """Ensemble des dimensions connues ; on peut en ajouter de nouvelles à l'exécution."""
+
+    def __init__(self) -> None:
+        self.dimensions: Dict[str, Dimension] = {}
+        self._dimension_de: Dict[str, Dimension] = {}
+        self._convertisseurs: Dict[Tuple[str, str], Convertisseur] = {}
+
+    def ajouter_dimension(self, nom: str, unites: Dict[str, Definition]) -> Dimension:
+        doublons = [unite for unite in unites if unite in self._dimension_de]
+        if nom in self.dimensions or doublons:
+            raise ValueError(f"Dimension ou unités déjà enregistrées : {nom} {doublons}")
+        dimension = Dimension(nom, unites)
+        self.dimensions[nom] = dimension
+        for unite in unites:
+            self._dimension_de[unite] = dimension
+        return dimension
+
+    def __contains__(self, unite: str) -> bool:
+        return unite in self._dimension_de
+
+    def dimension_de(self, unite: str) -> Dimension:
+        try:
+            return self._dimension_de[unite]
+        except KeyError:
+            raise ValueError(f"Unité non reconnue : {unite}") from None
+
+    def get_converter(self, de: str, vers: str) -> Convertisseur:
+        """Convertisseur spécialisé pour la paire (de, vers), construit une seule fois."""
+        try:
+            return self._convertisseurs[de, vers]
+        except KeyError:
+            pass
+
+        dimension = self.dimension_de(de)
+        if self.dimension_de(vers) is not dimension:
+            raise ValueError(f"Unités incompatibles : {de} ({dimension.nom}) et {vers} ({self.dimension_de(vers).nom})")
+
+        echelle, decalage = dimension.transformation(de, vers)
+        if decalage:
+            def convertisseur(valeur: float) -> float:
+                return valeur * echelle + decalage
+        else:
+            convertisseur = partial(operator.mul, echelle)
+
+        self._convertisseurs[de, vers] = convertisseur
+        return convertisseur
+
+
+REGISTRE = RegistreUnites()
+
+LONGUEUR = REGISTRE.ajouter_dimension('longueur', {
+    'm': 1.0,
+    'cm': 0.01,
+    'mm': 0.001,
+    'km': 1000.0,
+    'in': 0.0254,
+    'ft': 0.3048,
+    'yd': 0.9144,
+    'mi': 1609.34
+})
+
+MASSE = REGISTRE.ajouter_dimension('masse', {
+    'kg': 1.0,
+    'g': 0.001,
+    'mg': 0.000001,
+    'lb': 0.453592,
+    'oz': 0.0283495,
+    't': 1000.0
+})
+
+# Base : le Celsius. F -> C = (valeur - 32) * 5 / 9 ; K -> C = valeur - 273.15
+TEMPERATURE = REGISTRE.ajouter_dimension('température', {
+    'C': 1.0,
+    'F': (Fraction(5, 9), Fraction(-160, 9)),
+    'K': (1.0, -273.15)
+})
+
+
+def get_converter(de: str, vers: str) -> Convertisseur:
+    return REGISTRE.get_converter(de, vers)
+
 
 def convertir_longueur(valeur: float, de: str, vers: str) -> float:
-    conversions: Dict[str, float] = {
-        'm': 1.0,
-        'cm': 0.01,
-        'mm': 0.001,
-        'km': 1000.0,
-        'in': 0.0254,
-        'ft': 0.3048,
-        'yd': 0.9144,
-        'mi': 1609.34
-    }
-    if de not in conversions or vers not in conversions:
-        raise ValueError(f"Unité de longueur non reconnue : {de} ou {vers}")
-    return valeur * conversions[de] / conversions[vers]
+    i, j = LONGUEUR.indices(de, vers)
+    return valeur * LONGUEUR.echelles[i][j]
 
 
 def convertir_masse(valeur: float, de: str, vers: str) -> float:
-    conversions: Dict[str, float] = {
-        'kg': 1.0,
-        'g': 0.001,
-        'mg': 0.000001,
-        'lb': 0.453592,
-        'oz': 0.0283495,
-        't': 1000.0
-    }
-    if de not in conversions or vers not in conversions:
-        raise ValueError(f"Unité de masse non reconnue : {de} ou {vers}")
-    return valeur * conversions[de] / conversions[vers]
+    i, j = MASSE.indices(de, vers)
+    return valeur * MASSE.echelles[i][j]
 
 
 def convertir_temperature(valeur: float, de: str, vers: str) -> float:
-    if de == vers:
-        return valeur
-
-    if de == 'C':
-        if vers == 'F':
-            return valeur * 9 / 5 + 32
-        elif vers == 'K':
-            return valeur + 273.15
-
-    elif de == 'F':
-        if vers == 'C':
-            return (valeur - 32) * 5 / 9
-        elif vers == 'K':
-            return (valeur - 32) * 5 / 9 + 273.15
-
-    elif de == 'K':
-        if vers == 'C':
-            return valeur - 273.15
-        elif vers == 'F':
-            return (valeur - 273.15) * 9 / 5 + 32
-
-    raise ValueError(f"Unité de température non reconnue : {de} ou {vers}")
\ No newline at end of file
+    i, j = TEMPERATURE.indices(de, vers)
+    return valeur * TEMPERATURE.echelles[i][j] + TEMPERATURE.decalages[i][j]
@@ -0,0 +1,60 @@
+# converters/vectorise.py
+
+from array import array
+from typing import Any, Optional
+
+from .units import LONGUEUR, MASSE, REGISTRE, TEMPERATURE, Dimension
+
+try:
+    import numpy as np
+except ImportError:  # repli en pur Python, correct mais lent
+    np = None
+
+
+def _vue(tableau: Any) -> Any:
+    """Tableau NumPy partageant la mémoire de l'objet (ndarray, array.array, memoryview...)."""
+    if isinstance(tableau, np.ndarray):
+        return tableau
+    return np.asarray(memoryview(tableau))
+
+
+def _appliquer(dimension: Dimension, valeurs: Any, de: str, vers: str, sortie: Optional[Any]) -> Any:
+    """
+    Applique sortie = valeurs * échelle + décalage en une ou deux passes vectorisées.
+    Toute conversion (y compris C/F/K) est une transformation affine : pas de branche par valeur.
+    Passer sortie=valeurs convertit sur place ; sans sortie, un seul tableau résultat est alloué.
+    """
+    echelle, decalage = dimension.transformation(de, vers)
+
+    if np is None:
+        source = memoryview(valeurs)
+        cible = sortie if sortie is not None else array('d', bytes(8 * len(source)))
+        destination = memoryview(cible)
+        for i, valeur in enumerate(source):
+            destination[i] = valeur * echelle + decalage
+        return cible
+
+    source = _vue(valeurs)
+    cible = None if sortie is None else _vue(sortie)
+    cible = np.multiply(source, echelle, out=cible)
+    if decalage:
+        np.add(cible, decalage, out=cible)
+    return cible if sortie is None or isinstance(sortie, np.ndarray) else sortie
+
+
+def convertir_tableau(valeurs: Any, de: str, vers: str, sortie: Optional[Any] = None) -> Any:
+    """Conversion en masse pour n'importe quelle dimension du registre."""
+    dimension = REGISTRE.dimension_de(de)
+    return _appliquer(dimension, valeurs, de, vers, sortie)
+
+
+def convertir_longueur_tableau(valeurs: Any, de: str, vers: str, sortie: Optional[Any] = None) -> Any:
+    return _appliquer(LONGUEUR, valeurs, de, vers, sortie)
+
+
+def convertir_masse_tableau(valeurs: Any, de: str, vers: str, sortie: Optional[Any] = None) -> Any:
+    return _appliquer(MASSE, valeurs, de, vers, sortie)
+
+
+def convertir_temperature_tableau(valeurs: Any, de: str, vers: str, sortie: Optional[Any] = None) -> Any:
+    return _appliquer(TEMPERATURE, valeurs, de, vers, sortie)
@@ -1,16 +1,20 @@
 import os
 import sys
+import fnmatch
 import subprocess
 import json
 import yaml 
 import copy 
 import hashlib 
 import smtplib 
+import sqlite3
 import re 
+import random
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText 
-from google import genai
-from google.genai.errors import APIError
 from dotenv import load_dotenv
 from tqdm import tqdm 
 
@@ -23,7 +27,7 @@ COLOR_END = '\033[0m'
 
 # --- Configuration par défaut et globale ---
 CONFIG_FILE = '.geminianalyzer.yml'
-CACHE_FILE = '.gemini_cache.json' 
+CACHE_FILE = '.gemini_cache.sqlite3' 
 EMAIL_PREFS_FILE = '.user_email_prefs.json'
 
 # --- RÈGLES DE CODAGE DYNAMIQUES PAR DÉFAUT ---
@@ -61,6 +65,31 @@ def load_config():
             'model_name': 'gemini-2.5-flash',
             'max_file_size_kb': 500,
             'strict_untagged_output': False, 
+            # Analyses simultanées et quota du modèle (requêtes par minute, avec une rafale autorisée)
+            'max_concurrency': 4,
+            'requests_per_minute': 60,
+            'burst': 4,
+            # Taille maximale du cache des analyses ; les entrées les moins récemment utilisées sont évincées
+            'cache_max_size_kb': 5120,
+            # Budget d'une requête (jetons estimés) : petits patchs regroupés, gros patchs découpés
+            'max_request_tokens': 8000,
+            'max_files_per_request': 8,
+            # Réponses reçues en streaming et affichées en direct ; en mode fail_fast, la première
+            # [CRITICAL_ERROR] interrompt toutes les analyses encore en cours (le push sera bloqué)
+            'streaming': True,
+            'live_output': True,
+            'fail_fast': True,
+            # Vérifications locales avant tout appel : syntaxe (Python, YAML) des fichiers poussés,
+            # changements d'espaces ou de commentaires seuls
+            'prefilter': True,
+            # Fichiers générés ignorés (désactivé par défaut) : motifs de chemins, et/ou marqueur
+            # ('@generated', 'DO NOT EDIT'...) dans les premières lignes du fichier
+            'generated_files': [],
+            'generated_markers': False,
+            # Backend du modèle : 'gemini' (service réel) ou 'offline' (stand-in local pour
+            # tests de charge et benchmarks). La variable GEMINI_ANALYZER_BACKEND a priorité.
+            'backend': 'gemini',
+            'offline_backend': {'latency_ms': 800, 'jitter_ms': 300, 'error_rate': 0.0, 'seed': None},
             'analyzable_extensions': ['.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.scss', '.java', '.c', '.cpp', '.php', '.go', '.rb', '.sh', '.json', '.yml', '.yaml'],
         },
         'rules_override': "Aucune règle spécifique n'a été fournie."
@@ -124,167 +153,738 @@ def detect_project_language():
     # 4. Fallback
     return 'General', "Aucun langage principal détecté. Analyse selon les standards généraux du logiciel."
 
-# --- Fonctions de Cache et d'Analyse (inchangées) ---
+# --- Backends du Modèle ---
 
-def load_cache():
-    """Charge le cache depuis le fichier JSON."""
-    if os.path.exists(CACHE_FILE):
+class BackendError(Exception):
+    """Échec d'un appel au modèle, quel que soit le backend (clé API, quota, réseau...)."""
+
+    def __init__(self, title, detail):
+        super().__init__(f"{title}: {detail}")
+        self.title = title
+        self.detail = detail
+
+class ModelBackend:
+    """
+    Interface d'un backend : generate(prompt) retourne le texte complet,
+    generate_stream(prompt) le produit morceau par morceau. Les échecs lèvent BackendError.
+    """
+    name = 'abstract'
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def generate_stream(self, prompt):
+        yield self.generate(prompt)
+
+class GeminiBackend(ModelBackend):
+    """Le service Gemini, via un client google-genai unique (SDK importé à la création)."""
+    name = 'gemini'
+
+    def __init__(self, model_name):
+        from google import genai
+        from google.genai.errors import APIError
+        self.model_name = model_name
+        self.client = genai.Client()
+        self.api_error = APIError
+
+    def wrap_error(self, e):
+        return BackendError("Erreur API Gemini", f"{e}. Vérifiez votre clé API ou votre quota.")
+
+    def generate(self, prompt):
         try:
-            with open(CACHE_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-    return {}
+            return self.client.models.generate_content(model=self.model_name, contents=prompt).text or ""
+        except self.api_error as e:
+            raise self.wrap_error(e) from e
 
-def save_cache(cache_data):
-    """Sauvegarde les données de cache dans le fichier JSON."""
-    try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache_data, f, indent=4)
-    except IOError as e:
-        print(f"{COLOR_RED}ERREUR CACHE:{COLOR_END} Impossible de sauvegarder le cache: {e}", file=sys.stderr)
+    def generate_stream(self, prompt):
+        try:
+            for chunk in self.client.models.generate_content_stream(model=self.model_name, contents=prompt):
+                yield chunk.text or ""
+        except self.api_error as e:
+            raise self.wrap_error(e) from e
 
-def get_file_hash(file_path):
-    """Génère le hash SHA256 du contenu d'un fichier."""
+class OfflineBackend(ModelBackend):
+    """
+    Stand-in local du modèle pour les tests de charge et les benchmarks, sans réseau ni clé API :
+    latence moyenne 'latency_ms' ± 'jitter_ms' (uniforme), échec avec la probabilité 'error_rate'.
+    Les réponses sont bien formées : 'CODE_VALIDÉ' par fichier, avec les marqueurs des requêtes groupées.
+    """
+    name = 'offline'
+
+    def __init__(self, latency_ms=800, jitter_ms=300, error_rate=0.0, seed=None, chunks=8):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.chunks = max(1, chunks)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """(durée de l'appel en secondes, échec ?) ; le générateur aléatoire est partagé entre threads."""
+        with self.lock:
+            delay_ms = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fails = self.rng.random() < self.error_rate
+        return max(0.0, delay_ms) / 1000, fails
+
+    def respond(self, prompt):
+        paths = re.findall(r'^### Fichier: (.+)$', prompt, re.MULTILINE)
+        if not paths:
+            return "CODE_VALIDÉ"
+        return "\n".join(f"=== FICHIER: {path} ===\nCODE_VALIDÉ" for path in paths)
+
+    def fail(self):
+        raise BackendError("Erreur du backend hors ligne", f"échec simulé (error_rate={self.error_rate}).")
+
+    def generate(self, prompt):
+        delay, fails = self.draw()
+        time.sleep(delay)
+        if fails:
+            self.fail()
+        return self.respond(prompt)
+
+    def generate_stream(self, prompt):
+        delay, fails = self.draw()
+        text = self.respond(prompt)
+        size = -(-len(text) // self.chunks)
+        for start in range(0, len(text), size):
+            time.sleep(delay / self.chunks)
+            if fails:
+                self.fail()
+            yield text[start:start + size]
+
+def get_backend_name(config):
+    return os.getenv('GEMINI_ANALYZER_BACKEND') or config['analyzer'].get('backend', 'gemini')
+
+OFFLINE_BACKEND_OPTIONS = ('latency_ms', 'jitter_ms', 'error_rate', 'seed', 'chunks')
+
+def create_backend(config):
+    """Backend choisi par la configuration (ou GEMINI_ANALYZER_BACKEND)."""
+    name = get_backend_name(config)
+    if name == 'gemini':
+        return GeminiBackend(config['analyzer']['model_name'])
+    if name == 'offline':
+        options = config['analyzer'].get('offline_backend') or {}
+        unknown = sorted(set(options) - set(OFFLINE_BACKEND_OPTIONS))
+        if unknown:
+            print(f"{COLOR_YELLOW}WARN:{COLOR_END} Options inconnues ignorées dans offline_backend : {', '.join(unknown)}.", file=sys.stderr)
+        return OfflineBackend(**{key: value for key, value in options.items() if key in OFFLINE_BACKEND_OPTIONS})
+    raise ValueError(f"Backend de modèle inconnu : '{name}' (attendu : 'gemini' ou 'offline').")
+
+# --- Limitation du débit vers le modèle ---
+
+class TokenBucket:
+    """
+    Seau à jetons partagé entre les threads d'analyse : 'rate' jetons par seconde,
+    au plus 'capacity' d'avance. acquire() bloque jusqu'à ce qu'un jeton soit disponible,
+    ou retourne False si 'stop_event' est levé pendant l'attente.
+    'clock' et 'sleep' sont remplaçables (horloge contrôlée dans les tests).
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if stop_event is None:
+                self.sleep(wait)
+            elif stop_event.wait(wait):
+                return False
+
+def create_rate_limiter(config):
+    """Construit le limiteur depuis la configuration ; None si aucun quota n'est défini."""
+    requests_per_minute = config['analyzer'].get('requests_per_minute')
+    if not requests_per_minute:
+        return None
+    return TokenBucket(requests_per_minute / 60.0, config['analyzer'].get('burst', 1))
+
+# --- Cache des Analyses (adressé par contenu) ---
+
+def get_cache_key(file_info, config, context, full_rules):
+    """
+    Clé du cache : hash des lignes modifiées du patch, du chemin, des règles et du modèle.
+    Les en-têtes du patch (ids de blobs git, numéros de ligne des hunks) sont exclus :
+    les mêmes changements rebasés ou cherry-pickés retrouvent leur analyse, sans relire le fichier.
+    """
     hasher = hashlib.sha256()
+    for part in (config['analyzer']['model_name'], full_rules, context, file_info['path']):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    for line in file_info['patch'].split('\n'):
+        if line.startswith(('+', '-')) and not line.startswith(('+++ ', '--- ')):
+            hasher.update(line.encode('utf-8', 'ignore'))
+            hasher.update(b'\n')
+    return hasher.hexdigest()
+
+class AnalysisCache:
+    """
+    Cache SQLite des analyses : résultats validés et avertissements, indexés par get_cache_key.
+    Pendant l'analyse, la base n'est que lue : nouveaux résultats et dates d'utilisation restent
+    en mémoire, puis sont écrits en une seule transaction à la fermeture (aucun fichier à moitié
+    écrit, et aucun verrou d'écriture gardé pendant les appels au modèle, qui bloquerait un autre
+    hook lancé en même temps). Au-delà de 'max_size_kb', les entrées les moins récemment
+    utilisées sont supprimées.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_size_kb=5120):
+        self.max_size = max_size_kb * 1024
+        self.lock = threading.Lock()
+        self.pending = {}   # clé -> (statut, résultat), écrits à la fermeture
+        self.used = {}      # clé -> dernière utilisation, écrite à la fermeture
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "result TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.pending:
+                self.used[key] = time.time()
+                return self.pending[key][1]
+            try:
+                row = self.connection.execute("SELECT result FROM analyses WHERE key = ?", (key,)).fetchone()
+            except sqlite3.OperationalError as e:
+                # Base verrouillée par un autre processus (ou illisible) : simple absence du cache
+                print(f"{COLOR_YELLOW}WARN:{COLOR_END} Lecture du cache impossible ({e}).", file=sys.stderr)
+                return None
+            if row is not None:
+                self.used[key] = time.time()
+        return row[0] if row else None
+
+    def put(self, key, status, result):
+        with self.lock:
+            self.pending[key] = (status, result)
+            self.used[key] = time.time()
+
+    def evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM analyses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        for key, size in self.connection.execute("SELECT key, size FROM analyses ORDER BY last_used").fetchall():
+            self.connection.execute("DELETE FROM analyses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def close(self):
+        with self.lock:
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                        [(key, status, result, len(result.encode('utf-8')) + len(key), self.used[key])
+                         for key, (status, result) in self.pending.items()]
+                    )
+                    self.connection.executemany("UPDATE analyses SET last_used = ? WHERE key = ?",
+                                                [(used, key) for key, used in self.used.items()
+                                                 if key not in self.pending])
+                    self.evict()
+            except sqlite3.Error as e:
+                print(f"{COLOR_RED}ERREUR CACHE:{COLOR_END} Impossible de sauvegarder le cache: {e}", file=sys.stderr)
+            finally:
+                self.connection.close()
+
+def open_cache(config):
+    """Ouvre le cache des analyses ; None (analyse sans cache) si le fichier est inutilisable."""
     try:
-        with open(file_path, 'rb') as f: 
-            buf = f.read()
-            hasher.update(buf)
-        return hasher.hexdigest()
-    except (IOError, OSError): 
+        return AnalysisCache(CACHE_FILE, config['analyzer'].get('cache_max_size_kb', 5120))
+    except sqlite3.Error as e:
+        print(f"{COLOR_YELLOW}WARN:{COLOR_END} Cache d'analyse indisponible ({e}). Analyse sans cache.", file=sys.stderr)
         return None
 
-# MODIFIÉ : Mise à jour de la fonction pour utiliser le commit range du hook pre-push
-def get_files_and_patches(config, refs_data=None):
+# Arbre vide de git : base de comparaison quand aucun commit de la branche n'existe sur la remote
+EMPTY_TREE_SHA = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+def get_new_branch_base(local_sha):
+    """Base d'une nouvelle branche : dernier commit déjà présent sur une remote, sinon l'arbre vide."""
+    try:
+        command = ["git", "rev-list", "--boundary", local_sha, "--not", "--remotes"]
+        result = subprocess.run(command, capture_output=True, text=True, check=True, timeout=10)
+    except Exception:
+        return EMPTY_TREE_SHA
+    boundaries = [line[1:] for line in result.stdout.split('\n') if line.startswith('-')]
+    return boundaries[0] if boundaries else EMPTY_TREE_SHA
+
+def get_commit_ranges(refs_data=None):
     """
-    Récupère la liste de tous les fichiers modifiés, filtre et génère le patch.
-    Utilise refs_data (old_ref et new_ref) si fourni par le hook pre-push.
+    Plages de commits à analyser, une par référence poussée (sans doublon).
+    Chaque ligne du hook pre-push a la forme : <ref locale> <sha local> <ref distante> <sha distant>.
     """
-    files_to_process = []
-    
-    # 1. DÉTERMINATION DE LA PLAGE DE COMMITS À ANALYSER
-    
-    if refs_data:
-        # Mode pre-push: Analyse de la plage de commits envoyée via STDIN
-        
-        lines = refs_data.split('\n')
-        # On cherche la dernière ligne significative pour extraire les SHAs
-        last_ref = [x for x in lines if x.strip()][-1].split() if lines else []
-        
-        if len(last_ref) >= 4:
-             # last_ref[1] = SHA du dernier commit connu sur la remote (old_ref)
-             # last_ref[3] = SHA du commit le plus récent à pousser (new_ref)
-             old_ref: str = last_ref[1] 
-             new_ref: str = last_ref[3] 
-             
-             # Si old_ref est 0000... (nouvelle branche), analyser tous les commits.
-             if all(c == '0' for c in old_ref):
-                 commit_range: str = new_ref
-             else:
-                 # Standard push: compare entre old remote HEAD et new local HEAD
-                 commit_range: str = f"{old_ref}..{new_ref}"
+    if not refs_data:
+        # Mode local ou fallback (sans hook): analyse du dernier commit
+        return ["HEAD~1..HEAD"]
+
+    commit_ranges = []
+    has_invalid_line = False
+    for line in refs_data.split('\n'):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) < 4:
+            has_invalid_line = True
+            continue
+
+        local_sha, remote_sha = fields[1], fields[3]
+        if all(c == '0' for c in local_sha):
+            continue  # Suppression d'une branche distante : rien à analyser
+        if all(c == '0' for c in remote_sha):
+            # Nouvelle branche : tous les commits absents de la remote
+            commit_range = f"{get_new_branch_base(local_sha)}..{local_sha}"
         else:
-            print(f"{COLOR_YELLOW}WARN:{COLOR_END} Format de références pre-push inattendu. Utilisation de HEAD~1..HEAD.", file=sys.stderr)
-            commit_range: str = "HEAD~1..HEAD"
-            
-    else:
-        # Mode local ou fallback (sans hook): analyse du dernier commit ou de l'index
-        # Ceci est utilisé si le script est lancé sans être via le hook pre-push
-        commit_range: str = "HEAD~1..HEAD" # Mis à jour pour cohérence et clarté
+            # Standard push: compare entre old remote HEAD et new local HEAD
+            commit_range = f"{remote_sha}..{local_sha}"
+        if commit_range not in commit_ranges:
+            commit_ranges.append(commit_range)
 
-    # 2. COMMANDE GIT DIFF
-    try:
-        # Récupère la liste des fichiers modifiés dans la plage de commits
-        command_files = ["git", "diff", "--name-only", commit_range]
-        result_files = subprocess.run(command_files, capture_output=True, text=True, check=True, timeout=10)
-        files = result_files.stdout.strip().split('\n')
-    except Exception as e:
-        print(f"{COLOR_RED}ERREUR GIT:{COLOR_END} Échec de la commande 'git diff --name-only {commit_range}': {e}", file=sys.stderr)
-        return []
+    if has_invalid_line and not commit_ranges:
+        print(f"{COLOR_YELLOW}WARN:{COLOR_END} Format de références pre-push inattendu. Utilisation de HEAD~1..HEAD.", file=sys.stderr)
+        return ["HEAD~1..HEAD"]
+    return commit_ranges
 
-    # 3. FILTRAGE ET RÉCUPÉRATION DU PATCH
-    for file_path in files:
-        if not file_path or not os.path.exists(file_path): continue
-        
-        analyzable_exts = config['analyzer']['analyzable_extensions']
-        if not any(file_path.lower().endswith(ext) for ext in analyzable_exts): continue
-            
-        try:
-            # Récupère le patch pour la plage de commits, mais uniquement pour le fichier en cours
-            patch_command = ["git", "diff", "--unified=0", commit_range, "--", file_path]
-            patch_result = subprocess.run(patch_command, capture_output=True, text=True, check=True, errors='ignore', timeout=10)
-            patch_content = patch_result.stdout.strip()
-            
-            # Pour un fichier modifié, le patch doit contenir au moins le header du diff et des changements
-            if patch_content.strip():
-                files_to_process.append({ 'path': file_path, 'patch': patch_content })
-        except Exception:
+class PatchParseError(Exception):
+    """Sortie de 'git diff' dont un bloc modifié n'a pas pu être rattaché à un fichier."""
+
+GIT_PATH_ESCAPES = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13, '"': 34, '\\': 92}
+
+def unquote_git_path(text):
+    """Chemin tel qu'écrit par git : entre guillemets, avec échappements C et octets en octal, s'il contient des caractères spéciaux."""
+    if not (len(text) >= 2 and text[0] == text[-1] == '"'):
+        return text
+    raw, body, i = bytearray(), text[1:-1], 0
+    while i < len(body):
+        if body[i] == '\\' and i + 1 < len(body):
+            if body[i + 1] in '01234567':
+                raw.append(int(body[i + 1:i + 4], 8))
+                i += 4
+                continue
+            raw.append(GIT_PATH_ESCAPES.get(body[i + 1], ord(body[i + 1])))
+            i += 2
             continue
+        raw.extend(body[i].encode('utf-8'))
+        i += 1
+    return raw.decode('utf-8', errors='replace')
+
+def strip_diff_prefix(text, prefix):
+    path = unquote_git_path(text)
+    return path[len(prefix):] if path.startswith(prefix) else None
+
+def parse_diff_header(line):
+    """
+    Chemin du fichier d'une ligne 'diff --git a/<chemin> b/<chemin>' (préfixes imposés par iter_patches).
+    Sans guillemets, un chemin peut contenir des espaces : la ligne est découpée en son milieu,
+    ce qui suppose le même chemin des deux côtés (les renommages sont lus sur 'rename to').
+    """
+    rest = line[len('diff --git '):].rstrip('\n')
+    if rest.endswith('"'):
+        start = rest.rfind(' "', 0, len(rest) - 1)
+        return strip_diff_prefix(rest[start + 1:], 'b/') if start != -1 else None
+    half = (len(rest) - 1) // 2
+    if rest[half] == ' ' and rest[:half][2:] == rest[half + 1:][2:]:
+        return strip_diff_prefix(rest[half + 1:], 'b/')
+    return None
+
+def iter_patches(commit_range, analyzable_exts):
+    """
+    Lance un seul 'git diff --unified=0' pour toute la plage et découpe sa sortie,
+    lue au fil de l'eau, en un patch par fichier : (chemin, patch).
+    Le filtrage par extension est confié à git (pathspecs insensibles à la casse).
+    Les préfixes a/ b/ sont imposés (diff.noprefix, diff.mnemonicPrefix et diff.relative
+    de l'utilisateur ignorés) ; le chemin vient de l'en-tête 'diff --git' ou de 'rename/copy to',
+    à défaut de '+++'. Un bloc modifié sans chemin lisible lève PatchParseError : le push
+    ne doit pas passer sans analyse.
+    """
+    command = ["git", "-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", "--no-ext-diff",
+               "--no-relative", "--src-prefix=a/", "--dst-prefix=b/", "--diff-filter=d", commit_range, "--"]
+    command += [f":(icase)*{ext}" for ext in analyzable_exts]
+
+    def finish(file_path, lines, has_hunks):
+        if has_hunks and file_path is None:
+            raise PatchParseError(f"fichier introuvable dans l'en-tête '{lines[0].rstrip()}' ({commit_range})")
+        return ''.join(lines).strip()
+
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors='ignore') as process:
+        file_path, lines, has_hunks, in_header = None, [], False, False
+        for line in process.stdout:
+            if line.startswith('diff --git '):
+                if lines:
+                    patch = finish(file_path, lines, has_hunks)
+                    if has_hunks:
+                        yield file_path, patch
+                file_path, lines, has_hunks, in_header = parse_diff_header(line), [], False, True
+            elif in_header and line.startswith(('rename to ', 'copy to ')):
+                file_path = unquote_git_path(line.split(' to ', 1)[1].rstrip('\n'))
+            elif in_header and line.startswith('+++ '):
+                # Les anciennes versions de git terminent par une tabulation un chemin contenant des espaces
+                file_path = strip_diff_prefix(line[4:].rstrip('\n').removesuffix('\t'), 'b/') or file_path
+            elif line.startswith('@@'):
+                has_hunks, in_header = True, False
+            lines.append(line)
+        if lines:
+            patch = finish(file_path, lines, has_hunks)
+            if has_hunks:
+                yield file_path, patch
+
+        stderr = process.stderr.read()
+        if process.wait(timeout=10) != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+
+# MODIFIÉ : Une seule commande git diff par plage de commits poussée
+def get_files_and_patches(config, refs_data=None):
+    """
+    Récupère la liste de tous les fichiers modifiés, filtre et génère le patch.
+    Utilise refs_data (toutes les lignes du hook pre-push) si fourni ; un fichier
+    modifié dans plusieurs références poussées n'est analysé qu'une fois.
+    'patches' garde chaque patch distinct avec le commit poussé qui le porte ('rev') :
+    le pré-filtre lit le fichier à ce commit, et le découpage traite chaque patch à part.
+    Lève PatchParseError si la sortie de git n'a pas pu être découpée par fichier.
+    """
+    analyzable_exts = config['analyzer']['analyzable_extensions']
+    patches = {}
 
-    return files_to_process
+    for commit_range in get_commit_ranges(refs_data):
+        rev = commit_range.split('..')[-1]
+        try:
+            for file_path, patch_content in iter_patches(commit_range, analyzable_exts):
+                # Pour un fichier modifié, le patch doit contenir au moins le header du diff et des changements
+                if not patch_content:
+                    continue
+                known = patches.setdefault(file_path, [])
+                if all(patch['patch'] != patch_content for patch in known):
+                    known.append({'rev': rev, 'patch': patch_content})
+        except PatchParseError:
+            raise
+        except Exception as e:
+            print(f"{COLOR_RED}ERREUR GIT:{COLOR_END} Échec de la commande 'git diff --unified=0 {commit_range}': {e}", file=sys.stderr)
+
+    return [{'path': file_path, 'patch': '\n'.join(patch['patch'] for patch in known), 'patches': known}
+            for file_path, known in patches.items()]
 
 # --- Analyse Code avec Gemini (inchangée) ---
-def analyze_code_with_gemini(file_info, config, context, cache, full_rules):
-    """Analyse le patch avec Gemini, en utilisant le cache si possible."""
-    
-    file_path = file_info['path'] 
-    patch_content = file_info['patch']
-    current_hash = get_file_hash(file_path)
-    
-    # 1. VÉRIFICATION DU CACHE
-    if current_hash and file_path in cache and cache[file_path]['sha256'] == current_hash and cache[file_path]['status'] == 'CODE_VALIDÉ':
-        return "CODE_VALIDÉ", True 
+def store_in_cache(cache, cache_key, result):
+    """Mémorise validations et avertissements ; une erreur critique est toujours réanalysée."""
+    if cache is None:
+        return
+    if "CODE_VALIDÉ" in result:
+        cache.put(cache_key, 'CODE_VALIDÉ', result)
+    elif "[WARNING]" in result and "[CRITICAL_ERROR]" not in result:
+        cache.put(cache_key, 'WARNING', result)
 
-    # 2. AUCUN CACHE: Procède à l'analyse Gemini
-    
-    prompt = (
+ANALYSIS_INSTRUCTIONS = (
+    "**Ton analyse doit obligatoirement classer chaque problème en deux niveaux :** "
+    "1. **[CRITICAL_ERROR]** : Erreur de syntaxe, faille de sécurité, bug fonctionnel évident, ou non-conformité à une règle critique. (DOIT bloquer le push) "
+    "2. **[WARNING]** : Problème de style, d'optimisation mineure ou non-conformité à une bonne pratique non critique. (PEUT être ignoré, mais doit être signalé) "
+)
+
+def build_file_prompt(file_info, context, full_rules):
+    """Prompt d'un seul fichier (ou d'une partie de son patch, s'il a été découpé)."""
+    file_path = file_info['path']
+    part_note = ""
+    if file_info.get('parts', 1) > 1:
+        part_note = (f"Ce patch est la partie {file_info['part'] + 1}/{file_info['parts']} des modifications du fichier ; "
+                     "les autres parties sont analysées séparément. ")
+    return (
         "En tant qu'expert en revue de code pour le projet ayant le contexte suivant: (" + context + "). "
-        "Analyse les MODIFICATIONS (patch) fournies pour le fichier '" + file_path + "'. "
+        "Analyse les MODIFICATIONS (patch) fournies pour le fichier '" + file_path + "'. " + part_note +
         
-        "**Règles du Projet :** " + full_rules + " "
+        "**Règles du Projet :** " + full_rules + " " +
         
-        "**Ton analyse doit obligatoirement classer chaque problème en deux niveaux :** "
-        "1. **[CRITICAL_ERROR]** : Erreur de syntaxe, faille de sécurité, bug fonctionnel évident, ou non-conformité à une règle critique. (DOIT bloquer le push) "
-        "2. **[WARNING]** : Problème de style, d'optimisation mineure ou non-conformité à une bonne pratique non critique. (PEUT être ignoré, mais doit être signalé) "
+        ANALYSIS_INSTRUCTIONS +
         
         "Si les changements sont techniquement sains, réponds UNIQUEMENT par la chaîne 'CODE_VALIDÉ'."
         "Sinon, liste CLAIREMENT TOUS les problèmes trouvés en commençant chaque entrée par son tag ([CRITICAL_ERROR] ou [WARNING]). "
         "Propose ensuite une correction de code complète ou des suggestions claires pour chaque problème. "
         f"Voici les modifications (patch):\n\n"
-        f"```diff\n{patch_content}\n```"
+        f"```diff\n{file_info['patch']}\n```"
     )
-    
-    # Appel à l'API
-    try:
-        client = genai.Client() 
-        response = client.models.generate_content(
-            model=config['analyzer']['model_name'],
-            contents=prompt
-        )
-        result = response.text.strip()
+
+BATCH_FILE_MARKER = re.compile(r'^=== FICHIER: (.+?) ===[ \t]*$', re.MULTILINE)
+
+def build_batch_prompt(files, context, full_rules):
+    """Prompt regroupant plusieurs petits patchs ; la réponse est découpée par fichier (BATCH_FILE_MARKER)."""
+    patches = "\n\n".join(f"### Fichier: {f['path']}\n```diff\n{f['patch']}\n```" for f in files)
+    return (
+        "En tant qu'expert en revue de code pour le projet ayant le contexte suivant: (" + context + "). "
+        f"Analyse les MODIFICATIONS (patch) fournies pour les {len(files)} fichiers ci-dessous, chacun indépendamment. "
         
-        # 3. MISE À JOUR DU CACHE
-        if "CODE_VALIDÉ" in result:
-            cache[file_path] = {'sha256': current_hash, 'status': 'CODE_VALIDÉ'}
-        else:
-            if file_path in cache:
-                 del cache[file_path]
-            
-        return result, False
+        "**Règles du Projet :** " + full_rules + " " +
+        
+        ANALYSIS_INSTRUCTIONS +
+        
+        "**Format de réponse obligatoire :** pour CHAQUE fichier, dans l'ordre, écris d'abord une ligne "
+        "'=== FICHIER: <chemin> ===' (chemin exact), puis ton analyse de ce fichier seul : "
+        "UNIQUEMENT la chaîne 'CODE_VALIDÉ' si ses changements sont techniquement sains, sinon TOUS les problèmes "
+        "trouvés, chaque entrée commençant par son tag ([CRITICAL_ERROR] ou [WARNING]), avec une correction ou des suggestions claires. "
+        f"Voici les modifications (patchs):\n\n{patches}"
+    )
+
+def parse_batch_response(text):
+    """Découpe la réponse d'une requête groupée : {chemin: analyse}."""
+    markers = list(BATCH_FILE_MARKER.finditer(text))
+    results = {}
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(text)
+        results[marker.group(1).strip()] = text[marker.end():end].strip()
+    return results
+
+CRITICAL_TAG = "[CRITICAL_ERROR]"
+
+class LiveStream:
+    """
+    Affichage en direct d'une réponse reçue en streaming : chaque ligne complète est écrite
+    préfixée par son fichier. Dans une réponse groupée, le préfixe suit les lignes '=== FICHIER: ... ==='.
+    """
+
+    def __init__(self, label, write):
+        self.label = label
+        self.write = write
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            self.emit(line)
+
+    def emit(self, line):
+        marker = BATCH_FILE_MARKER.match(line)
+        if marker:
+            self.label = marker.group(1).strip()
+        elif line.strip():
+            self.write(f"{COLOR_BLUE}  … {self.label}{COLOR_END} | {line}")
+
+    def close(self):
+        if self.buffer:
+            self.emit(self.buffer)
+            self.buffer = ""
+
+def stream_model(backend, config, prompt, stop_event=None, live=None):
+    """
+    Génération en streaming : les tags sont repérés au fil des morceaux reçus.
+    En mode fail_fast, la première [CRITICAL_ERROR] lève 'stop_event' pour les autres analyses,
+    tandis que celle-ci va à son terme (c'est elle qui explique le blocage).
+    Retourne None si l'analyse est interrompue par une autre.
+    """
+    fail_fast = config['analyzer'].get('fail_fast', True)
+    chunks, tail, raised_stop = [], "", False
+    for text in backend.generate_stream(prompt):
+        if stop_event is not None and stop_event.is_set() and not raised_stop:
+            return None
+        chunks.append(text)
+        if live is not None:
+            live.feed(text)
+        # Le tag peut être coupé entre deux morceaux : la fin du précédent est reprise
+        if fail_fast and stop_event is not None and CRITICAL_TAG in tail + text:
+            raised_stop = True
+            stop_event.set()
+        tail = (tail + text)[-len(CRITICAL_TAG):]
+    if live is not None:
+        live.close()
+    return "".join(chunks).strip()
+
+def call_model(prompt, config, backend=None, rate_limiter=None, stop_event=None, live_write=None, label=""):
+    """
+    Un appel au modèle ; les erreurs sont rendues sous forme de texte d'analyse (non classifié).
+    Retourne None si l'analyse a été interrompue (stop_event levé) avant ou pendant l'appel.
+    """
+    try:
+        if backend is None:
+            backend = create_backend(config)
+        if rate_limiter is not None and not rate_limiter.acquire(stop_event):
+            return None
+        if stop_event is not None and stop_event.is_set():
+            return None
+        if config['analyzer'].get('streaming', False):
+            live = LiveStream(label, live_write) if live_write is not None else None
+            return stream_model(backend, config, prompt, stop_event, live)
+        text = backend.generate(prompt).strip()
+        # Comme en streaming : les requêtes suivantes s'arrêtent sans attendre le fil principal
+        if stop_event is not None and config['analyzer'].get('fail_fast', True) and CRITICAL_TAG in text:
+            stop_event.set()
+        return text
         
-    except APIError as e:
-        return f"{COLOR_RED}Erreur API Gemini:{COLOR_END} {e}. Vérifiez votre clé API ou votre quota.", False
+    except BackendError as e:
+        return f"{COLOR_RED}{e.title}:{COLOR_END} {e.detail}"
     except Exception as e:
-        return f"{COLOR_RED}Erreur inattendue:{COLOR_END} {e}", False
+        return f"{COLOR_RED}Erreur inattendue:{COLOR_END} {e}"
+
+def analyze_code_with_gemini(file_info, config, context, cache, full_rules, backend=None, rate_limiter=None,
+                             stop_event=None, live_write=None):
+    """
+    Analyse le patch avec le modèle (Gemini par défaut), en utilisant le cache si possible.
+    Le backend et le limiteur de débit sont partagés entre les analyses simultanées.
+    Retourne (None, False) si l'analyse a été interrompue par une erreur critique ailleurs.
+    """
+    cache_key = get_cache_key(file_info, config, context, full_rules)
+    
+    # 1. VÉRIFICATION DU CACHE
+    cached_result = cache.get(cache_key) if cache is not None else None
+    if cached_result is not None:
+        return cached_result, True 
+
+    # 2. AUCUN CACHE: Procède à l'analyse Gemini
+    label = file_info['path']
+    if file_info.get('parts', 1) > 1:
+        label += f" ({file_info['part'] + 1}/{file_info['parts']})"
+    result = call_model(build_file_prompt(file_info, context, full_rules), config, backend, rate_limiter,
+                        stop_event, live_write, label)
+    if result is None:
+        return None, False
+    
+    # 3. MISE À JOUR DU CACHE
+    store_in_cache(cache, cache_key, result)
+    return result, False
+
+def analyze_request(pieces, config, context, full_rules, backend=None, rate_limiter=None, stop_event=None, live_write=None):
+    """
+    Analyse une requête préparée par pack_requests : un fichier (ou une partie de patch) seul,
+    ou plusieurs petits fichiers en un seul appel. Retourne une analyse par morceau, dans l'ordre.
+    Un fichier absent de la réponse groupée est réanalysé seul. None pour un morceau interrompu.
+    """
+    if len(pieces) == 1:
+        return [analyze_code_with_gemini(pieces[0], config, context, None, full_rules, backend, rate_limiter,
+                                         stop_event, live_write)[0]]
+
+    text = call_model(build_batch_prompt(pieces, context, full_rules), config, backend, rate_limiter,
+                      stop_event, live_write, f"lot de {len(pieces)} fichiers")
+    if text is None:
+        return [None] * len(pieces)
+    if not BATCH_FILE_MARKER.search(text) and "[CRITICAL_ERROR]" not in text and "[WARNING]" not in text \
+            and "CODE_VALIDÉ" not in text:
+        return [text] * len(pieces)  # Erreur d'appel : elle concerne tous les fichiers du lot
+    by_path = parse_batch_response(text)
+    return [
+        by_path[piece['path']] if by_path.get(piece['path'])
+        else analyze_code_with_gemini(piece, config, context, None, full_rules, backend, rate_limiter,
+                                      stop_event, live_write)[0]
+        for piece in pieces
+    ]
+
+# --- Préparation des Requêtes (budget de jetons) ---
+
+def estimate_tokens(text):
+    """Estimation grossière, sans tokenizer : environ 4 caractères par jeton."""
+    return len(text) // 4 + 1
+
+def split_patch(patch, max_tokens):
+    """
+    Découpe un patch trop volumineux aux frontières de hunks ('@@'), l'en-tête du diff
+    étant répété dans chaque morceau. Un hunk qui dépasse à lui seul le budget est coupé
+    entre deux lignes, son en-tête '@@' repris en tête de la suite. Plusieurs diffs mis
+    bout à bout (même fichier, plusieurs références poussées) sont découpés chacun à part.
+    """
+    lines = patch.split('\n')
+    sections = [i for i, line in enumerate(lines) if line.startswith('diff --git ')]
+    if len(sections) > 1:
+        return [chunk for start, end in zip(sections, sections[1:] + [len(lines)])
+                for chunk in split_patch('\n'.join(lines[start:end]).strip('\n'), max_tokens)]
+    first_hunk = next((i for i, line in enumerate(lines) if line.startswith('@@')), len(lines))
+    header, hunks = lines[:first_hunk], []
+    for line in lines[first_hunk:]:
+        if line.startswith('@@'):
+            hunks.append([line])
+        else:
+            hunks[-1].append(line)
+
+    header_tokens = estimate_tokens('\n'.join(header))
+    budget = max(1, max_tokens - header_tokens)
+    chunks, current, current_tokens = [], [], 0
+    for hunk in hunks:
+        pieces = [hunk]
+        if estimate_tokens('\n'.join(hunk)) > budget:
+            pieces, piece, piece_tokens = [], [hunk[0]], estimate_tokens(hunk[0])
+            for line in hunk[1:]:
+                line_tokens = estimate_tokens(line)
+                if len(piece) > 1 and piece_tokens + line_tokens > budget:
+                    pieces.append(piece)
+                    piece, piece_tokens = [hunk[0]], estimate_tokens(hunk[0])
+                piece.append(line)
+                piece_tokens += line_tokens
+            pieces.append(piece)
+        for piece in pieces:
+            piece_tokens = estimate_tokens('\n'.join(piece))
+            if current and current_tokens + piece_tokens > budget:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.extend(piece)
+            current_tokens += piece_tokens
+    if current or not chunks:
+        chunks.append(current)
+    return ['\n'.join(header + chunk) for chunk in chunks]
+
+def pack_requests(indexed_files, config):
+    """
+    Répartit les patchs (index, fichier) en requêtes : les petits patchs sont regroupés
+    jusqu'au budget 'max_request_tokens' (et 'max_files_per_request'), un patch qui dépasse
+    le budget est découpé en plusieurs requêtes, le patch de chaque référence poussée à part.
+    Chaque morceau garde l'index de son fichier et sa position ('part', 'parts') pour
+    réassembler les analyses.
+    """
+    budget = config['analyzer'].get('max_request_tokens', 8000)
+    max_files = config['analyzer'].get('max_files_per_request', 8)
+    requests, batch, batch_tokens = [], [], 0
+
+    for index, file_info in indexed_files:
+        tokens = estimate_tokens(file_info['patch'])
+        if tokens > budget:
+            chunks = [chunk for patch in get_file_patches(file_info) for chunk in split_patch(patch['patch'], budget)]
+            for part, chunk in enumerate(chunks):
+                requests.append([{'index': index, 'path': file_info['path'], 'patch': chunk,
+                                  'part': part, 'parts': len(chunks)}])
+            continue
+        if batch and (batch_tokens + tokens > budget or len(batch) >= max_files):
+            requests.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append({'index': index, 'path': file_info['path'], 'patch': file_info['patch'], 'part': 0, 'parts': 1})
+        batch_tokens += tokens
+    if batch:
+        requests.append(batch)
+    return requests
+
+def merge_part_results(results):
+    """Réassemble les analyses des parties d'un patch découpé."""
+    if len(results) == 1:
+        return results[0]
+    problems = [f"[Partie {part + 1}/{len(results)}]\n{result}" for part, result in enumerate(results)
+                if "CODE_VALIDÉ" not in result]
+    return "\n\n".join(problems) if problems else "CODE_VALIDÉ"
+
+def check_patch_size(file_info, config):
+    """
+    Avertissement (sans appel au modèle) si les modifications poussées du fichier dépassent
+    max_file_size_kb ; None sinon. C'est la taille du patch qui compte, pas celle du fichier :
+    une petite modification d'un gros fichier est analysée normalement.
+    """
+    max_size_kb = config['analyzer'].get('max_file_size_kb')
+    if not max_size_kb:
+        return None
+    size_kb = sum(len(patch['patch'].encode('utf-8')) for patch in get_file_patches(file_info)) / 1024
+    if size_kb > max_size_kb:
+        return f"[WARNING] Modifications de {size_kb:.0f} Ko, au-delà de max_file_size_kb ({max_size_kb} Ko) : analyse par le modèle ignorée."
+    return None
 
 
 # --- Fonction d'Envoi d'E-mail (avec correction de style) ---
 
-def send_push_rejection_email(recipient_email, reason_summary, detailed_report, user_prefs, user_name):
+def send_push_rejection_email(recipient_email, reason_summary, detailed_report, user_prefs, user_name, backend=None):
     """
     Envoie un e-mail au développeur avec le rapport de l'analyse, formaté en HTML stylisé.
     Le message est personnalisé selon l'intérêt de l'utilisateur (sans le mentionner).
+    Le texte de motivation est rédigé par 'backend' (par défaut, Gemini).
     """
     
     # Récupération des détails SMTP (depuis l'environnement)
@@ -305,7 +905,8 @@ def send_push_rejection_email(recipient_email, reason_summary, detailed_report,
     motivational_text = reason_summary
     
     try:
-        client = genai.Client()
+        if backend is None:
+            backend = GeminiBackend('gemini-2.5-flash')
         
         prompt_motivation = (
             f"L'utilisateur a un intérêt personnel pour '{interest}'. "
@@ -314,11 +915,7 @@ def send_push_rejection_email(recipient_email, reason_summary, detailed_report,
             f"Ce texte doit utiliser une ANALOGIE tirée de son centre d'intérêt pour motiver l'utilisateur à corriger le code et à réussir. "
         )
         
-        response_motivation = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt_motivation
-        )
-        motivational_text = response_motivation.text.strip()
+        motivational_text = backend.generate(prompt_motivation).strip()
         
     except Exception as e:
         print(f"[{COLOR_YELLOW}WARN:{COLOR_END}] Échec de la génération du texte motivant par Gemini: {e}. Utilisation du résumé standard.")
@@ -407,6 +1004,366 @@ def send_push_rejection_email(recipient_email, reason_summary, detailed_report,
         print(f"{COLOR_RED}ERREUR EMAIL:{COLOR_END} Impossible d'envoyer l'e-mail à {recipient_email}: {e}", file=sys.stderr)
 
 
+# --- Pré-filtre Local (sans appel au modèle) ---
+
+PREFILTER_VALID = "CODE_VALIDÉ (pré-filtre local)"
+
+# Marqueurs d'un fichier généré, cherchés dans ses premières lignes seulement (option generated_markers)
+GENERATED_MARKERS = ('@generated', 'DO NOT EDIT', 'AUTO-GENERATED', 'Code generated by')
+GENERATED_MARKER_LINES = 5
+
+# Syntaxe des commentaires selon l'extension : commentaires de ligne, et blocs /* ... */
+HASH_COMMENTS = ('#',)
+C_COMMENTS = ('//',)
+COMMENT_SYNTAX = {
+    '.py': (HASH_COMMENTS, False), '.sh': (HASH_COMMENTS, False), '.rb': (HASH_COMMENTS, False),
+    '.yml': (HASH_COMMENTS, False), '.yaml': (HASH_COMMENTS, False),
+    '.js': (C_COMMENTS, True), '.jsx': (C_COMMENTS, True), '.ts': (C_COMMENTS, True), '.tsx': (C_COMMENTS, True),
+    '.java': (C_COMMENTS, True), '.c': (C_COMMENTS, True), '.cpp': (C_COMMENTS, True), '.go': (C_COMMENTS, True),
+    '.scss': (C_COMMENTS, True), '.css': ((), True), '.php': (C_COMMENTS + HASH_COMMENTS, True),
+}
+
+def get_file_patches(file_info):
+    """Patchs distincts d'un fichier avec leur commit ('rev' None : fichier de la copie de travail)."""
+    return file_info.get('patches') or [{'rev': None, 'patch': file_info['patch']}]
+
+def read_pushed_files(specs):
+    """
+    Contenu des fichiers [(rev, chemin)] tels qu'ils ont été poussés, lus dans git par un seul
+    'git cat-file --batch' (la copie de travail peut différer du commit poussé) ; None si absent.
+    Sans 'rev', le fichier est lu dans la copie de travail.
+    """
+    contents = [None] * len(specs)
+    batch = [(i, f"{rev}:{path}") for i, (rev, path) in enumerate(specs) if rev and '\n' not in path]
+    if batch:
+        try:
+            output = subprocess.run(["git", "cat-file", "--batch"], input=''.join(f"{spec}\n" for _, spec in batch).encode('utf-8'),
+                                    capture_output=True, check=True, timeout=30).stdout
+        except Exception:
+            output = b""
+        position = 0
+        for i, _ in batch:
+            end = output.find(b'\n', position)
+            if end == -1:
+                break
+            header = output[position:end]
+            position = end + 1
+            if header.endswith((b' missing', b' ambiguous')):
+                continue  # Fichier absent de ce commit : rien à lire
+            fields = header.split()
+            size = int(fields[2])
+            if fields[1] == b'blob':
+                contents[i] = output[position:position + size].decode('utf-8', errors='replace')
+            position += size + 1
+    for i, (rev, path) in enumerate(specs):
+        if not rev:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    contents[i] = f.read()
+            except OSError:
+                pass
+    return contents
+
+def read_file_sources(file_info):
+    """Contenu du fichier à chacun de ses commits poussés (dans l'ordre de get_file_patches)."""
+    return read_pushed_files([(patch['rev'], file_info['path']) for patch in get_file_patches(file_info)])
+
+def get_changed_hunks(patch):
+    """Lignes retirées et ajoutées de chaque hunk d'un patch unifié : [(retirées, ajoutées)]."""
+    hunks = []
+    for line in patch.split('\n'):
+        if line.startswith('@@'):
+            hunks.append(([], []))
+        elif hunks and line.startswith('-'):
+            hunks[-1][0].append(line[1:])
+        elif hunks and line.startswith('+'):
+            hunks[-1][1].append(line[1:])
+    return hunks
+
+# Langages où l'indentation a un sens : seuls les espaces de fin de ligne y sont ignorés
+INDENTATION_SENSITIVE = ('.py', '.yml', '.yaml')
+
+def is_whitespace_only_change(file_path, removed, added):
+    """
+    Mêmes lignes, dans le même ordre, aux espaces de bord près (fins de ligne, lignes vides, et
+    indentation hors Python/YAML). Les espaces à l'intérieur d'une ligne comptent : ils peuvent être
+    dans une chaîne. À appliquer hunk par hunk : une ligne déplacée d'un hunk à l'autre est un changement.
+    """
+    keep_indentation = file_path.lower().endswith(INDENTATION_SENSITIVE)
+    normalize = lambda lines: [line.rstrip() if keep_indentation else line.strip() for line in lines if line.strip()]
+    return normalize(removed) == normalize(added)
+
+def is_comment_block(file_path, lines):
+    """
+    Toutes les lignes non vides sont entièrement des commentaires : commentaire de ligne, ou bloc
+    '/* ... */' sans code après sa fermeture. Une suite de bloc (' * ...') n'est acceptée que si
+    l'ouverture '/*' fait partie des mêmes lignes : sans elle, rien ne prouve qu'on est dans un commentaire.
+    """
+    syntax = COMMENT_SYNTAX.get(os.path.splitext(file_path)[1].lower())
+    if not syntax:
+        return False
+    line_prefixes, block_comments = syntax
+    in_block = False
+    for line in lines:
+        text = line.strip()
+        if in_block:
+            if '*/' in text:
+                in_block = False
+                if text[text.index('*/') + 2:].strip():
+                    return False
+        elif not text or (line_prefixes and text.startswith(line_prefixes)):
+            continue
+        elif block_comments and text.startswith('/*'):
+            end = text.find('*/', 2)
+            if end == -1:
+                in_block = True
+            elif text[end + 2:].strip():
+                return False
+        else:
+            return False
+    return True
+
+def is_comment_only_change(file_path, removed, added):
+    return is_comment_block(file_path, removed) and is_comment_block(file_path, added)
+
+def is_generated_file(file_path, sources, added, config):
+    """
+    Fichier généré, selon la configuration seulement (désactivé par défaut) : chemin correspondant
+    à un motif de 'generated_files', ou, avec 'generated_markers', marqueur dans les premières lignes
+    de chaque version poussée. Un marqueur ajouté par le patch lui-même ne compte pas.
+    """
+    analyzer_config = config['analyzer']
+    for pattern in analyzer_config.get('generated_files') or []:
+        if fnmatch.fnmatch(file_path, pattern) or ('/' not in pattern and fnmatch.fnmatch(os.path.basename(file_path), pattern)):
+            return True
+    if not analyzer_config.get('generated_markers', False) or not sources or None in sources:
+        return False
+    if any(marker in line for line in added for marker in GENERATED_MARKERS):
+        return False
+    return all(any(marker in head for marker in GENERATED_MARKERS)
+               for head in ('\n'.join(source.split('\n', GENERATED_MARKER_LINES)[:GENERATED_MARKER_LINES]) for source in sources))
+
+def check_syntax(file_path, source):
+    """
+    Erreur de syntaxe (Python, YAML) du fichier, ou None. Le YAML est vérifié sans construire
+    d'objets : les tags propres à un outil (!Ref, !reference...) sont valides. Le JSON n'est pas
+    vérifié ici : JSONC (commentaires, virgules finales, tsconfig.json...) est laissé au modèle.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension == '.py':
+            # Même vérification que py_compile, sans écrire de .pyc
+            compile(source, file_path, 'exec', dont_inherit=True)
+        elif extension in ('.yml', '.yaml'):
+            for _ in yaml.compose_all(source, Loader=yaml.BaseLoader):
+                pass
+    except SyntaxError as e:
+        return f"ligne {e.lineno}: {e.msg}"
+    except yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None)
+        return f"ligne {mark.line + 1}: {getattr(e, 'problem', None) or e}" if mark else str(e)
+    except (ValueError, RecursionError) as e:
+        return str(e)
+    return None
+
+def prefilter_patch(file_info, config, sources=None):
+    """
+    Classement local d'un patch, avant le cache et le modèle :
+    [CRITICAL_ERROR] si une version poussée du fichier ne se compile / ne se charge pas,
+    PREFILTER_VALID s'il n'y a rien à analyser (fichier généré, espaces ou commentaires seuls),
+    None pour passer au modèle. 'sources' : contenus lus par read_file_sources (relus sinon).
+    """
+    if not config['analyzer'].get('prefilter', True):
+        return None
+    file_path = file_info['path']
+    if sources is None:
+        sources = read_file_sources(file_info)
+    hunks = [hunk for patch in get_file_patches(file_info) for hunk in get_changed_hunks(patch['patch'])]
+
+    if is_generated_file(file_path, sources, [line for _, added in hunks for line in added], config):
+        return f"{PREFILTER_VALID} : fichier généré ou lockfile."
+
+    for source in sources:
+        syntax_error = check_syntax(file_path, source) if source is not None else None
+        if syntax_error is not None:
+            return f"[CRITICAL_ERROR] Erreur de syntaxe détectée localement dans '{file_path}' ({syntax_error}). Le fichier ne peut pas être chargé."
+
+    if not hunks:
+        return None
+    if all(is_whitespace_only_change(file_path, removed, added) for removed, added in hunks):
+        return f"{PREFILTER_VALID} : changements d'espaces uniquement."
+    if all(is_whitespace_only_change(file_path, removed, added) or is_comment_only_change(file_path, removed, added)
+           for removed, added in hunks):
+        return f"{PREFILTER_VALID} : changements de commentaires uniquement."
+    return None
+
+
+# --- Affichage du résultat d'un fichier ---
+
+def report_file_result(file_path, result, is_cached, config):
+    """
+    Affiche le résultat d'un fichier ; retourne (fragment de rapport, erreur critique ?).
+    Un résultat None désigne une analyse interrompue.
+    """
+    # Logique de gestion du cache et de l'affichage console
+    if result is None:
+        print(f"[{COLOR_YELLOW}⏭{COLOR_END}] {file_path} : Analyse interrompue (erreur critique détectée ailleurs).")
+        return "", False
+    if is_cached and "CODE_VALIDÉ" in result:
+        print(f"[{COLOR_BLUE}♻️ CACHE{COLOR_END}] {file_path} : Validation réutilisée.")
+        return "", False
+    if result.startswith(PREFILTER_VALID):
+        print(f"[{COLOR_GREEN}✅{COLOR_END}] {file_path} : Ignoré par le pré-filtre local ({result[len(PREFILTER_VALID) + 3:].rstrip('.')}).")
+        return "", False
+    if "CODE_VALIDÉ" in result:
+        print(f"[{COLOR_GREEN}✅{COLOR_END}] {file_path} : Code validé par Gemini.")
+        return "", False
+
+    has_critical_error = False
+    if "[CRITICAL_ERROR]" in result:
+        print(f"[{COLOR_RED}🛑{COLOR_END}] {file_path} : {COLOR_RED}ERREURS CRITIQUES DÉTECTÉES !{COLOR_END}")
+        has_critical_error = True
+    elif "[WARNING]" in result:
+        cached_label = f" ({COLOR_BLUE}♻️ CACHE{COLOR_END})" if is_cached else ""
+        print(f"[{COLOR_YELLOW}⚠️{COLOR_END}] {file_path} : {COLOR_YELLOW}Avertissements !{COLOR_END}{cached_label}")
+    else:
+        is_strict = config['analyzer'].get('strict_untagged_output', False)
+        if is_strict:
+            print(f"[{COLOR_RED}❌{COLOR_END}] {file_path} : {COLOR_RED}PROBLÈME DÉTECTÉ (Output non classifié - Mode strict) !{COLOR_END}")
+            has_critical_error = True
+        else:
+            print(f"[{COLOR_YELLOW}⚠️{COLOR_END}] {file_path} : {COLOR_YELLOW}Avertissements (non classifiés) !{COLOR_END}")
+
+    print("-" * 50)
+    print(result)
+    print("-" * 50)
+    return f"\n--- Fichier: {file_path} ---\n{result}\n", has_critical_error
+
+
+# --- Analyse d'un Ensemble de Patchs ---
+
+def get_project_rules(config):
+    """Langage détecté, contexte et règles complètes (langage + configuration) pour les prompts."""
+    language, context = detect_project_language()
+    
+    dynamic_rules = LANGUAGE_RULES.get(language, LANGUAGE_RULES['General'])
+    project_rules_override = config.get('rules_override', "Aucun override spécifié.")
+    
+    full_rules = f"Règles Spécifiques ({language}): {dynamic_rules}. Règle du Fichier Config: {project_rules_override}"
+    return language, context, full_rules
+
+def run_analysis(files_to_analyze, config, context, full_rules, backend, cache):
+    """
+    Analyse complète d'un ensemble de patchs (pré-filtre, cache, regroupement, appels au modèle)
+    avec affichage ordonné des résultats. Retourne (erreur critique ?, rapport détaillé).
+    """
+    has_critical_error = False
+    full_report = "" 
+    
+    print(f"{COLOR_BLUE}Fichiers à analyser ({len(files_to_analyze)}) : {COLOR_END}{', '.join([f['path'] for f in files_to_analyze])}")
+
+    # Un seul backend pour toutes les analyses, lancées en parallèle dans un pool borné
+    rate_limiter = create_rate_limiter(config)
+    fail_fast = config['analyzer'].get('fail_fast', True)
+    stop_event = threading.Event()
+    print_lock = threading.Lock()
+
+    def live_write(line):
+        with print_lock:
+            tqdm.write(line)
+
+    if not config['analyzer'].get('live_output', True):
+        live_write = None
+
+    progress_bar = tqdm(
+        total=len(files_to_analyze), 
+        desc=f"{COLOR_BLUE}Analyse en cours{COLOR_END}", 
+        unit="file", 
+        ncols=100,
+        bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
+    )
+    
+    # Les résultats sont affichés dans l'ordre des fichiers, dès que tous les précédents sont prêts :
+    # le rapport reste identique d'une exécution à l'autre, quel que soit l'ordre d'arrivée.
+    results = [None] * len(files_to_analyze)
+    next_to_report = 0
+    
+    def report_ready_results():
+        nonlocal next_to_report, full_report, has_critical_error
+        with print_lock:
+            progress_bar.clear()
+            while next_to_report < len(results) and results[next_to_report] is not None:
+                result, is_cached = results[next_to_report]
+                report, is_critical = report_file_result(files_to_analyze[next_to_report]['path'], result, is_cached, config)
+                full_report += report
+                has_critical_error = has_critical_error or is_critical
+                next_to_report += 1
+            progress_bar.display()
+
+    # Pré-filtre local, patchs trop volumineux et analyses en cache : réglés sans appel au modèle.
+    # Le pré-filtre passe toujours en premier : une erreur de syntaxe bloque, quelle que soit la taille.
+    # Les fichiers sont lus tels que poussés (un seul 'git cat-file' pour tous), pas dans la copie de travail
+    cache_keys = [get_cache_key(file_info, config, context, full_rules) for file_info in files_to_analyze]
+    specs = [[(patch['rev'], file_info['path']) for patch in get_file_patches(file_info)] for file_info in files_to_analyze]
+    contents = iter(read_pushed_files([spec for file_specs in specs for spec in file_specs]))
+    pending = []
+    for index, file_info in enumerate(files_to_analyze):
+        sources = [next(contents) for _ in specs[index]]
+        local_result = prefilter_patch(file_info, config, sources) or check_patch_size(file_info, config)
+        cached_result = cache.get(cache_keys[index]) if cache is not None and local_result is None else None
+        if local_result is not None:
+            results[index] = (local_result, False)
+            if fail_fast and CRITICAL_TAG in local_result:
+                stop_event.set()  # Erreur de syntaxe : le push sera bloqué, inutile d'interroger le modèle
+        elif cached_result is not None:
+            results[index] = (cached_result, True)
+        else:
+            pending.append((index, file_info))
+            continue
+        progress_bar.update(1)
+    report_ready_results()
+
+    # Petits patchs regroupés, gros patchs découpés : chaque requête respecte le budget de jetons
+    requests = pack_requests(pending, config)
+    parts = {index: [] for index, _ in pending}
+    max_workers = max(1, min(config['analyzer'].get('max_concurrency', 1), len(requests) or 1))
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(analyze_request, pieces, config, context, full_rules, backend, rate_limiter,
+                            stop_event, live_write): pieces
+            for pieces in requests
+        }
+        for future in as_completed(futures):
+            pieces = futures[future]
+            piece_results = [None] * len(pieces) if future.cancelled() else future.result()
+            for piece, result in zip(pieces, piece_results):
+                index = piece['index']
+                parts[index].append((piece['part'], result))
+                if len(parts[index]) < piece['parts']:
+                    continue
+                part_results = [result for _, result in sorted(parts[index], key=lambda part: part[0])]
+                if any(result is None for result in part_results):
+                    merged = None  # Interrompue : ni cache, ni rapport
+                else:
+                    merged = merge_part_results(part_results)
+                    store_in_cache(cache, cache_keys[index], merged)
+                    if fail_fast and CRITICAL_TAG in merged:
+                        stop_event.set()
+                results[index] = (merged, False)
+                progress_bar.set_description(f"Analyse de {piece['path'].split('/')[-1]}")
+                progress_bar.update(1)
+            # Push bloqué de toute façon : les requêtes pas encore parties sont abandonnées
+            if stop_event.is_set():
+                for pending_future in futures:
+                    pending_future.cancel()
+            report_ready_results()
+
+    progress_bar.close()
+    return has_critical_error, full_report
+
+
+
 # --------------------------------------------------------------------------------
 # MAIN
 # --------------------------------------------------------------------------------
@@ -415,6 +1372,8 @@ def main():
     
     # 1. LOGIQUE DE CHARGEMENT : CI/CD (GitHub Action) ou Local
     is_ci_cd = os.getenv('CI') == 'true'
+    # La clé API n'est exigée que pour le service réel, pas pour le backend hors ligne
+    config = load_config()
 
     user_email = None
     user_name = None
@@ -427,7 +1386,7 @@ def main():
         user_name = os.getenv("PUSHER_NAME")   
         user_prefs = {'interest': os.getenv("PREF_INTEREST", 'la qualité du code')} 
         
-        if not os.getenv("GEMINI_API_KEY"):
+        if get_backend_name(config) == 'gemini' and not os.getenv("GEMINI_API_KEY"):
             print(f"\n{COLOR_RED}🛑 ERREUR CRITIQUE:{COLOR_END} La variable d'environnement GEMINI_API_KEY n'est pas définie dans la GitHub Action.", file=sys.stderr)
             sys.exit(1)
         
@@ -455,90 +1414,41 @@ def main():
         if not user_email:
              user_email = user_prefs.get('email', None)
 
-        if not os.getenv("GEMINI_API_KEY"):
+        if get_backend_name(config) == 'gemini' and not os.getenv("GEMINI_API_KEY"):
             print(f"\n{COLOR_RED}🛑 ERREUR CRITIQUE:{COLOR_END} La variable d'environnement GEMINI_API_KEY n'est pas définie dans votre .env.", file=sys.stderr)
             sys.exit(1)
 
-    # 2. Initialisation, Détection de Langage et Analyse
-    config = load_config()
-    
-    language, context = detect_project_language()
-    
-    dynamic_rules = LANGUAGE_RULES.get(language, LANGUAGE_RULES['General'])
-    project_rules_override = config.get('rules_override', "Aucun override spécifié.")
-    
-    full_rules = f"Règles Spécifiques ({language}): {dynamic_rules}. Règle du Fichier Config: {project_rules_override}"
+    # 2. Détection de Langage et Analyse
+    language, context, full_rules = get_project_rules(config)
     
     # NOUVEAU: Récupération des commits si en mode pre-push
     # Lit STDIN si le script n'est pas en mode CI/CD et si une donnée est pipée (hook pre-push)
     refs_data = sys.stdin.read().strip() if not is_ci_cd and not sys.stdin.isatty() else None
     
     # MODIFIÉ: Appel de la fonction avec les références si disponibles
-    files_to_analyze = get_files_and_patches(config, refs_data) 
+    try:
+        files_to_analyze = get_files_and_patches(config, refs_data) 
+    except PatchParseError as e:
+        # Des changements existent mais n'ont pas pu être attribués : bloquer plutôt que laisser passer sans analyse
+        print(f"\n{COLOR_RED}🛑 ERREUR CRITIQUE:{COLOR_END} Sortie de 'git diff' illisible : {e}. Push bloqué, aucun fichier n'a pu être analysé.", file=sys.stderr)
+        sys.exit(1)
     
     # ... (Le reste de la fonction est inchangé) ...
 
     print(f"{COLOR_BLUE}--- 🚀 Démarrage de l'analyse de code par Gemini ({'CI/CD' if is_ci_cd else 'pre-push'}) ---{COLOR_END}")
     print(f"{COLOR_BLUE}Contexte du Projet ({language}): {COLOR_END}{context}")
     
-    cache = load_cache() 
-    
     if not files_to_analyze:
         print(f"\n{COLOR_YELLOW}--- INFO HOOK : Aucun fichier pertinent trouvé. Poursuite. ---{COLOR_END}")
         sys.exit(0)
     
-    has_critical_error = False
-    full_report = "" 
-    
-    print(f"{COLOR_BLUE}Fichiers à analyser ({len(files_to_analyze)}) : {COLOR_END}{', '.join([f['path'] for f in files_to_analyze])}")
-
-    progress_bar = tqdm(
-        files_to_analyze, 
-        desc=f"{COLOR_BLUE}Analyse en cours{COLOR_END}", 
-        unit="file", 
-        ncols=100,
-        bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
-    )
-    
-    # Boucle d'analyse
-    for file_info in progress_bar:
-        file_path = file_info['path'] 
-        progress_bar.set_description(f"Analyse de {file_path.split('/')[-1]}")
-        
-        result, is_cached = analyze_code_with_gemini(file_info, config, context, cache, full_rules) 
-        
-        progress_bar.clear()
-        
-        # Logique de gestion du cache et de l'affichage console
-        if is_cached:
-            print(f"[{COLOR_BLUE}♻️ CACHE{COLOR_END}] {file_path} : Validation réutilisée.")
-        elif "CODE_VALIDÉ" in result:
-            print(f"[{COLOR_GREEN}✅{COLOR_END}] {file_path} : Code validé par Gemini.")
-        else:
-            full_report += f"\n--- Fichier: {file_path} ---\n{result}\n" 
-
-            if "[CRITICAL_ERROR]" in result:
-                print(f"[{COLOR_RED}🛑{COLOR_END}] {file_path} : {COLOR_RED}ERREURS CRITIQUES DÉTECTÉES !{COLOR_END}")
-                has_critical_error = True
-            elif "[WARNING]" in result:
-                print(f"[{COLOR_YELLOW}⚠️{COLOR_END}] {file_path} : {COLOR_YELLOW}Avertissements !{COLOR_END}")
-            else:
-                is_strict = config['analyzer'].get('strict_untagged_output', False)
-                if is_strict:
-                    print(f"[{COLOR_RED}❌{COLOR_END}] {file_path} : {COLOR_RED}PROBLÈME DÉTECTÉ (Output non classifié - Mode strict) !{COLOR_END}")
-                    has_critical_error = True
-                else:
-                    print(f"[{COLOR_YELLOW}⚠️{COLOR_END}] {file_path} : {COLOR_YELLOW}Avertissements (non classifiés) !{COLOR_END}")
-
-            print("-" * 50)
-            print(result)
-            print("-" * 50)
-        
-        progress_bar.display()
-
-    progress_bar.close()
-    
-    save_cache(cache)
+    cache = open_cache(config) 
+    backend = create_backend(config)
+    try:
+        has_critical_error, full_report = run_analysis(files_to_analyze, config, context, full_rules, backend, cache)
+    finally:
+        if cache is not None:
+            cache.close()
 
     # 3. Décision finale et Envoi d'E-mail
     if has_critical_error:
@@ -546,7 +1456,7 @@ def main():
         print(f"\n{COLOR_RED}!!! 🛑 PUSH/COMMIT ANNULÉ : Des ERREURS CRITIQUES ont été détectées. !!!{COLOR_END}")
         
         if user_email:
-            send_push_rejection_email(user_email, reason_summary, full_report, user_prefs, user_name)
+            send_push_rejection_email(user_email, reason_summary, full_report, user_prefs, user_name, backend)
         else:
             print(f"{COLOR_RED}ERREUR EMAIL:{COLOR_END} Impossible de déterminer l'adresse e-mail du destinataire.", file=sys.stderr)
             
@@ -0,0 +1,3 @@
+# historique/__init__.py
+
+from .memoire import HistoriqueResultats, cle_expression, cle_conversion
@@ -0,0 +1,175 @@
+# historique/memoire.py
+
+import ast
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import monotonic, time
+from typing import Any, Callable, Optional
+
+CHEMIN_DEFAUT: str = os.path.join(os.path.expanduser('~'), '.calculatrice_historique.sqlite3')
+TAILLE_MEMOIRE: int = 256     # résultats récents gardés en mémoire
+TAILLE_MAX: int = 10_000      # lignes conservées dans SQLite avant éviction des plus anciennes
+TAILLE_LOT: int = 64          # écritures regroupées par transaction
+DELAI_ECRITURES: float = 1.0  # attente maximale des écritures en file avant de paginer, en secondes
+BITS_ENTIER_JSON: int = 10_000  # au-delà, entier stocké en hexadécimal (int -> str limité à 4300 chiffres)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resultats (
+    cle TEXT PRIMARY KEY,
+    genre TEXT NOT NULL,
+    entree TEXT NOT NULL,
+    resultat TEXT NOT NULL,
+    horodatage REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultats_horodatage ON resultats (horodatage);
+"""
+
+
+def cle_expression(expression: str) -> str:
+    """Forme normalisée d'une expression : '2 +3' et '(2)+3' partagent la même clé."""
+    try:
+        return 'expr:' + ast.unparse(ast.parse(expression, mode='eval'))
+    except (SyntaxError, ValueError, RecursionError):
+        return 'expr:' + expression.strip()
+
+
+def cle_conversion(genre: str, valeur: float, de: str, vers: str) -> str:
+    return 'conv:' + json.dumps([genre, float(valeur), de, vers], ensure_ascii=False)
+
+
+def _encoder(resultat: Any) -> str:
+    """JSON d'un résultat ; complexes et très grands entiers, que JSON n'écrit pas, sont étiquetés."""
+    if isinstance(resultat, complex):
+        resultat = {'complexe': [resultat.real, resultat.imag]}
+    elif isinstance(resultat, int) and resultat.bit_length() > BITS_ENTIER_JSON:
+        resultat = {'entier': hex(resultat)}
+    return json.dumps(resultat, default=str)
+
+
+def _decoder(texte: str) -> Any:
+    resultat = json.loads(texte)
+    if isinstance(resultat, dict):
+        if 'complexe' in resultat:
+            return complex(*resultat['complexe'])
+        if 'entier' in resultat:
+            return int(resultat['entier'], 16)
+    return resultat
+
+
+class HistoriqueResultats:
+    """
+    Historique et mémo des calculs : un tampon borné des résultats récents en mémoire,
+    adossé à un fichier SQLite. Les écritures passent par une file et sont regroupées
+    par lots dans un thread dédié ; la lecture d'un résultat déjà connu, même calculé lors
+    d'une session précédente, évite de le recalculer.
+    """
+
+    def __init__(self, chemin: str = CHEMIN_DEFAUT, taille_memoire: int = TAILLE_MEMOIRE,
+                 taille_max: int = TAILLE_MAX, taille_lot: int = TAILLE_LOT) -> None:
+        self.chemin = chemin
+        self.taille_memoire = taille_memoire
+        self.taille_max = taille_max
+        self.taille_lot = taille_lot
+        self._recents: OrderedDict[str, Any] = OrderedDict()
+        self._file: queue.Queue = queue.Queue()
+        self._verrou_lecture = threading.Lock()
+
+        self._lecture = sqlite3.connect(chemin, check_same_thread=False)
+        self._lecture.execute("PRAGMA journal_mode=WAL")
+        self._lecture.executescript(_SCHEMA)
+
+        self._ecrivain = threading.Thread(target=self._ecrire, daemon=True, name="historique-sqlite")
+        self._ecrivain.start()
+
+    def _retenir(self, cle: str, resultat: Any) -> None:
+        self._recents[cle] = resultat
+        self._recents.move_to_end(cle)
+        while len(self._recents) > self.taille_memoire:
+            self._recents.popitem(last=False)
+
+    def chercher(self, cle: str) -> Optional[Any]:
+        if cle in self._recents:
+            self._recents.move_to_end(cle)
+            return self._recents[cle]
+        with self._verrou_lecture:
+            ligne = self._lecture.execute("SELECT resultat FROM resultats WHERE cle = ?", (cle,)).fetchone()
+        if ligne is None:
+            return None
+        resultat = _decoder(ligne[0])
+        self._retenir(cle, resultat)
+        return resultat
+
+    def enregistrer(self, cle: str, genre: str, entree: str, resultat: Any) -> None:
+        self._retenir(cle, resultat)
+        if self._ecrivain.is_alive():  # sans écrivain, la file grossirait sans fin
+            self._file.put((cle, genre, entree, _encoder(resultat), time()))
+
+    def memoiser(self, cle: str, genre: str, entree: str, calcul: Callable[[], Any]) -> Any:
+        resultat = self.chercher(cle)
+        if resultat is None:
+            resultat = calcul()
+            self.enregistrer(cle, genre, entree, resultat)
+        return resultat
+
+    def page(self, numero: int, taille: int = 20) -> list[tuple[str, str, Any]]:
+        """Page 'numero' (0 = la plus récente) de l'historique : [(genre, entrée, résultat)]."""
+        self._attendre_ecritures()  # les écritures en attente d'abord, pour une pagination cohérente
+        with self._verrou_lecture:
+            lignes = self._lecture.execute(
+                "SELECT genre, entree, resultat FROM resultats ORDER BY horodatage DESC LIMIT ? OFFSET ?",
+                (taille, numero * taille)
+            ).fetchall()
+        return [(genre, entree, _decoder(resultat)) for genre, entree, resultat in lignes]
+
+    def _attendre_ecritures(self, delai: float = DELAI_ECRITURES) -> bool:
+        """
+        Attend que la file d'écriture soit vide, au plus 'delai' secondes : appelé depuis
+        l'interface, il ne doit jamais bloquer, même si le thread d'écriture s'est arrêté.
+        """
+        echeance = monotonic() + delai
+        with self._file.all_tasks_done:
+            while self._file.unfinished_tasks:
+                reste = echeance - monotonic()
+                if reste <= 0 or not self._ecrivain.is_alive():
+                    return False
+                self._file.all_tasks_done.wait(min(reste, 0.05))
+        return True
+
+    def _ecrire(self) -> None:
+        connexion = sqlite3.connect(self.chemin)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        while True:
+            lot = [self._file.get()]
+            while len(lot) < self.taille_lot:
+                try:
+                    lot.append(self._file.get_nowait())
+                except queue.Empty:
+                    break
+
+            fin = None in lot
+            lignes = [ligne for ligne in lot if ligne is not None]
+            try:
+                with connexion:
+                    connexion.executemany("INSERT OR REPLACE INTO resultats VALUES (?, ?, ?, ?, ?)", lignes)
+                    connexion.execute(
+                        "DELETE FROM resultats WHERE cle IN (SELECT cle FROM resultats ORDER BY horodatage DESC "
+                        "LIMIT -1 OFFSET ?)", (self.taille_max,)
+                    )
+            except sqlite3.Error:
+                pass  # l'historique est un confort : une écriture perdue ne doit pas gêner le calcul
+            finally:
+                for _ in lot:
+                    self._file.task_done()
+            if fin:
+                connexion.close()
+                return
+
+    def fermer(self) -> None:
+        if self._ecrivain.is_alive():
+            self._file.put(None)
+            self._ecrivain.join()
+        self._lecture.close()
@@ -1,6 +1,29 @@
 # main.py
 
-from ui.interface import lancer_interface
+import argparse
+import sys
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Optional
+
+DEBUT = perf_counter()
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calculatrice & Convertisseur.")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Affiche la durée des imports et de la construction de la fenêtre au démarrage, "
+                             "puis les aperçus de résultat qui dépassent leur budget")
+    args = parser.parse_args(arguments)
+
+    from ui.demarrage import ProfilDemarrage
+    profil = ProfilDemarrage(DEBUT) if args.startup_profile else None
+
+    with profil.etape("import ui.interface") if profil is not None else nullcontext():
+        from ui.interface import lancer_interface
+    lancer_interface(profil)
+    return 0
+
 
 if __name__ == "__main__":
-    lancer_interface()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# service.py
+# Service HTTP/JSON sans interface graphique : python service.py --port 8080
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from time import monotonic, time
+from typing import Any, Callable, Optional
+
+from calculator.safe_eval import LimiteDepassee, evaluer_expression
+from converters.currency import convertir_devise
+from converters.dimensions import compiler_conversion
+
+TAILLE_MAX_CORPS: int = 1 << 20  # 1 Mio
+DELAI_REQUETE: float = 2.0       # secondes
+
+Enregistrement = dict[str, Any]
+
+
+def _erreur(e: Exception) -> Enregistrement:
+    return {'erreur': f"{type(e).__name__}: {e}"}
+
+
+def _valider_variables(variables: Any) -> None:
+    """Seuls des nombres sont acceptés : une chaîne ou une liste ferait de 'x * y' une bombe mémoire."""
+    if variables is None:
+        return
+    if not isinstance(variables, dict):
+        raise ValueError("'variables' doit être un objet JSON")
+    for nom, valeur in variables.items():
+        if isinstance(valeur, bool) or not isinstance(valeur, (int, float, complex)):
+            raise ValueError(f"Variable non numérique : {nom} ({type(valeur).__name__})")
+
+
+def _traiter_requetes(traiter: Callable[[dict[str, Any], float], Enregistrement], requetes: list[Any],
+                      echeance: float) -> list[Enregistrement]:
+    """
+    Exécuté dans un processus du pool. 'echeance' (horloge murale, commune aux processus) est celle
+    de toute la requête HTTP : une fois dépassée, le reste du lot n'est pas traité, et le processus
+    est libéré au plus tard quand la requête expire, quelle que soit la taille du lot.
+    """
+    echeance_locale = monotonic() + (echeance - time())
+    resultats = []
+    for requete in requetes:
+        if monotonic() > echeance_locale:
+            resultats.append(_erreur(LimiteDepassee("Délai de la requête dépassé")))
+            continue
+        try:
+            resultats.append(traiter(requete, echeance_locale))
+        except Exception as e:
+            resultats.append(_erreur(e))
+    return resultats
+
+
+def _evaluer_requete(requete: dict[str, Any], echeance: float) -> Enregistrement:
+    return {'resultat': evaluer_expression(requete['expression'], requete.get('variables'), echeance=echeance)}
+
+
+def _convertir_unite(requete: dict[str, Any], echeance: float) -> Enregistrement:
+    # L'analyse des unités est bornée (converters.dimensions) ; l'échéance est vérifiée entre deux requêtes
+    echelle, decalage = compiler_conversion(requete['de'], requete['vers'])
+    return {'resultat': float(requete['valeur']) * echelle + decalage}
+
+
+def _convertir_devise(requete: dict[str, Any]) -> Enregistrement:
+    return {'resultat': convertir_devise(float(requete['montant']), str(requete['de']).upper(),
+                                         str(requete['vers']).upper())}
+
+
+def creer_pool(processus: int) -> ProcessPoolExecutor:
+    """
+    Pool de calcul dont les processus ne sont pas des copies (fork) du serveur : créés à la
+    demande, ils hériteraient des sockets clients ouverts à cet instant, et une connexion
+    fermée par le serveur resterait ouverte côté client.
+    """
+    methodes = multiprocessing.get_all_start_methods()
+    contexte = multiprocessing.get_context('forkserver' if 'forkserver' in methodes else 'spawn')
+    return ProcessPoolExecutor(max_workers=processus, mp_context=contexte)
+
+
+class Service:
+    """
+    Serveur HTTP/1.1 minimal (connexions persistantes) au-dessus d'asyncio.
+    Les évaluations d'expressions et les conversions d'unités (analyse d'expressions d'unités)
+    partent dans un pool de processus, découpées en autant de blocs que de processus : la boucle
+    ne fait jamais de calcul. Seules les conversions de devises, une lecture dans la matrice des
+    taux croisés, restent dans la boucle. Un pool dont un processus est mort est recréé.
+    """
+
+    def __init__(self, processus: Optional[int] = None, delai: float = DELAI_REQUETE) -> None:
+        self.processus = processus or os.cpu_count() or 1
+        self.delai = delai
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.routes: dict[tuple[str, str], Callable[[Any], Any]] = {
+            ('GET', '/sante'): self._sante,
+            ('POST', '/evaluer'): self._evaluer,
+            ('POST', '/convertir/unite'): self._convertir_unites,
+            ('POST', '/convertir/devise'): self._par_lot(_convertir_devise),
+        }
+
+    async def _sante(self, corps: Any) -> Any:
+        return {'statut': 'ok'}
+
+    @staticmethod
+    def _requetes(corps: Any) -> list[dict[str, Any]]:
+        requetes = corps if isinstance(corps, list) else [corps]
+        if not all(isinstance(requete, dict) for requete in requetes):
+            raise ValueError("Chaque requête doit être un objet JSON")
+        return requetes
+
+    async def _repartir(self, traiter: Callable[[dict[str, Any], float], Enregistrement],
+                        requetes: list[dict[str, Any]]) -> list[Enregistrement]:
+        """Traite le lot dans le pool ; si un processus meurt, le pool cassé est remplacé (une seule fois)."""
+        echeance = time() + self.delai
+        boucle = asyncio.get_running_loop()
+        taille_bloc = max(1, -(-len(requetes) // self.processus))
+        blocs = [requetes[i:i + taille_bloc] for i in range(0, len(requetes), taille_bloc)]
+        pool = self.pool
+        try:
+            resultats = await asyncio.gather(*(boucle.run_in_executor(pool, _traiter_requetes, traiter, bloc, echeance)
+                                               for bloc in blocs))
+        except BrokenProcessPool:
+            if self.pool is pool and pool is not None:
+                self.pool = creer_pool(self.processus)
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        return [resultat for bloc in resultats for resultat in bloc]
+
+    async def _evaluer(self, corps: Any) -> Any:
+        requetes = self._requetes(corps)
+        for requete in requetes:
+            _valider_variables(requete.get('variables'))
+        resultats = await self._repartir(_evaluer_requete, requetes)
+        return resultats if isinstance(corps, list) else resultats[0]
+
+    async def _convertir_unites(self, corps: Any) -> Any:
+        resultats = await self._repartir(_convertir_unite, self._requetes(corps))
+        return resultats if isinstance(corps, list) else resultats[0]
+
+    @staticmethod
+    def _par_lot(traiter: Callable[[dict[str, Any]], Enregistrement]) -> Callable[[Any], Any]:
+        async def route(corps: Any) -> Any:
+            requetes = corps if isinstance(corps, list) else [corps]
+            resultats = []
+            for requete in requetes:
+                try:
+                    resultats.append(traiter(requete))
+                except Exception as e:
+                    resultats.append(_erreur(e))
+            return resultats if isinstance(corps, list) else resultats[0]
+        return route
+
+    async def _repondre(self, ecrivain: asyncio.StreamWriter, statut: HTTPStatus, contenu: Any,
+                        garder_ouverte: bool) -> None:
+        corps = json.dumps(contenu, ensure_ascii=False, default=str).encode('utf-8')
+        en_tete = (f"HTTP/1.1 {statut.value} {statut.phrase}\r\n"
+                   f"Content-Type: application/json; charset=utf-8\r\n"
+                   f"Content-Length: {len(corps)}\r\n"
+                   f"Connection: {'keep-alive' if garder_ouverte else 'close'}\r\n\r\n")
+        ecrivain.write(en_tete.encode('ascii') + corps)
+        await ecrivain.drain()
+
+    async def _traiter(self, methode: str, chemin: str, donnees: bytes) -> tuple[HTTPStatus, Any]:
+        route = self.routes.get((methode, chemin.split('?', 1)[0]))
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {'erreur': f"Route inconnue : {methode} {chemin}"}
+        try:
+            corps = json.loads(donnees) if donnees else None
+        except json.JSONDecodeError as e:
+            return HTTPStatus.BAD_REQUEST, {'erreur': f"JSON invalide : {e}"}
+        try:
+            return HTTPStatus.OK, await asyncio.wait_for(route(corps), self.delai)
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {'erreur': f"Délai de {self.delai} s dépassé"}
+        except BrokenProcessPool:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'erreur': "Processus de calcul arrêté ; réessayer la requête"}
+        except (ValueError, TypeError, KeyError) as e:
+            return HTTPStatus.BAD_REQUEST, _erreur(e)
+
+    async def connexion(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    brut = await lecteur.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+
+                lignes = brut.decode('latin-1').split('\r\n')
+                try:
+                    methode, chemin, version = lignes[0].split(' ', 2)
+                except ValueError:
+                    await self._repondre(ecrivain, HTTPStatus.BAD_REQUEST, {'erreur': "Requête HTTP invalide"}, False)
+                    return
+                en_tetes = {}
+                for ligne in lignes[1:]:
+                    if ':' in ligne:
+                        nom, valeur = ligne.split(':', 1)
+                        en_tetes[nom.strip().lower()] = valeur.strip()
+
+                connexion = en_tetes.get('connection', '').lower()
+                garder_ouverte = connexion == 'keep-alive' or (version == 'HTTP/1.1' and connexion != 'close')
+
+                valeur = en_tetes.get('content-length', '') or '0'
+                if not (valeur.isascii() and valeur.isdigit()):
+                    await self._repondre(ecrivain, HTTPStatus.BAD_REQUEST,
+                                         {'erreur': f"Content-Length invalide : {valeur!r}"}, False)
+                    return
+                longueur = int(valeur)
+                if longueur > TAILLE_MAX_CORPS:
+                    await self._repondre(ecrivain, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                         {'erreur': f"Corps limité à {TAILLE_MAX_CORPS} octets"}, False)
+                    return
+                donnees = await lecteur.readexactly(longueur) if longueur else b''
+
+                statut, contenu = await self._traiter(methode, chemin, donnees)
+                await self._repondre(ecrivain, statut, contenu, garder_ouverte)
+                if not garder_ouverte:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def servir(self, hote: str, port: int) -> None:
+        self.pool = creer_pool(self.processus)
+        try:
+            serveur = await asyncio.start_server(self.connexion, hote, port)
+            adresses = ', '.join(str(socket.getsockname()) for socket in serveur.sockets)
+            print(f"Service à l'écoute sur {adresses} ({self.processus} processus de calcul)")
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            # Le pool a pu être recréé entre-temps : c'est le pool courant qu'on arrête
+            self.pool.shutdown(cancel_futures=True)
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON : calculatrice et convertisseurs.")
+    parser.add_argument('--hote', default='127.0.0.1', help="Adresse d'écoute")
+    parser.add_argument('--port', type=int, default=8080, help="Port d'écoute")
+    parser.add_argument('--processus', type=int, default=None, help="Processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument('--delai', type=float, default=DELAI_REQUETE, help="Délai maximal par requête, en secondes")
+    args = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(Service(args.processus, args.delai).servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# tests/test_analysis.py
+
+import re
+import threading
+
+import pytest
+
+import gemini_code_analyzer as analyzer
+
+
+class Clock:
+    """Horloge contrôlée : sleep() fait avancer le temps au lieu d'attendre."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_a_burst_then_paces_requests():
+    clock = Clock()
+    bucket = analyzer.TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+    assert bucket.acquire()
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    clock = Clock()
+    bucket = analyzer.TokenBucket(rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire(), bucket.acquire()
+    clock.now += 100
+    for _ in range(2):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_bucket_wait_is_interrupted_by_stop_event():
+    clock = Clock()
+    bucket = analyzer.TokenBucket(rate=0.001, capacity=1, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire()
+    stop_event = threading.Event()
+    stop_event.set()
+    assert bucket.acquire(stop_event) is False
+
+
+class GatedBackend(analyzer.ModelBackend):
+    """
+    Backend factice : chaque fichier attend son tour ; une fois 'concurrency' appels en vol,
+    ils sont libérés dans l'ordre inverse des fichiers.
+    """
+    name = 'fake'
+
+    def __init__(self, paths, concurrency, answers=None):
+        self.order = list(reversed(paths))
+        self.gates = {path: threading.Event() for path in paths}
+        self.answers = answers or {}
+        self.started = []
+        self.lock = threading.Lock()
+        self.concurrency = concurrency
+
+    def generate(self, prompt):
+        path = re.search(r"pour le fichier '(.+?)'", prompt).group(1)
+        with self.lock:
+            self.started.append(path)
+            if len(self.started) == self.concurrency:
+                threading.Thread(target=self.release, daemon=True).start()
+        assert self.gates[path].wait(5), "appels jamais lancés en parallèle"
+        return self.answers.get(path, f"[WARNING] remarque sur {path}")
+
+    def release(self):
+        for path in self.order:
+            self.gates[path].set()
+            threading.Event().wait(0.01)
+
+
+def make_config(**overrides):
+    config = {'analyzer': {
+        'model_name': 'fake', 'max_file_size_kb': None, 'strict_untagged_output': False,
+        'max_concurrency': 4, 'requests_per_minute': 0, 'burst': 1, 'max_request_tokens': 8000,
+        'max_files_per_request': 1, 'streaming': False, 'live_output': False, 'fail_fast': True,
+        'prefilter': False,
+    }}
+    config['analyzer'].update(overrides)
+    return config
+
+
+def make_files(count):
+    return [{'path': f"f{i}.py", 'patch': f"diff --git a/f{i}.py b/f{i}.py\n@@ -1 +1 @@\n-a\n+b{i}"} for i in range(count)]
+
+
+def test_requests_run_concurrently_and_are_reported_in_file_order(capsys):
+    files = make_files(4)
+    backend = GatedBackend([f['path'] for f in files], concurrency=4)
+    has_critical, report = analyzer.run_analysis(files, make_config(), "ctx", "rules", backend, None)
+
+    assert sorted(backend.started) == [f['path'] for f in files]  # tous en vol avant la première réponse
+    assert not has_critical
+    assert re.findall(r"--- Fichier: (\S+) ---", report) == [f['path'] for f in files]
+    printed = re.findall(r"\] (f\d\.py) : ", capsys.readouterr().out)
+    assert printed == [f['path'] for f in files]
+
+
+def test_first_critical_error_cancels_pending_requests(capsys):
+    files = make_files(4)
+    backend = GatedBackend([f['path'] for f in files], concurrency=1,
+                           answers={'f0.py': "[CRITICAL_ERROR] faille"})
+    has_critical, report = analyzer.run_analysis(files, make_config(max_concurrency=1), "ctx", "rules", backend, None)
+
+    assert has_critical
+    assert backend.started == ['f0.py']
+    out = capsys.readouterr().out
+    assert out.count("Analyse interrompue") == 3
+
+
+def test_one_rate_limiter_token_per_model_request(monkeypatch):
+    acquired = []
+
+    class CountingLimiter:
+        def acquire(self, stop_event=None):
+            acquired.append(threading.current_thread().name)
+            return True
+
+    monkeypatch.setattr(analyzer, 'create_rate_limiter', lambda config: CountingLimiter())
+    backend = analyzer.OfflineBackend(latency_ms=0, jitter_ms=0, seed=0)
+    files = make_files(5)
+    analyzer.run_analysis(files, make_config(max_files_per_request=2), "ctx", "rules", backend, None)
+    assert len(acquired) == 3  # 5 fichiers regroupés par 2 : 3 requêtes
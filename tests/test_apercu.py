@@ -0,0 +1,79 @@
+# tests/test_apercu.py
+
+import io
+
+import pytest
+
+from ui.apercu import ApercuDirect, _evaluer_apercu, prefixe_evaluable
+from ui.demarrage import ProfilDemarrage
+
+
+@pytest.mark.parametrize("texte, attendu", [
+    ("12*3+", "12*3"),
+    ("12*3 + ", "12*3"),
+    ("2**", "2"),
+    ("7 %", "7"),
+    ("4/(", "4"),
+    ("(1+2", "(1+2)"),
+    ("((1+2)*(3", "((1+2)*(3))"),
+    ("(1+(2*", "(1+(2))"),
+    ("1+2)", "1+2)"),  # trop de parenthèses fermantes : laissé tel quel, l'aperçu échouera
+    ("", ""),
+    ("  ", ""),
+    ("+-*/", ""),
+])
+def test_evaluable_prefix(texte, attendu):
+    assert prefixe_evaluable(texte) == attendu
+
+
+@pytest.mark.parametrize("texte, attendu", [
+    ("12*3+", 36),
+    ("(1+2", 3),
+    ("", None),
+    ("1+2)", None),
+    ("9**9**9", None),  # hors des limites de l'aperçu : pas de résultat plutôt qu'un calcul sans fin
+    ("1/0", None),
+])
+def test_preview_value(texte, attendu):
+    assert _evaluer_apercu(texte)[0] == attendu
+
+
+class WidgetFactice:
+    """Remplace after/after_cancel de Tk : les rappels s'exécutent sur demande."""
+
+    def __init__(self) -> None:
+        self.rappels: dict[str, object] = {}
+
+    def after(self, _ms: int, rappel) -> str:
+        identifiant = str(len(self.rappels) + 1)
+        self.rappels[identifiant] = rappel
+        return identifiant
+
+    def after_cancel(self, identifiant: str) -> None:
+        self.rappels.pop(identifiant, None)
+
+    def executer(self) -> None:
+        while self.rappels:
+            self.rappels.pop(next(iter(self.rappels)))()
+
+
+def test_only_the_latest_input_is_shown_and_measured():
+    affiches, mesures = [], []
+    widget = WidgetFactice()
+    apercu = ApercuDirect(widget, affiches.append, lambda duree, dans_budget: mesures.append(dans_budget),
+                          budget_ms=1000)
+    for texte in ("1", "1+", "1+2"):
+        apercu.texte_modifie(texte)
+    widget.executer()
+    apercu.fermer()
+    assert affiches == [3]
+    assert mesures == [True]
+    assert apercu.statistiques()['hors_budget'] == 0
+
+
+def test_startup_profile_reports_previews_over_budget():
+    flux = io.StringIO()
+    profil = ProfilDemarrage()
+    profil.mesure_apercu(3.0, True, flux)
+    profil.mesure_apercu(42.5, False, flux)
+    assert flux.getvalue() == "Aperçu hors budget : 42.5 ms\n"
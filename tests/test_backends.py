@@ -0,0 +1,41 @@
+# tests/test_backends.py
+
+import pytest
+
+import gemini_code_analyzer as analyzer
+
+
+def config_with(backend='offline', **offline):
+    return {'analyzer': {'model_name': 'gemini-2.5-flash', 'backend': backend, 'offline_backend': offline}}
+
+
+def test_unknown_offline_options_are_ignored(monkeypatch, capsys):
+    monkeypatch.delenv('GEMINI_ANALYZER_BACKEND', raising=False)
+    backend = analyzer.create_backend(config_with(latency_ms=0, jitter_ms=0, seed=1, profil='rapide'))
+    assert isinstance(backend, analyzer.OfflineBackend)
+    assert backend.latency_ms == 0
+    assert "profil" in capsys.readouterr().err
+
+
+def test_environment_overrides_the_configured_backend(monkeypatch):
+    monkeypatch.setenv('GEMINI_ANALYZER_BACKEND', 'offline')
+    assert isinstance(analyzer.create_backend(config_with('gemini')), analyzer.OfflineBackend)
+    monkeypatch.setenv('GEMINI_ANALYZER_BACKEND', 'inconnu')
+    with pytest.raises(ValueError):
+        analyzer.create_backend(config_with())
+
+
+def test_offline_backend_answers_batches_per_file():
+    backend = analyzer.OfflineBackend(latency_ms=0, jitter_ms=0, seed=0)
+    files = [{'path': 'a.py', 'patch': '+x'}, {'path': 'b.py', 'patch': '+y'}]
+    response = backend.generate(analyzer.build_batch_prompt(files, "contexte", "règles"))
+    assert analyzer.parse_batch_response(response) == {'a.py': 'CODE_VALIDÉ', 'b.py': 'CODE_VALIDÉ'}
+    assert "".join(backend.generate_stream("prompt")) == "CODE_VALIDÉ"
+
+
+def test_offline_backend_failures_are_backend_errors():
+    backend = analyzer.OfflineBackend(latency_ms=0, jitter_ms=0, error_rate=1.0, seed=0)
+    with pytest.raises(analyzer.BackendError):
+        backend.generate("prompt")
+    result = analyzer.call_model("prompt", {'analyzer': {'streaming': True}}, backend)
+    assert "échec simulé" in result
@@ -0,0 +1,113 @@
+# tests/test_cache.py
+
+import sqlite3
+import time
+
+import gemini_code_analyzer as analyseur
+
+CONFIG = {'analyzer': {'model_name': 'modele-a'}}
+
+PATCH = """diff --git a/app.py b/app.py
+index 1111111..2222222 100644
+--- a/app.py
++++ b/app.py
+@@ -10,2 +10,2 @@ def f():
+     x = 1
+-    return x
++    return x + 1
+"""
+
+
+def cle(patch=PATCH, config=CONFIG, regles="regles", chemin="app.py"):
+    return analyseur.get_cache_key({'path': chemin, 'patch': patch}, config, "contexte", regles)
+
+
+def test_key_ignores_headers_and_line_numbers():
+    deplace = PATCH.replace("index 1111111..2222222", "index 3333333..4444444").replace("@@ -10,2 +10,2", "@@ -42,2 +57,2")
+    assert cle(deplace) == cle()
+
+
+def test_key_changes_with_content_path_model_and_rules():
+    reference = cle()
+    assert cle(PATCH.replace("x + 1", "x + 2")) != reference
+    assert cle(chemin="autre.py") != reference
+    assert cle(config={'analyzer': {'model_name': 'modele-b'}}) != reference
+    assert cle(regles="autres regles") != reference
+
+
+def test_put_get_survives_reopening(tmp_path):
+    chemin = tmp_path / 'cache.sqlite3'
+    cache = analyseur.AnalysisCache(str(chemin))
+    cache.put('k', 'CODE_VALIDÉ', 'CODE_VALIDÉ')
+    assert cache.get('k') == 'CODE_VALIDÉ'
+    assert cache.get('absente') is None
+    cache.close()
+    cache = analyseur.AnalysisCache(str(chemin))
+    assert cache.get('k') == 'CODE_VALIDÉ'
+    cache.close()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite3')
+    cache = analyseur.AnalysisCache(chemin, max_size_kb=1)
+    for cle_entree in ('ancienne', 'utilisee', 'recente'):
+        cache.put(cle_entree, 'WARNING', 'x' * 400)
+        time.sleep(0.01)
+    cache.get('utilisee')
+    cache.close()
+    cache = analyseur.AnalysisCache(chemin, max_size_kb=1)
+    assert cache.get('ancienne') is None
+    assert cache.get('utilisee') is not None
+    assert cache.get('recente') is not None
+    cache.close()
+
+
+def test_critical_results_are_not_stored(tmp_path):
+    cache = analyseur.AnalysisCache(str(tmp_path / 'cache.sqlite3'))
+    analyseur.store_in_cache(cache, 'valide', "CODE_VALIDÉ")
+    analyseur.store_in_cache(cache, 'avertissement', "[WARNING] style")
+    analyseur.store_in_cache(cache, 'critique', "[CRITICAL_ERROR] bug\n[WARNING] style")
+    analyseur.store_in_cache(cache, 'sans_tag', "réponse libre")
+    assert cache.get('valide') == "CODE_VALIDÉ"
+    assert cache.get('avertissement') == "[WARNING] style"
+    assert cache.get('critique') is None
+    assert cache.get('sans_tag') is None
+    cache.close()
+
+
+def test_no_write_lock_is_held_during_the_run(tmp_path):
+    chemin = str(tmp_path / 'cache.sqlite3')
+    precedent = analyseur.AnalysisCache(chemin)
+    precedent.put('connue', 'CODE_VALIDÉ', 'CODE_VALIDÉ')
+    precedent.close()
+
+    cache = analyseur.AnalysisCache(chemin)
+    assert cache.get('connue') == 'CODE_VALIDÉ'
+    cache.put('nouvelle', 'WARNING', '[WARNING] style')
+    # Un second hook lancé pendant les appels au modèle peut écrire sans attendre
+    autre = sqlite3.connect(chemin, timeout=0.1)
+    with autre:
+        autre.execute("INSERT INTO analyses VALUES ('autre', 'WARNING', 'x', 1, 0)")
+    autre.close()
+    cache.close()
+
+    cache = analyseur.AnalysisCache(chemin)
+    assert [cache.get(cle) for cle in ('connue', 'nouvelle', 'autre')] == ['CODE_VALIDÉ', '[WARNING] style', 'x']
+    cache.close()
+
+
+def test_locked_database_is_a_cache_miss(tmp_path, capsys):
+    chemin = str(tmp_path / 'cache.sqlite3')
+    cache = analyseur.AnalysisCache(chemin)
+    cache.connection.execute("PRAGMA busy_timeout = 50")
+    verrou = sqlite3.connect(chemin, isolation_level=None)
+    verrou.execute("BEGIN EXCLUSIVE")
+    try:
+        assert cache.get('k') is None
+        assert "Lecture du cache impossible" in capsys.readouterr().err
+        cache.put('k', 'CODE_VALIDÉ', 'CODE_VALIDÉ')
+        assert cache.get('k') == 'CODE_VALIDÉ'
+    finally:
+        verrou.execute("ROLLBACK")
+        verrou.close()
+    cache.close()
@@ -0,0 +1,46 @@
+# tests/test_dimensions.py
+
+from fractions import Fraction
+from time import perf_counter
+
+import pytest
+
+from converters.dimensions import PUISSANCE_MAX, analyser_unite, compiler_conversion, convertir_compose
+
+
+@pytest.mark.parametrize("expression, attendu", [
+    ("kg*m/s^2", (Fraction(1), (1, 1, -2, 0))),
+    ("km/h", (Fraction(1000, 3600), (1, 0, -1, 0))),
+    ("L", (Fraction(1, 1000), (3, 0, 0, 0))),
+    ("m^-2 * N", (Fraction(1), (-1, 1, -2, 0))),
+])
+def test_compound_units_are_parsed_exactly(expression, attendu):
+    assert analyser_unite(expression) == attendu
+
+
+def test_conversions():
+    assert convertir_compose(36, "km/h", "m/s") == pytest.approx(10.0)
+    assert convertir_compose(1, "km^3", "L") == pytest.approx(1e12)
+    assert compiler_conversion("C", "F") == pytest.approx((1.8, 32.0))
+    with pytest.raises(ValueError, match="incompatibles"):
+        compiler_conversion("J", "W")
+
+
+@pytest.mark.parametrize("expression", [f"m^{PUISSANCE_MAX + 1}", "km^3000000", "s^-99", "kg/m^13"])
+def test_exponents_are_bounded(expression):
+    debut = perf_counter()
+    with pytest.raises(ValueError, match="Exposant"):
+        analyser_unite(expression)
+    assert perf_counter() - debut < 0.1
+
+
+def test_long_expressions_are_rejected_before_parsing():
+    with pytest.raises(ValueError, match="trop longue"):
+        analyser_unite("km^12/m^12*" * 100 + "m")
+    assert analyser_unite(f"m^{PUISSANCE_MAX}/m^{PUISSANCE_MAX}") == (Fraction(1), (0, 0, 0, 0))
+
+
+@pytest.mark.parametrize("expression", ["", "/m", "m**2", "m^", "furlong"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        analyser_unite(expression)
@@ -0,0 +1,49 @@
+# tests/test_flux_csv.py
+
+import io
+
+import pytest
+
+from converters.currency import convertir_devise
+from converters.flux_csv import analyser_specification, convertir_flux
+
+
+@pytest.mark.parametrize("specification, valeur, attendu", [
+    ("duree:h->s", 2, 7200.0),
+    ("duree:min->h", 90, 1.5),
+    ("vitesse:km/h->m/s", 36, 10.0),
+    ("distance:km->m", 1.5, 1500.0),
+    ("force:kg*m/s^2->N", 3, 3.0),
+])
+def test_dimensional_specs_use_the_unit_parsers(specification, valeur, attendu):
+    _, convertir = analyser_specification(specification)
+    assert convertir(valeur) == pytest.approx(attendu)
+
+
+@pytest.mark.parametrize("specification", ["montant:USD->EUR", "montant:usd->eur"])
+def test_iso_code_pairs_are_currencies(specification):
+    colonne, convertir = analyser_specification(specification)
+    assert colonne == "montant"
+    assert convertir(100) == pytest.approx(convertir_devise(100, "USD", "EUR"))
+
+
+@pytest.mark.parametrize("specification, message", [
+    ("x:furlong->m", "Unité non reconnue"),
+    ("x:kg->s", "incompatibles"),
+    ("x:ABC->EUR", "Devise non supportée"),
+    ("x:km", "Spécification invalide"),
+])
+def test_invalid_specs_are_reported(specification, message):
+    with pytest.raises(ValueError, match=message):
+        analyser_specification(specification)
+
+
+def test_stream_conversion_keeps_invalid_cells():
+    entree = io.StringIO("nom,duree,montant\na,2,100\nb,n/a,\n")
+    sortie = io.StringIO()
+    lignes, invalides = convertir_flux(entree, sortie, ["duree:h->s", "montant:USD->EUR"], taille_bloc=1)
+    assert (lignes, invalides) == (2, 1)
+    resultat = sortie.getvalue().splitlines()
+    assert resultat[0] == "nom,duree,montant"
+    assert resultat[1].split(',')[1] == "7200.0"
+    assert resultat[2] == "b,n/a,"
@@ -0,0 +1,83 @@
+# tests/test_graphe_devises.py
+
+import math
+
+import pytest
+
+from converters import graphe_devises
+from converters.graphe_devises import GrapheDevises
+
+COTATIONS = [("EUR", "USD", 1.08), ("EUR", "GBP", 0.86), ("USD", "GBP", 0.80), ("USD", "JPY", 150.0)]
+
+
+@pytest.fixture(params=["numpy", "listes"])
+def sans_numpy(request, monkeypatch):
+    """Chaque test tourne avec la matrice NumPy et avec la matrice en listes."""
+    if request.param == "listes":
+        monkeypatch.setattr(graphe_devises, 'np', None)
+
+
+def test_direct_quotes_win_over_triangulation(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    assert graphe.taux("USD", "GBP") == pytest.approx(0.80)
+    assert graphe.taux("GBP", "USD") == pytest.approx(1 / 0.80)
+    assert graphe.taux("EUR", "USD") == pytest.approx(1.08)
+    assert graphe.taux("EUR", "GBP") == pytest.approx(0.86)
+
+
+def test_pairs_without_direct_quote_are_triangulated(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    assert graphe.taux("EUR", "JPY") == pytest.approx(1.08 * 150.0)
+    assert graphe.convertir(2, "JPY", "EUR") == pytest.approx(2 / (1.08 * 150.0))
+
+
+def test_updating_any_quote_changes_its_pair(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    for base, cotee, taux in [("USD", "GBP", 0.5), ("EUR", "USD", 1.2), ("EUR", "GBP", 0.9)]:
+        graphe.ajouter_cotation(base, cotee, taux)
+        assert graphe.taux(base, cotee) == pytest.approx(taux)
+        assert graphe.taux(cotee, base) == pytest.approx(1 / taux)
+
+
+def test_incremental_updates_match_a_full_rebuild(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    mises_a_jour = [("EUR", "USD", 1.1), ("USD", "GBP", 0.7), ("USD", "JPY", 140.0), ("CHF", "EUR", 1.05)]
+    for cotation in mises_a_jour:
+        graphe.ajouter_cotation(*cotation)
+    finales = {(base, cotee): taux for base, cotee, taux in COTATIONS + mises_a_jour}
+    reference = GrapheDevises((base, cotee, taux) for (base, cotee), taux in finales.items())
+    for de in reference.devises:
+        for vers in reference.devises:
+            assert graphe.taux(de, vers) == pytest.approx(reference.taux(de, vers))
+
+
+def test_disconnected_currencies_have_no_rate(sans_numpy):
+    graphe = GrapheDevises(COTATIONS + [("AUD", "NZD", 1.1)])
+    with pytest.raises(ValueError):
+        graphe.taux("EUR", "AUD")
+    graphe.ajouter_cotation("USD", "AUD", 1.5)
+    assert graphe.taux("EUR", "NZD") == pytest.approx(1.08 * 1.5 * 1.1)
+
+
+def test_invalid_quotes_and_unknown_currencies(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    for taux in (0, -1.0, float('nan'), float('inf')):
+        with pytest.raises(ValueError, match="Taux invalide"):
+            graphe.ajouter_cotation("EUR", "USD", taux)
+    assert graphe.taux("EUR", "USD") == pytest.approx(1.08)
+    with pytest.raises(ValueError):
+        graphe.taux("EUR", "XXX")
+
+
+def test_convert_many_uses_interned_indices(sans_numpy):
+    graphe = GrapheDevises(COTATIONS)
+    de, vers = graphe.indices(["EUR", "USD", "GBP"]), graphe.indices(["USD", "GBP", "JPY"])
+    resultats = graphe.convert_many([10.0, 10.0, 1.0], de, vers)
+    attendus = [10 * 1.08, 10 * 0.80, graphe.taux("GBP", "JPY")]
+    assert all(math.isclose(r, a) for r, a in zip(resultats, attendus))
+
+
+def test_rate_table_reduced_to_its_base(sans_numpy):
+    graphe = GrapheDevises.depuis_taux({"EUR": 1.0})
+    assert graphe.devises == ["EUR"]
+    assert graphe.convertir(5, "EUR", "EUR") == 5
@@ -0,0 +1,98 @@
+# tests/test_historique.py
+
+import threading
+from time import perf_counter
+
+import pytest
+
+from historique import HistoriqueResultats, cle_conversion, cle_expression
+
+
+@pytest.fixture
+def chemin(tmp_path):
+    return str(tmp_path / "historique.sqlite3")
+
+
+@pytest.fixture
+def historique(chemin):
+    historique = HistoriqueResultats(chemin)
+    yield historique
+    historique.fermer()
+
+
+def test_keys_are_normalised():
+    assert cle_expression("2 +3") == cle_expression("(2)+3")
+    assert cle_expression("2 +") == "expr:2 +"
+    assert cle_conversion("longueur", 1, "km", "m") == cle_conversion("longueur", 1.0, "km", "m")
+
+
+def test_append_then_search(historique):
+    historique.enregistrer("expr:1 + 1", "expression", "1+1", 2)
+    assert historique.chercher("expr:1 + 1") == 2
+    assert historique.chercher("expr:absente") is None
+
+
+def test_memoised_results_are_computed_once(historique):
+    appels = []
+    calcul = lambda: appels.append(1) or 42  # noqa: E731
+    assert historique.memoiser("expr:6 * 7", "expression", "6*7", calcul) == 42
+    assert historique.memoiser("expr:6 * 7", "expression", "6*7", calcul) == 42
+    assert len(appels) == 1
+
+
+def test_pages_are_most_recent_first(historique):
+    for i in range(5):
+        historique.enregistrer(f"expr:{i}", "expression", str(i), i)
+    assert [entree for _, entree, _ in historique.page(0, taille=2)] == ["4", "3"]
+    assert [entree for _, entree, _ in historique.page(2, taille=2)] == ["0"]
+    assert historique.page(3, taille=2) == []
+
+
+def test_results_survive_reopening_with_their_types(chemin):
+    resultats = {"expr:c": 3 + 4j, "expr:f": 0.1, "expr:grand": 2 ** 50_000, "expr:n": -7}
+    historique = HistoriqueResultats(chemin)
+    for cle, resultat in resultats.items():
+        historique.enregistrer(cle, "expression", cle, resultat)
+    historique.fermer()
+
+    historique = HistoriqueResultats(chemin)
+    try:
+        for cle, resultat in resultats.items():
+            assert historique.chercher(cle) == resultat
+            assert type(historique.chercher(cle)) is type(resultat)
+        assert {type(resultat) for _, _, resultat in historique.page(0)} == {complex, float, int}
+    finally:
+        historique.fermer()
+
+
+def test_oldest_rows_are_evicted(chemin):
+    historique = HistoriqueResultats(chemin, taille_memoire=1, taille_max=3)
+    try:
+        for i in range(6):
+            historique.enregistrer(f"expr:{i}", "expression", str(i), i)
+        assert [entree for _, entree, _ in historique.page(0)] == ["5", "4", "3"]
+        assert historique.chercher("expr:0") is None
+    finally:
+        historique.fermer()
+
+
+def test_pagination_does_not_hang_when_the_writer_is_gone(historique):
+    historique._file.put(None)
+    historique._ecrivain.join()
+    historique._file.put(("expr:perdue", "expression", "perdue", "1", 0.0))  # jamais écrite
+
+    debut = perf_counter()
+    assert historique.page(0) == []
+    assert perf_counter() - debut < 0.5
+    historique.enregistrer("expr:2", "expression", "2", 2)  # ignoré sans écrivain
+    assert historique._file.qsize() == 1
+
+
+def test_writes_from_several_threads(historique):
+    fils = [threading.Thread(target=lambda n=n: [historique.enregistrer(f"expr:{n}-{i}", "expression", "", i)
+                                                 for i in range(50)]) for n in range(4)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    assert len(historique.page(0, taille=1000)) == 200
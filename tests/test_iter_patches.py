@@ -0,0 +1,86 @@
+# tests/test_iter_patches.py
+
+import io
+
+import pytest
+
+import gemini_code_analyzer as analyzer
+from tests.conftest import commit, git
+
+EXTS = ['.py', '.json']
+
+
+def test_one_patch_per_file_filtered_by_extension(repo):
+    base = commit(repo, {'a.py': "x = 1\n", 'b.json': "{}\n", 'notes.txt': "a\n"})
+    head = commit(repo, {'a.py': "x = 2\n", 'b.json': '{"k": 1}\n', 'notes.txt': "b\n"})
+    patches = dict(analyzer.iter_patches(f"{base}..{head}", EXTS))
+    assert sorted(patches) == ['a.py', 'b.json']
+    assert "-x = 1" in patches['a.py'] and "+x = 2" in patches['a.py']
+
+
+@pytest.mark.parametrize("option", ["diff.noprefix", "diff.mnemonicPrefix"])
+def test_user_prefix_settings_are_ignored(repo, option):
+    base = commit(repo, {'a.py': "1\n", 'src/b.py': "1\n", 'c.json': "1\n"})
+    head = commit(repo, {'a.py': "2\n", 'src/b.py': "2\n", 'c.json': "2\n"})
+    git("config", option, "true", cwd=repo)
+    assert sorted(path for path, _ in analyzer.iter_patches(f"{base}..{head}", EXTS)) == ['a.py', 'c.json', 'src/b.py']
+
+
+def test_paths_with_spaces_quotes_and_non_ascii(repo):
+    names = ['dossier avec espaces/mon fichier.py', 'accentué é.py', 'guillemet "q".py', 'tab\tname.py']
+    base = commit(repo, {name: "1\n" for name in names})
+    head = commit(repo, {name: "2\n" for name in names})
+    assert sorted(path for path, _ in analyzer.iter_patches(f"{base}..{head}", EXTS)) == sorted(names)
+
+
+def test_renamed_file_uses_new_path(repo):
+    base = commit(repo, {'old name.py': "".join(f"ligne_{i} = {i}\n" for i in range(20))})
+    (repo / 'old name.py').rename(repo / 'new name.py')
+    (repo / 'new name.py').write_text("".join(f"ligne_{i} = {i}\n" for i in range(19)) + "ligne_19 = 0\n")
+    head = commit(repo, {})
+    assert [path for path, _ in analyzer.iter_patches(f"{base}..{head}", EXTS)] == ['new name.py']
+
+
+def test_mode_only_change_yields_nothing(repo):
+    base = commit(repo, {'a.py': "1\n"})
+    (repo / 'a.py').chmod(0o755)
+    head = commit(repo, {})
+    assert list(analyzer.iter_patches(f"{base}..{head}", EXTS)) == []
+
+
+class FakeProcess:
+    def __init__(self, output):
+        self.stdout = io.StringIO(output)
+        self.stderr = io.StringIO("")
+        self.returncode = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def wait(self, timeout=None):
+        return 0
+
+
+def test_unparseable_header_with_changes_raises(monkeypatch):
+    output = "diff --git x y\nindex 1..2 100644\n@@ -1 +1 @@\n-a\n+b\n"
+    monkeypatch.setattr(analyzer.subprocess, 'Popen', lambda *a, **k: FakeProcess(output))
+    with pytest.raises(analyzer.PatchParseError):
+        list(analyzer.iter_patches("a..b", EXTS))
+
+
+def test_files_are_deduplicated_across_pushed_refs(repo):
+    base = commit(repo, {'a.py': "1\n", 'b.py': "1\n"})
+    first = commit(repo, {'a.py': "2\n"})
+    git("checkout", "-q", "-b", "autre", base, cwd=repo)
+    second = commit(repo, {'a.py': "3\n", 'b.py': "2\n"})
+    refs = (f"refs/heads/main {first} refs/heads/main {base}\n"
+            f"refs/heads/autre {second} refs/heads/autre {base}\n"
+            f"refs/heads/copie {first} refs/heads/copie {base}")
+    config = {'analyzer': {'analyzable_extensions': EXTS}}
+    files = {f['path']: f for f in analyzer.get_files_and_patches(config, refs)}
+    assert sorted(files) == ['a.py', 'b.py']
+    assert [patch['rev'] for patch in files['a.py']['patches']] == [first, second]
+    assert "+2" in files['a.py']['patch'] and "+3" in files['a.py']['patch']
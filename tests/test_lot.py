@@ -0,0 +1,53 @@
+# tests/test_lot.py
+
+import json
+
+import pytest
+
+from calculator.lot import evaluer_lot, main
+
+LIGNES = ["1 + 1", "", "2 * 3", "1 / 0", "   ", "x + 1", "10 - 4"]
+
+
+@pytest.mark.parametrize("processus, taille_bloc", [(1, 256), (2, 1), (3, 2)])
+def test_records_keep_input_order_and_line_numbers(processus, taille_bloc):
+    enregistrements = list(evaluer_lot(LIGNES, processus, taille_bloc))
+    assert [e['ligne'] for e in enregistrements] == [1, 3, 4, 6, 7]
+    assert [e.get('resultat') for e in enregistrements] == [2, 6, None, None, 6]
+
+
+def test_errors_are_recorded_per_line():
+    erreurs = {e['ligne']: e['erreur'] for e in evaluer_lot(LIGNES, 1) if 'erreur' in e}
+    assert erreurs[4].startswith("ZeroDivisionError")
+    assert erreurs[6].startswith("NameError")
+    assert len(erreurs) == 2
+
+
+def test_jsonl_lines_carry_their_variables():
+    lignes = [
+        json.dumps({"expression": "price * qty", "variables": {"price": 2.5, "qty": 4}}),
+        json.dumps("3 ** 2"),
+        json.dumps({"expression": "price * qty", "variables": {"price": 1}}),
+        "{pas du json",
+        json.dumps({"variables": {}}),
+    ]
+    enregistrements = list(evaluer_lot(lignes, 1, format='jsonl'))
+    assert enregistrements[0] == {'ligne': 1, 'expression': "price * qty", 'resultat': 10.0}
+    assert enregistrements[1]['resultat'] == 9
+    assert enregistrements[2]['erreur'].startswith("NameError")
+    assert enregistrements[3]['erreur'].startswith("JSONDecodeError")
+    assert enregistrements[4]['erreur'].startswith("KeyError")
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Format"):
+        list(evaluer_lot(LIGNES, 1, format='csv'))
+
+
+def test_cli_writes_jsonl(tmp_path):
+    entree = tmp_path / "calculs.jsonl"
+    entree.write_text(json.dumps({"expression": "a - b", "variables": {"a": 5, "b": 8}}) + "\n", encoding='utf-8')
+    sortie = tmp_path / "resultats.jsonl"
+    assert main([str(entree), "-o", str(sortie), "-p", "1"]) == 0
+    assert [json.loads(ligne) for ligne in sortie.read_text(encoding='utf-8').splitlines()] == [
+        {'ligne': 1, 'expression': "a - b", 'resultat': -3}]
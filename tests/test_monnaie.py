@@ -0,0 +1,77 @@
+# tests/test_monnaie.py
+
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+from fractions import Fraction
+
+import pytest
+
+from converters.monnaie import Montants
+
+pytest.importorskip("numpy")
+
+TEXTES = ["0.125", "0.135", "-0.125", "-0.135", "1.005", "-2.675", "0", "12.345"]
+
+
+def reference(texte: str, taux: Fraction, arrondi: str, exposant_vers: int) -> int:
+    """Conversion de référence avec decimal, à partir du montant exact."""
+    valeur = Decimal(texte) * Decimal(taux.numerator) / Decimal(taux.denominator)
+    return int(valeur.scaleb(exposant_vers).to_integral_value(rounding=arrondi))
+
+
+@pytest.mark.parametrize("arrondi", [ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_DOWN])
+def test_text_input_rounding_matches_decimal(arrondi):
+    montants = Montants.depuis_textes(TEXTES, "EUR", arrondi)
+    attendus = [int(Decimal(t).scaleb(2).to_integral_value(rounding=arrondi)) for t in TEXTES]
+    assert montants.mineures.tolist() == attendus
+
+
+@pytest.mark.parametrize("arrondi", [ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_DOWN])
+@pytest.mark.parametrize("vers, taux, exposant_vers", [("USD", "1.08", 2), ("JPY", "162.5", 0), ("XAF", "655.957", 0)])
+def test_conversion_rounds_once_like_decimal(arrondi, vers, taux, exposant_vers):
+    textes = ["0.01", "0.05", "-0.05", "0.15", "-1.25", "123.45", "-0.01"]
+    convertis = Montants.depuis_textes(textes, "EUR").convertir(vers, taux, arrondi)
+    assert convertis.devise == vers
+    assert convertis.mineures.tolist() == [reference(t, Fraction(taux), arrondi, exposant_vers) for t in textes]
+
+
+def test_halfway_cases():
+    centimes = Montants([1, 3, 5, -1, -3], "EUR")  # 0.01 EUR -> 0.005 GBP avec un taux de 0.5
+    assert centimes.convertir("GBP", "0.5", ROUND_HALF_EVEN).mineures.tolist() == [0, 2, 2, 0, -2]
+    assert centimes.convertir("GBP", "0.5", ROUND_HALF_UP).mineures.tolist() == [1, 2, 3, -1, -2]
+    assert centimes.convertir("GBP", "0.5", ROUND_DOWN).mineures.tolist() == [0, 1, 2, 0, -1]
+
+
+def test_float_rate_is_read_by_its_decimal_writing():
+    assert Montants([100], "EUR").convertir("USD", 1.1).mineures.tolist() == [110]
+
+
+def test_large_amounts_take_the_exact_path():
+    grand = 2 ** 62
+    convertis = Montants([grand, -grand], "EUR").convertir("USD", "0.999999")
+    attendu = (grand * 999999 + 500000) // 1000000
+    assert convertis.mineures.tolist() == [attendu, -attendu]
+    with pytest.raises(OverflowError):
+        Montants([grand], "EUR").convertir("USD", "3")
+
+
+def test_int64_min_is_not_treated_as_a_small_amount():
+    minimum = -2 ** 63
+    assert Montants([minimum], "EUR").convertir("USD", "0.5").mineures.tolist() == [minimum // 2]
+    assert Montants([minimum], "EUR").convertir("USD", "1").mineures.tolist() == [minimum]
+    with pytest.raises(OverflowError):
+        Montants([minimum, 1], "EUR").convertir("USD", "2")  # en int64, le produit reviendrait à 0
+
+
+def test_total_is_exact_beyond_int64():
+    montants = Montants([2 ** 62] * 8, "EUR")
+    assert montants.total() == 2 ** 65
+    assert montants.total_decimal() == Decimal(2 ** 65).scaleb(-2)
+
+
+def test_formatting_and_invalid_inputs():
+    assert Montants([-5, 1234, 0], "EUR").formater() == ["-0.05", "12.34", "0.00"]
+    assert Montants([1500], "JPY").formater() == ["1500"]
+    with pytest.raises(ValueError):
+        Montants([1], "XXX")
+    with pytest.raises(ValueError):
+        Montants([1], "EUR").convertir("USD", 0)
@@ -0,0 +1,106 @@
+# tests/test_packing.py
+
+import gemini_code_analyzer as analyzer
+from tests.conftest import commit
+
+CONFIG = {'analyzer': {'analyzable_extensions': ['.py'], 'max_request_tokens': 200, 'max_files_per_request': 3}}
+
+
+def lignes(prefixe, nombre, pas=1):
+    """Fichier de 'nombre' lignes ; une ligne sur 'pas' porte le préfixe (hunks séparés)."""
+    return "".join(f"{prefixe if i % pas == 0 else 'base'}_{i} = {i}  # {'x' * 40}\n" for i in range(nombre))
+
+
+def hunks_of(chunks):
+    return [line for chunk in chunks for line in chunk.split('\n') if line.startswith('@@')]
+
+
+def test_each_chunk_has_exactly_one_diff_header():
+    chunks = analyzer.split_patch("\n".join(
+        f"diff --git a/f.py b/f.py\n--- a/f.py\n+++ b/f.py\n@@ -{i} +{i} @@\n-a{i}\n+b{i}" for i in range(1, 30)), 60)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith("diff --git ")
+        assert chunk.count("diff --git ") == 1 and chunk.count("+++ b/f.py") == 1
+    assert sorted(hunks_of(chunks)) == sorted(f"@@ -{i} +{i} @@" for i in range(1, 30))
+
+
+def test_file_touched_in_two_refs_is_split_per_ref(repo):
+    base = commit(repo, {'a.py': lignes('base', 60)})
+    first = commit(repo, {'a.py': lignes('premier', 60, pas=2)})
+    commit(repo, {'a.py': lignes('base', 60)})
+    second = commit(repo, {'a.py': lignes('second', 60, pas=3)})
+    refs = f"refs/heads/a {first} refs/heads/a {base}\nrefs/heads/b {second} refs/heads/b {base}"
+    files = analyzer.get_files_and_patches(CONFIG, refs)
+    assert len(files) == 1 and len(files[0]['patches']) == 2
+
+    requests = analyzer.pack_requests([(0, files[0])], CONFIG)
+    chunks = [piece['patch'] for request in requests for piece in request]
+    assert len(requests) > 2 and all(len(request) == 1 for request in requests)
+    assert [piece['part'] for request in requests for piece in request] == list(range(len(chunks)))
+    assert all(request[0]['parts'] == len(chunks) for request in requests)
+    for chunk in chunks:
+        assert chunk.count("diff --git ") == 1 and chunk.count("+++ b/a.py") == 1
+        added = [line for line in chunk.split('\n') if line.startswith('+') and not line.startswith('+++')]
+        assert len({line[1:].split("_")[0] for line in added}) <= 1  # un seul push par morceau
+
+    expected = sorted(hunks_of([patch['patch'] for patch in files[0]['patches']]))
+    assert sorted(hunks_of(chunks)) == expected
+
+
+def test_small_patches_are_batched_within_limits():
+    small = [(i, {'path': f"f{i}.py", 'patch': f"diff --git a/f{i}.py b/f{i}.py\n@@ -1 +1 @@\n-a\n+b"}) for i in range(7)]
+    requests = analyzer.pack_requests(small, CONFIG)
+    assert [len(request) for request in requests] == [3, 3, 1]
+    assert [piece['index'] for request in requests for piece in request] == list(range(7))
+
+
+def test_part_results_are_merged():
+    assert analyzer.merge_part_results(["CODE_VALIDÉ", "CODE_VALIDÉ"]) == "CODE_VALIDÉ"
+    merged = analyzer.merge_part_results(["CODE_VALIDÉ", "[WARNING] style"])
+    assert merged == "[Partie 2/2]\n[WARNING] style"
+
+
+class CountingBackend(analyzer.ModelBackend):
+    name = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return "CODE_VALIDÉ"
+
+
+def analyse_push(repo, before, after, max_patch_kb=8):
+    base = commit(repo, {'big.py': before})
+    head = commit(repo, {'big.py': after})
+    config = {'analyzer': {
+        'analyzable_extensions': ['.py'], 'model_name': 'fake', 'max_file_size_kb': max_patch_kb,
+        'strict_untagged_output': False, 'max_concurrency': 1, 'requests_per_minute': 0, 'burst': 1,
+        'max_request_tokens': 100_000, 'max_files_per_request': 1, 'streaming': False,
+        'live_output': False, 'fail_fast': True, 'prefilter': True,
+    }}
+    files = analyzer.get_files_and_patches(config, f"refs/heads/m {head} refs/heads/m {base}")
+    backend = CountingBackend()
+    has_critical, report = analyzer.run_analysis(files, config, "ctx", "rules", backend, None)
+    return backend.calls, has_critical, report
+
+
+def test_small_edit_of_a_large_file_is_reviewed(repo):
+    big = lignes('base', 1000)  # environ 60 Ko, au-delà de la limite de 8 Ko
+    calls, has_critical, _ = analyse_push(repo, big, big.replace("base_500 = 500", "base_500 = 501"))
+    assert calls == 1 and not has_critical
+
+
+def test_syntax_error_in_a_large_file_is_still_blocked(repo):
+    big = lignes('base', 1000)
+    calls, has_critical, report = analyse_push(repo, big, big.replace("base_500 = 500", "base_500 = (500"))
+    assert has_critical and "Erreur de syntaxe" in report
+    assert calls == 0
+
+
+def test_oversized_patch_is_a_warning_without_model_call(repo):
+    calls, has_critical, report = analyse_push(repo, lignes('base', 10), lignes('neuf', 1000))
+    assert calls == 0 and not has_critical
+    assert "max_file_size_kb" in report
@@ -0,0 +1,130 @@
+# tests/test_prefilter.py
+
+import copy
+
+import pytest
+
+import gemini_code_analyzer as analyzer
+from tests.conftest import commit
+
+CONFIG = {'analyzer': {'prefilter': True, 'max_file_size_kb': 500}}
+
+
+def patch_of(*hunks):
+    """Patch unifié minimal : chaque hunk est (lignes retirées, lignes ajoutées)."""
+    lines = ["diff --git a/f b/f", "--- a/f", "+++ b/f"]
+    for removed, added in hunks:
+        lines.append("@@ -1 +1 @@")
+        lines += ["-" + line for line in removed] + ["+" + line for line in added]
+    return "\n".join(lines)
+
+
+def decide(path, source, *hunks, config=CONFIG):
+    return analyzer.prefilter_patch({'path': path, 'patch': patch_of(*hunks)}, config, [source])
+
+
+def test_reordered_statements_go_to_the_model():
+    assert decide('a.py', "y = x + 1\nx = 1\n", (["x = 1", "y = x + 1"], ["y = x + 1", "x = 1"])) is None
+
+
+def test_line_moved_between_hunks_goes_to_the_model():
+    assert decide('a.py', "y = 2\nx = 1\n", (["x = 1"], []), ([], ["x = 1"])) is None
+
+
+def test_whitespace_only_changes_are_skipped():
+    assert decide('a.js', "", (["  return 1;"], ["\treturn 1;   ", ""])).startswith(analyzer.PREFILTER_VALID)
+    assert decide('a.py', "x = 1\n", (["x = 1  "], ["x = 1"])).startswith(analyzer.PREFILTER_VALID)
+
+
+def test_python_reindentation_is_a_change():
+    assert decide('a.py', "if a:\n    x = 1\n", (["x = 1"], ["    x = 1"])) is None
+
+
+@pytest.mark.parametrize("added, skipped", [
+    (["// fast path"], True),
+    (["/* fast path */"], True),
+    (["/* fast path */ return true;"], False),
+    (["/**", " * Documentation", " */"], True),
+    (["/* début", "*/ return true;"], False),
+    ([" * suite d'un bloc existant"], False),
+    (["*p = 1;"], False),
+])
+def test_comment_lines_must_be_whole_comments(added, skipped):
+    result = decide('a.js', "", ([], added))
+    assert (result is not None and result.startswith(analyzer.PREFILTER_VALID)) == skipped
+
+
+def test_python_comment_change_is_skipped():
+    assert decide('a.py', "# nouveau\nx = 1\n", (["# ancien"], ["# nouveau"])).startswith(analyzer.PREFILTER_VALID)
+
+
+def test_python_syntax_error_is_critical():
+    assert decide('a.py', "def f(:\n", ([], ["def f(:"])).startswith("[CRITICAL_ERROR]")
+
+
+@pytest.mark.parametrize("source", [
+    '{\n  // options du compilateur\n  "compilerOptions": {"strict": true,},\n}\n',
+    '{"a": 1',
+])
+def test_json_parse_failures_are_left_to_the_model(source):
+    assert decide('tsconfig.json', source, ([], ['"strict": true,'])) is None
+
+
+def test_yaml_custom_tags_are_valid():
+    source = "Resources:\n  Bucket:\n    Name: !Ref BucketName\n    Arn: !GetAtt Bucket.Arn\njob:\n  script: !reference [.setup, script]\n"
+    assert decide('template.yml', source, ([], ["    Name: !Ref BucketName"])) is None
+
+
+def test_broken_yaml_is_critical():
+    assert decide('ci.yml', "a: [1, 2\nb: 3\n", ([], ["a: [1, 2"])).startswith("[CRITICAL_ERROR]")
+
+
+def test_generated_detection_is_opt_in():
+    source = "// Code generated by protoc. DO NOT EDIT.\nconst x = 1;\n"
+    assert decide('gen.js', source, ([], ["const x = 1;"])) is None
+    config = copy.deepcopy(CONFIG)
+    config['analyzer']['generated_markers'] = True
+    assert decide('gen.js', source, ([], ["const x = 1;"]), config=config).startswith(analyzer.PREFILTER_VALID)
+
+
+def test_generated_marker_must_be_in_the_first_lines_and_not_added_by_the_patch():
+    config = copy.deepcopy(CONFIG)
+    config['analyzer']['generated_markers'] = True
+    late = "".join(f"const a{i} = {i};\n" for i in range(10)) + "// DO NOT EDIT\n"
+    assert decide('a.js', late, ([], ["const a1 = 1;"]), config=config) is None
+    added = "// DO NOT EDIT\nevil();\n"
+    assert decide('a.js', added, ([], ["// DO NOT EDIT", "evil();"]), config=config) is None
+
+
+def test_generated_path_globs():
+    config = copy.deepcopy(CONFIG)
+    config['analyzer']['generated_files'] = ['package-lock.json', 'gen/*.py']
+    assert decide('web/package-lock.json', "{}", ([], ['"a": 1'])) is None
+    assert decide('web/package-lock.json', "{}", ([], ['"a": 1']), config=config).startswith(analyzer.PREFILTER_VALID)
+    assert decide('gen/x.py', "x = 1\n", ([], ["x = 1"]), config=config).startswith(analyzer.PREFILTER_VALID)
+    assert decide('src/gen/x.py', "x = 1\n", ([], ["x = 1"]), config=config) is None
+
+
+def test_syntax_is_checked_on_the_pushed_commit(repo):
+    base = commit(repo, {'a.py': "x = 1\n"})
+    head = commit(repo, {'a.py': "x = 2\n"})
+    (repo / 'a.py').write_text("x = (\n")  # modification locale non commitée
+    files = analyzer.get_files_and_patches({'analyzer': {'analyzable_extensions': ['.py']}},
+                                           f"refs/heads/m {head} refs/heads/m {base}")
+    assert analyzer.prefilter_patch(files[0], CONFIG) is None
+
+    broken = commit(repo, {'a.py': "x = (\n"})
+    (repo / 'a.py').write_text("x = 3\n")
+    files = analyzer.get_files_and_patches({'analyzer': {'analyzable_extensions': ['.py']}},
+                                           f"refs/heads/m {broken} refs/heads/m {head}")
+    assert analyzer.prefilter_patch(files[0], CONFIG).startswith("[CRITICAL_ERROR]")
+
+
+def test_file_deleted_locally_is_still_analysed(repo):
+    base = commit(repo, {'a.py': "x = 1\n"})
+    head = commit(repo, {'a.py': "x = 2\n"})
+    (repo / 'a.py').unlink()
+    files = analyzer.get_files_and_patches({'analyzer': {'analyzable_extensions': ['.py']}},
+                                           f"refs/heads/m {head} refs/heads/m {base}")
+    assert [f['path'] for f in files] == ['a.py']
+    assert analyzer.read_file_sources(files[0]) == ["x = 2\n"]
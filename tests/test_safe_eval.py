@@ -0,0 +1,94 @@
+# tests/test_safe_eval.py
+
+from time import monotonic
+
+import pytest
+
+from calculator.safe_eval import (LimiteDepassee, Limites, compiler_expression, evaluer_expression,
+                                  statistiques_cache, vider_cache)
+
+
+@pytest.mark.parametrize("expression, attendu", [
+    ("2 + 3 * 4", 14),
+    ("(2 + 3) * 4", 20),
+    ("-2 ** 2", -4),
+    ("7 % 3", 1),
+    ("1 / 4", 0.25),
+])
+def test_arithmetic(expression, attendu):
+    assert evaluer_expression(expression) == attendu
+
+
+def test_variables_and_missing_variable():
+    assert evaluer_expression("price * qty * (1 - rate)", {"price": 2, "qty": 3, "rate": 0.5}) == 3
+    with pytest.raises(NameError, match="qty"):
+        evaluer_expression("price * qty", {"price": 2})
+
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "x.y", "[1, 2]", "'a' * 3", "2 // 3", "a if b else c"])
+def test_unsupported_syntax_is_rejected(expression):
+    with pytest.raises((TypeError, ValueError)):
+        evaluer_expression(expression, {"x": 1, "a": 1, "b": 1, "c": 1})
+
+
+@pytest.mark.parametrize("expression, limites, message", [
+    ("1 + " * 600 + "1", Limites(), "trop longue"),
+    ("+".join(["1"] * 600), Limites(max_noeuds=500), "trop grande"),
+    ("-" * 100 + "1", Limites(max_profondeur=50), "imbriquée"),
+    ("9 ** 9 ** 9", Limites(), "Puissance trop grande"),
+    ("x * x", Limites(max_bits=64), "Produit trop grand"),
+])
+def test_limits(expression, limites, message):
+    with pytest.raises(LimiteDepassee, match=message):
+        evaluer_expression(expression, {"x": 2 ** 40}, limites)
+
+
+@pytest.mark.parametrize("valeur", ["ab", b"ab", [1, 2], (1,), {"a": 1}, None])
+def test_non_numeric_variables_are_rejected(valeur):
+    with pytest.raises(TypeError, match="non numérique : x"):
+        evaluer_expression("x * y", {"x": valeur, "y": 10 ** 7})
+
+
+def test_default_limits_keep_large_integers():
+    assert evaluer_expression("2 ** 5000") == 2 ** 5000
+    assert evaluer_expression("x * x", {"x": 10 ** 1000}) == 10 ** 2000
+
+
+def test_parentheses_do_not_count_as_depth():
+    assert evaluer_expression("(" * 50 + "1" + ")" * 50, limites=Limites(max_profondeur=10)) == 1
+
+
+def test_limit_errors_are_value_errors():
+    assert issubclass(LimiteDepassee, ValueError)
+
+
+def test_deep_nesting_does_not_overflow_the_stack():
+    with pytest.raises(LimiteDepassee):
+        evaluer_expression("-" * 100_000 + "1", limites=Limites(max_longueur=200_000))
+
+
+def test_deadline_stops_evaluation():
+    longue = " + ".join(f"x * {i}" for i in range(150))
+    with pytest.raises(LimiteDepassee, match="Délai"):
+        evaluer_expression(longue, {"x": 1}, echeance=monotonic() - 1)
+    assert evaluer_expression(longue, {"x": 1}, echeance=monotonic() + 60) == sum(range(150))
+
+
+def test_folding_keeps_runtime_errors():
+    with pytest.raises(ZeroDivisionError):
+        evaluer_expression("1 / (2 - 2)")
+    assert compiler_expression("x + 2 * 3").plan()[-1].startswith("résultat")
+
+
+def test_optimisation_does_not_change_results():
+    expression = "(x + 1) * (x + 1) - 2 * 3 / (x + 1) + 0.1 + 0.2"
+    for x in (0, 1.5, -3):
+        assert compiler_expression(expression)({"x": x}) == compiler_expression(expression, optimiser=False)({"x": x})
+
+
+def test_compiled_expressions_are_cached():
+    vider_cache()
+    evaluer_expression("1 + 2")
+    evaluer_expression("1 + 2")
+    stats = statistiques_cache()
+    assert stats['succes'] >= 1 and stats['taille'] >= 1
@@ -0,0 +1,116 @@
+# tests/test_service.py
+
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter, time
+
+import pytest
+
+from service import Service, _evaluer_requete, _traiter_requetes, creer_pool
+
+
+async def _echanger(service: Service, requete: bytes) -> tuple[int, dict]:
+    """Envoie une requête HTTP brute à un serveur local et renvoie (statut, corps JSON)."""
+    serveur = await asyncio.start_server(service.connexion, '127.0.0.1', 0)
+    async with serveur:
+        lecteur, ecrivain = await asyncio.open_connection(*serveur.sockets[0].getsockname()[:2])
+        ecrivain.write(requete)
+        await ecrivain.drain()
+        reponse = await asyncio.wait_for(lecteur.read(), 5)
+        ecrivain.close()
+    en_tete, _, corps = reponse.partition(b'\r\n\r\n')
+    return int(en_tete.split()[1]), json.loads(corps)
+
+
+def echanger(requete: bytes, pool=None) -> tuple[int, dict]:
+    service = Service(processus=1, delai=2.0)
+    service.pool = pool
+    return asyncio.run(_echanger(service, requete))
+
+
+def poster(chemin: str, contenu) -> bytes:
+    donnees = json.dumps(contenu).encode()
+    return b"POST %s HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (
+        chemin.encode(), len(donnees), donnees)
+
+
+@pytest.mark.parametrize("longueur", ["abc", "-5", "1e3", "²"])
+def test_invalid_content_length_is_rejected(longueur):
+    statut, corps = echanger(f"POST /convertir/unite HTTP/1.1\r\nContent-Length: {longueur}\r\n\r\n{{}}".encode())
+    assert statut == 400
+    assert "Content-Length" in corps['erreur']
+
+
+def test_valid_request_is_answered():
+    donnees = json.dumps({"valeur": 36, "de": "km/h", "vers": "m/s"}).encode()
+    statut, corps = echanger(b"POST /convertir/unite HTTP/1.1\r\nConnection: close\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(donnees), donnees))
+    assert statut == 200
+    assert corps['resultat'] == pytest.approx(10.0)
+
+
+def test_batch_evaluation_runs_in_the_pool():
+    donnees = json.dumps([{"expression": "price * qty", "variables": {"price": 2, "qty": 3}},
+                          {"expression": "1 / 0"}]).encode()
+    with creer_pool(1) as pool:
+        statut, corps = echanger(b"POST /evaluer HTTP/1.1\r\nConnection: close\r\n"
+                                 b"Content-Length: %d\r\n\r\n%s" % (len(donnees), donnees), pool)
+    assert statut == 200
+    assert corps[0] == {'resultat': 6}
+    assert 'ZeroDivisionError' in corps[1]['erreur']
+
+
+def test_request_deadline_stops_the_rest_of_the_batch():
+    requetes = [{"expression": "1 + 1"}] * 1000
+    resultats = _traiter_requetes(_evaluer_requete, requetes, time() - 0.001)
+    assert all('LimiteDepassee' in resultat['erreur'] for resultat in resultats)
+
+    resultats = _traiter_requetes(_evaluer_requete, requetes, time() + 60)
+    assert all(resultat == {'resultat': 2} for resultat in resultats)
+
+
+def test_deadline_is_shared_across_the_batch():
+    # Chaque expression coûte un peu ; avec une échéance courte, le lot s'arrête en cours de route
+    lourde = {"expression": " + ".join(f"x * {i}" for i in range(150)), "variables": {"x": 3}}
+    debut = time()
+    resultats = _traiter_requetes(_evaluer_requete, [lourde] * 20_000, time() + 0.05)
+    assert time() - debut < 1.0
+    assert 'resultat' in resultats[0]
+    assert 'LimiteDepassee' in resultats[-1]['erreur']
+
+
+@pytest.mark.parametrize("variables", [{"x": "ab", "y": 10 ** 7}, {"x": [1, 2]}, {"x": True}, {"x": None}, [1, 2]])
+def test_non_numeric_variables_are_rejected(variables):
+    statut, corps = echanger(poster("/evaluer", [{"expression": "1"}, {"expression": "x * y", "variables": variables}]))
+    assert statut == 400
+    assert "variables" in corps['erreur'] or "non numérique" in corps['erreur']
+
+
+def test_unit_conversions_run_in_the_pool_and_are_bounded():
+    requetes = [{"valeur": 1, "de": "km^3000000", "vers": "m^3000000"}, {"valeur": 2, "de": "km", "vers": "m"}]
+    with creer_pool(1) as pool:
+        debut = perf_counter()
+        statut, corps = echanger(poster("/convertir/unite", requetes), pool)
+    assert perf_counter() - debut < 5
+    assert statut == 200
+    assert "Exposant" in corps[0]['erreur']
+    assert corps[1] == {'resultat': 2000.0}
+
+
+def test_broken_pool_answers_500_and_is_replaced():
+    async def scenario():
+        service = Service(processus=1, delai=5.0)
+        service.pool = pool = creer_pool(1)
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()  # un processus de calcul meurt
+        premier = await _echanger(service, poster("/evaluer", {"expression": "1 + 1"}))
+        assert service.pool is not pool
+        second = await _echanger(service, poster("/evaluer", {"expression": "1 + 1"}))
+        service.pool.shutdown()
+        return premier, second
+
+    (statut, corps), (statut_suivant, corps_suivant) = asyncio.run(scenario())
+    assert statut == 500 and "Processus de calcul" in corps['erreur']
+    assert statut_suivant == 200 and corps_suivant == {'resultat': 2}
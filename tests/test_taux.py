@@ -0,0 +1,164 @@
+# tests/test_taux.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from converters import currency
+from converters import taux as module_taux
+from converters.taux import FournisseurHTTP, MagasinTaux
+
+
+class Horloge:
+    """Remplace monotonic() : le temps n'avance que sur demande."""
+
+    def __init__(self) -> None:
+        self.maintenant = 1000.0
+
+    def __call__(self) -> float:
+        return self.maintenant
+
+
+class _Gestionnaire(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        serveur = self.server
+        serveur.appels += 1
+        serveur.liberer.wait(5)
+        if serveur.taux is None:
+            self.send_response(500)
+            self.end_headers()
+            return
+        corps = json.dumps({'rates': serveur.taux}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def serveur():
+    """Source de taux HTTP locale : taux servis (None : erreur 500) et réponse retenue tant que 'liberer' n'est pas levé."""
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), _Gestionnaire)
+    serveur.taux, serveur.appels, serveur.liberer = {'USD': 1.10, 'CHF': 0.95}, 0, threading.Event()
+    serveur.liberer.set()
+    serveur.url = f"http://127.0.0.1:{serveur.server_address[1]}/taux"
+    fil = threading.Thread(target=serveur.serve_forever, daemon=True)
+    fil.start()
+    yield serveur
+    serveur.liberer.set()
+    serveur.shutdown()
+    serveur.server_close()
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    horloge = Horloge()
+    monkeypatch.setattr(module_taux, 'monotonic', horloge)
+    return horloge
+
+
+def attendre(condition, delai=5.0):
+    limite = time.monotonic() + delai
+    while not condition():
+        assert time.monotonic() < limite, "condition jamais atteinte"
+        time.sleep(0.01)
+
+
+def test_fresh_rates_are_served_without_fetching(serveur, horloge):
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=60, initial={"EUR": 1.0})
+    magasin.rafraichir()
+    horloge.maintenant += 30
+    assert magasin.taux()["CHF"] == 0.95
+    assert serveur.appels == 1
+
+
+def test_stale_rates_are_served_while_refreshing(serveur, horloge):
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=60, initial={"EUR": 1.0})
+    magasin.rafraichir()
+    serveur.taux, serveur.liberer = {'USD': 1.20, 'CHF': 0.90}, threading.Event()
+    horloge.maintenant += 61
+
+    debut = time.monotonic()
+    assert magasin.taux()["USD"] == 1.10  # ancien instantané, sans attendre la source
+    assert time.monotonic() - debut < 0.5
+    attendre(lambda: serveur.appels == 2)
+    assert magasin.taux()["USD"] == 1.10  # un seul rafraîchissement en vol
+
+    serveur.liberer.set()
+    attendre(lambda: magasin.taux()["USD"] == 1.20)
+    assert serveur.appels == 2
+
+
+def test_expired_rates_are_dropped_while_the_source_fails(serveur, horloge):
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=0.2, expiration=0.5,
+                          initial={"EUR": 1.0}, delai_reessai=0.1)
+    magasin.rafraichir()
+    serveur.taux = None
+
+    horloge.maintenant += 0.3
+    magasin.rafraichir()
+    assert magasin.derniere_erreur is not None
+    assert magasin.taux()["CHF"] == 0.95  # périmé mais pas expiré : toujours servi
+
+    horloge.maintenant += 0.3
+    assert "CHF" not in magasin.taux()  # expiré, sans attendre un rafraîchissement réussi
+    assert magasin.taux()["EUR"] == 1.0
+    attendre(lambda: not magasin._verrou.locked())
+    assert "CHF" not in magasin.taux()
+
+
+def test_failed_refresh_drops_expired_rates(serveur, horloge):
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=None, expiration=10, initial={"EUR": 1.0})
+    magasin.rafraichir()
+    serveur.taux = None
+    horloge.maintenant += 11
+    magasin.rafraichir()
+    assert "USD" not in magasin._instantane.taux
+
+
+def test_invalid_rates_from_the_source_are_dropped(serveur, horloge):
+    serveur.taux = {'USD': 1.25, 'ZAR': 0, 'TRY': -3, 'ARS': float('nan'), 'CHF': 'n/a', 'SEK': float('inf')}
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=60, initial={"EUR": 1.0, "ZAR": 20.0})
+    magasin.rafraichir()
+    assert magasin.derniere_erreur is None
+    assert dict(magasin.taux()) == {"EUR": 1.0, "ZAR": 20.0, "USD": 1.25}
+
+
+def test_a_response_without_valid_rates_is_a_failure(serveur, horloge):
+    serveur.taux = {'USD': 0, 'CHF': float('nan')}
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=60, initial={"EUR": 1.0, "USD": 1.08})
+    magasin.rafraichir()
+    assert isinstance(magasin.derniere_erreur, ValueError)
+    assert magasin.taux()["USD"] == 1.08
+
+
+def test_custom_providers_are_validated_too():
+    fournisseur = module_taux.FournisseurStatique({"EUR": 1.0, "USD": -1.0, "GBP": 0.85})
+    magasin = MagasinTaux(fournisseur, ttl=None, initial={"EUR": 1.0, "USD": 1.08})
+    magasin.rafraichir()
+    assert dict(magasin.taux()) == {"EUR": 1.0, "USD": 1.08, "GBP": 0.85}
+
+
+def test_each_snapshot_carries_its_cross_rates(serveur, horloge):
+    magasin = MagasinTaux(FournisseurHTTP(serveur.url), ttl=60, initial={"EUR": 1.0})
+    magasin.rafraichir()
+    assert magasin.instantane().graphe.taux("USD", "CHF") == pytest.approx(0.95 / 1.10)
+    serveur.taux = {'USD': 1.25}
+    magasin.rafraichir()
+    assert magasin.instantane().graphe.taux("USD", "CHF") == pytest.approx(0.95 / 1.25)
+
+
+def test_currency_conversion_uses_the_snapshot_graph(monkeypatch):
+    magasin = MagasinTaux(module_taux.FournisseurStatique(), ttl=None, initial={"EUR": 1.0, "USD": 1.25, "GBP": 0.8})
+    monkeypatch.setattr(currency, '_magasin', magasin)
+    assert currency.convertir_devise(100, "USD", "GBP") == pytest.approx(64.0)
+    assert currency.convertir_devise(7, "GBP", "GBP") == 7
+    with pytest.raises(ValueError, match="Devise non supportée"):
+        currency.convertir_devise(1, "EUR", "JPY")
@@ -0,0 +1,91 @@
+# tests/test_taux_historiques.py
+
+from datetime import date
+
+import pytest
+
+import converters.taux_historiques as module
+from converters.taux_historiques import TableHistorique, ecrire_table
+
+DATES = [date(2024, 1, 3), date(2024, 1, 1), date(2024, 1, 10)]  # volontairement dans le désordre
+DEVISES = ["EUR", "usd", "GBP"]
+TAUX = [
+    [1.0, 1.10, 0.86],
+    [1.0, 1.08, 0.85],
+    [1.0, 1.20, 0.90],
+]
+
+
+@pytest.fixture
+def table(tmp_path):
+    chemin = tmp_path / "taux.fxh"
+    ecrire_table(str(chemin), DATES, DEVISES, TAUX)
+    with TableHistorique(str(chemin)) as table:
+        yield table
+
+
+def test_round_trip(table):
+    assert table.devises == ["EUR", "USD", "GBP"]
+    assert list(table.jours) == [(d - module.EPOQUE).days for d in sorted(DATES)]
+    assert table.taux("USD", date(2024, 1, 1)) == 1.08
+    assert table.taux("GBP", date(2024, 1, 10)) == 0.90
+
+
+@pytest.mark.parametrize("jour, attendu", [
+    (date(2024, 1, 1), 1.08),
+    (date(2024, 1, 2), 1.08),
+    (date(2024, 1, 3), 1.10),
+    (date(2024, 1, 9), 1.10),
+    (date(2030, 1, 1), 1.20),
+])
+def test_last_rate_on_or_before_the_day(table, jour, attendu):
+    assert table.taux("USD", jour) == attendu
+    assert table.taux("USD", (jour - module.EPOQUE).days) == attendu
+
+
+def test_dates_before_the_first_row_and_unknown_currencies(table):
+    with pytest.raises(ValueError, match="Aucun taux"):
+        table.taux("USD", date(2023, 12, 31))
+    with pytest.raises(ValueError, match="Devise non supportée"):
+        table.convertir(1, "EUR", "JPY", date(2024, 1, 5))
+
+
+def test_cross_conversion(table):
+    assert table.convertir(100, "USD", "GBP", date(2024, 1, 5)) == pytest.approx(100 / 1.10 * 0.86)
+
+
+def test_batch_conversion_with_datetime64(table):
+    np = pytest.importorskip("numpy")
+    jours = np.array(["2024-01-01", "2024-01-05", "2024-01-10T18:30"], dtype="datetime64[m]")
+    resultat = table.convertir_lot([100, 100, 100], "EUR", np.array(["USD", "GBP", "USD"]), jours)
+    np.testing.assert_allclose(resultat, [108.0, 86.0, 120.0])
+
+    indices = table.indices_devises(["GBP", "GBP", "EUR"])
+    np.testing.assert_allclose(table.convertir_lot([1, 2, 3], indices, "EUR", jours), [1 / 0.85, 2 / 0.86, 3.0])
+
+    with pytest.raises(ValueError, match="précèdent"):
+        table.convertir_lot([1], "EUR", "USD", np.array(["2023-06-01"], dtype="datetime64[D]"))
+    with pytest.raises(ValueError, match="Devise non supportée"):
+        table.convertir_lot([1], "EUR", ["JPY"], jours[:1])
+
+
+def test_batch_conversion_without_numpy(table, monkeypatch):
+    monkeypatch.setattr(module, "np", None)
+    jours = [date(2024, 1, 1), date(2024, 1, 10)]
+    assert table.convertir_lot([10, 10], ["EUR", "EUR"], ["USD", "GBP"], jours) == pytest.approx([10.8, 9.0])
+
+
+@pytest.mark.parametrize("devises, taux, message", [
+    (["EURO"], [[1.0]] * 3, "codes ISO"),
+    (["EUR", "USD"], [[1.0]] * 3, "une ligne par date"),
+])
+def test_invalid_tables_are_rejected(tmp_path, devises, taux, message):
+    with pytest.raises(ValueError, match=message):
+        ecrire_table(str(tmp_path / "t.fxh"), DATES, devises, taux)
+
+
+def test_foreign_files_are_rejected(tmp_path):
+    chemin = tmp_path / "autre.bin"
+    chemin.write_bytes(b"PK\x03\x04" + bytes(60))
+    with pytest.raises(ValueError, match="invalide"):
+        TableHistorique(str(chemin))
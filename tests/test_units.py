@@ -0,0 +1,101 @@
+# tests/test_units.py
+
+from array import array
+from fractions import Fraction
+
+import pytest
+
+import converters.vectorise as vectorise
+from converters.units import (REGISTRE, RegistreUnites, convertir_longueur, convertir_masse, convertir_temperature,
+                              get_converter)
+from converters.vectorise import (convertir_longueur_tableau, convertir_masse_tableau, convertir_tableau,
+                                  convertir_temperature_tableau)
+
+
+def test_matrices_are_computed_from_exact_fractions():
+    # 0.0254 / 0.01 en flottants donnerait 2.5399999999999996
+    assert convertir_longueur(1, 'in', 'cm') == 2.54
+    assert convertir_longueur(1, 'ft', 'in') == 12.0
+    assert convertir_longueur(1, 'yd', 'ft') == 3.0
+    assert convertir_masse(1, 't', 'mg') == 1e9
+    assert convertir_longueur(1, 'km', 'mi') * convertir_longueur(1, 'mi', 'km') == pytest.approx(1, abs=1e-15)
+
+
+@pytest.mark.parametrize("valeur, de, vers, attendu", [
+    (100, 'C', 'F', 212.0),
+    (32, 'F', 'C', 0.0),
+    (-40, 'C', 'F', -40.0),
+    (0, 'K', 'C', -273.15),
+    (212, 'F', 'K', 373.15),
+    (300, 'K', 'K', 300.0),
+])
+def test_temperatures_are_affine(valeur, de, vers, attendu):
+    assert convertir_temperature(valeur, de, vers) == pytest.approx(attendu, abs=1e-12)
+    assert get_converter(de, vers)(valeur) == pytest.approx(attendu, abs=1e-12)
+
+
+def test_converters_are_built_once_per_pair():
+    assert get_converter('km', 'm') is get_converter('km', 'm')
+    assert get_converter('km', 'm')(1.5) == 1500.0
+
+
+@pytest.mark.parametrize("de, vers, message", [
+    ('km', 'kg', "incompatibles"),
+    ('C', 'm', "incompatibles"),
+    ('furlong', 'm', "non reconnue"),
+])
+def test_invalid_pairs_raise_value_error(de, vers, message):
+    with pytest.raises(ValueError, match=message):
+        get_converter(de, vers)
+
+
+def test_unknown_unit_in_a_dimension():
+    with pytest.raises(ValueError, match="longueur"):
+        convertir_longueur(1, 'km', 'kg')
+
+
+def test_dimensions_can_be_added_at_runtime():
+    registre = RegistreUnites()
+    registre.ajouter_dimension('durée', {'s': 1, 'min': 60, 'h': 3600})
+    assert 'min' in registre and 'min' not in REGISTRE
+    assert registre.get_converter('h', 'min')(2) == 120
+    assert registre.dimensions['durée'].vers_base['h'] == (Fraction(3600), Fraction(0))
+    with pytest.raises(ValueError, match="déjà enregistrées"):
+        registre.ajouter_dimension('temps', {'s': 1})
+
+
+def test_bulk_conversion_matches_scalar_conversion():
+    np = pytest.importorskip("numpy")
+    valeurs = np.array([-40.0, 0.0, 36.6, 100.0])
+    resultat = convertir_tableau(valeurs, 'C', 'F')
+    np.testing.assert_allclose(resultat, [convertir_temperature(v, 'C', 'F') for v in valeurs])
+    assert resultat is not valeurs and valeurs[0] == -40.0
+    np.testing.assert_allclose(convertir_masse_tableau(np.array([1.0, 2.5]), 'kg', 'g'), [1000.0, 2500.0])
+
+
+def test_output_buffer_and_in_place_conversion():
+    np = pytest.importorskip("numpy")
+    valeurs = np.array([1.0, 2.0, 3.0])
+    sortie = np.empty(3)
+    assert convertir_longueur_tableau(valeurs, 'km', 'm', sortie=sortie) is sortie
+    np.testing.assert_array_equal(sortie, [1000.0, 2000.0, 3000.0])
+    assert convertir_temperature_tableau(valeurs, 'K', 'C', sortie=valeurs) is valeurs
+    np.testing.assert_allclose(valeurs, [-272.15, -271.15, -270.15])
+
+    tampon = array('d', [0.0, 100.0])
+    assert convertir_tableau(tampon, 'C', 'K', sortie=tampon) is tampon
+    assert list(tampon) == pytest.approx([273.15, 373.15])
+
+
+def test_bulk_conversion_rejects_cross_dimension_pairs():
+    with pytest.raises(ValueError):
+        convertir_tableau(array('d', [1.0]), 'km', 'kg')
+
+
+def test_pure_python_fallback_without_numpy(monkeypatch):
+    monkeypatch.setattr(vectorise, "np", None)
+    resultat = convertir_tableau(array('d', [32.0, 212.0]), 'F', 'C')
+    assert isinstance(resultat, array) and list(resultat) == pytest.approx([0.0, 100.0])
+    tampon = array('d', [1.0, 2.0])
+    assert convertir_longueur_tableau(tampon, 'm', 'cm', sortie=tampon) is tampon
+    assert list(tampon) == [100.0, 200.0]
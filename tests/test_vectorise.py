@@ -0,0 +1,42 @@
+# tests/test_vectorise.py
+
+from array import array
+
+import pytest
+
+import calculator.vectorise as vectorise
+from calculator.safe_eval import evaluer_expression
+
+np = pytest.importorskip("numpy")
+
+
+def test_columns_match_row_by_row_evaluation():
+    expression = "price * qty * (1 - rate) + 0.5"
+    prix, quantites = np.array([2.0, 3.5, 10.0]), np.array([1, 4, 7])
+    resultat = vectorise.evaluer_vectorise(expression, {"price": prix, "qty": quantites, "rate": 0.1})
+    attendus = [evaluer_expression(expression, {"price": p, "qty": q, "rate": 0.1}) for p, q in zip(prix, quantites)]
+    assert isinstance(resultat, np.ndarray)
+    np.testing.assert_allclose(resultat, attendus)
+
+
+def test_buffers_are_read_without_copy():
+    tampon = array('d', [1.0, 2.0, 3.0])
+    assert np.shares_memory(vectorise._en_tableau(tampon), np.frombuffer(tampon, dtype='d'))
+    np.testing.assert_array_equal(vectorise.evaluer_vectorise("x * 2", {"x": tampon}), [2.0, 4.0, 6.0])
+
+
+def test_lists_and_scalars_are_accepted():
+    np.testing.assert_array_equal(vectorise.evaluer_vectorise("x ** 2 - y", {"x": [1, 2, 3], "y": 1}), [0, 3, 8])
+
+
+def test_text_columns_are_rejected():
+    with pytest.raises(TypeError, match="non numérique"):
+        vectorise.evaluer_vectorise("x * 3", {"x": ["a", "b"]})
+
+
+def test_missing_variable_and_numpy_absent(monkeypatch):
+    with pytest.raises(NameError, match="y"):
+        vectorise.evaluer_vectorise("x + y", {"x": np.arange(3)})
+    monkeypatch.setattr(vectorise, "np", None)
+    with pytest.raises(ImportError, match="NumPy"):
+        vectorise.evaluer_vectorise("x", {"x": [1]})
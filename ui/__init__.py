@@ -1,3 +1,9 @@
 # ui/__init__.py
+# Import différé : 'ui.demarrage' ou 'ui.apercu' s'importent sans charger tkinter
 
-from .interface import lancer_interface
\ No newline at end of file
+
+def __getattr__(nom: str):
+    if nom == 'lancer_interface':
+        from .interface import lancer_interface
+        return lancer_interface
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
@@ -0,0 +1,115 @@
+# ui/apercu.py
+
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from calculator.safe_eval import Limites, compiler_expression
+
+ANTIREBOND_MS: int = 120      # attente après la dernière frappe avant d'évaluer
+BUDGET_MS: float = 16.0       # une image à 60 Hz
+PERIODE_MS: int = 5           # relève des résultats tant qu'une évaluation est en vol
+
+# Budgets serrés : un aperçu ne doit jamais coûter plus d'une image
+LIMITES_APERCU = Limites(max_longueur=500, max_noeuds=500, max_bits=1_024, delai=0.010)
+
+_FIN_INCOMPLETE = '+-*/%( '
+
+
+def prefixe_evaluable(texte: str) -> str:
+    """
+    Partie de la saisie qui forme déjà une expression : '12*3+' -> '12*3', '(1+2' -> '(1+2)'.
+    Pendant la frappe, ce préfixe est très souvent l'expression déjà compilée à la frappe
+    précédente : le cache de compiler_expression la resert sans nouvelle analyse.
+    """
+    texte = texte.rstrip(_FIN_INCOMPLETE)
+    ouvertes = texte.count('(') - texte.count(')')
+    return texte + ')' * ouvertes if ouvertes > 0 else texte
+
+
+def _evaluer_apercu(texte: str) -> tuple[Optional[Any], float]:
+    debut = perf_counter()
+    prefixe = prefixe_evaluable(texte)
+    try:
+        resultat = compiler_expression(prefixe, LIMITES_APERCU)({}) if prefixe else None
+    except Exception:
+        resultat = None  # saisie encore invalide : pas d'aperçu plutôt qu'une erreur
+    return resultat, (perf_counter() - debut) * 1000
+
+
+class ApercuDirect:
+    """
+    Aperçu du résultat pendant la frappe : évaluation après un court anti-rebond, dans un
+    thread dédié, avec un numéro de génération par saisie pour écarter les résultats périmés.
+    La durée de chaque aperçu (évaluation + affichage) est transmise au crochet de mesure.
+    """
+
+    def __init__(self, widget: Any, afficher: Callable[[Optional[Any]], None],
+                 crochet_mesure: Optional[Callable[[float, bool], None]] = None,
+                 antirebond_ms: int = ANTIREBOND_MS, budget_ms: float = BUDGET_MS) -> None:
+        self.widget = widget
+        self.afficher = afficher
+        self.crochet_mesure = crochet_mesure
+        self.antirebond_ms = antirebond_ms
+        self.budget_ms = budget_ms
+        self.mesures: deque[float] = deque(maxlen=200)
+        self.generation = 0
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apercu")
+        self._resultats: queue.SimpleQueue = queue.SimpleQueue()
+        self._antirebond: Optional[str] = None
+        self._releve: Optional[str] = None
+        self._en_vol = 0
+
+    def texte_modifie(self, texte: str) -> None:
+        self.generation += 1
+        if self._antirebond is not None:
+            self.widget.after_cancel(self._antirebond)
+        generation = self.generation
+        self._antirebond = self.widget.after(self.antirebond_ms, lambda: self._lancer(generation, texte))
+
+    def _lancer(self, generation: int, texte: str) -> None:
+        self._antirebond = None
+        self._en_vol += 1
+        futur = self._executeur.submit(_evaluer_apercu, texte)
+        futur.add_done_callback(lambda f: f.cancelled() or self._resultats.put((generation, f.result())))
+        if self._releve is None:
+            self._releve = self.widget.after(PERIODE_MS, self._relever)
+
+    def _relever(self) -> None:
+        self._releve = None
+        while True:
+            try:
+                generation, (resultat, duree_ms) = self._resultats.get_nowait()
+            except queue.Empty:
+                break
+            self._en_vol -= 1
+            if generation != self.generation:
+                continue  # la saisie a changé depuis : résultat périmé
+            debut = perf_counter()
+            self.afficher(resultat)
+            self._mesurer(duree_ms + (perf_counter() - debut) * 1000)
+
+        if self._en_vol:
+            self._releve = self.widget.after(PERIODE_MS, self._relever)
+
+    def _mesurer(self, duree_ms: float) -> None:
+        self.mesures.append(duree_ms)
+        if self.crochet_mesure is not None:
+            self.crochet_mesure(duree_ms, duree_ms <= self.budget_ms)
+
+    def statistiques(self) -> dict[str, float]:
+        """Médiane et maximum des derniers aperçus, en millisecondes."""
+        if not self.mesures:
+            return {'mediane_ms': 0.0, 'max_ms': 0.0, 'hors_budget': 0}
+        triees = sorted(self.mesures)
+        return {
+            'mediane_ms': triees[len(triees) // 2],
+            'max_ms': triees[-1],
+            'hors_budget': sum(duree > self.budget_ms for duree in triees),
+        }
+
+    def fermer(self) -> None:
+        self.generation += 1
+        self._executeur.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,44 @@
+# ui/demarrage.py
+
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, Optional, TextIO
+
+
+class ProfilDemarrage:
+    """
+    Chronométrage du démarrage (option --startup-profile) : chaque import ou construction
+    mesuré est une étape, les étapes imbriquées sont indentées sous leur parente.
+    Pour le détail module par module des imports : python -X importtime main.py
+    """
+
+    def __init__(self, origine: Optional[float] = None) -> None:
+        self.origine = perf_counter() if origine is None else origine
+        self.etapes: list[list] = []   # [nom, profondeur, durée en ms]
+        self._profondeur = 0
+
+    @contextmanager
+    def etape(self, nom: str) -> Iterator[None]:
+        entree = [nom, self._profondeur, 0.0]
+        self.etapes.append(entree)
+        self._profondeur += 1
+        debut = perf_counter()
+        try:
+            yield
+        finally:
+            entree[2] = (perf_counter() - debut) * 1000
+            self._profondeur -= 1
+
+    def mesure_apercu(self, duree_ms: float, dans_budget: bool, flux: TextIO = sys.stderr) -> None:
+        """Crochet de mesure de l'aperçu (ApercuDirect) : signale chaque aperçu qui dépasse son budget."""
+        if not dans_budget:
+            print(f"Aperçu hors budget : {duree_ms:.1f} ms", file=flux)
+
+    def rapport(self, evenement: str = "première image", flux: TextIO = sys.stderr) -> None:
+        evenement = f"{evenement} après"
+        largeur = max([len(evenement)] + [len(nom) + 2 * profondeur for nom, profondeur, _ in self.etapes]) + 2
+        print("Démarrage (ms) :", file=flux)
+        for nom, profondeur, duree in self.etapes:
+            print(f"  {'  ' * profondeur}{nom:<{largeur - 2 * profondeur}}{duree:8.1f}", file=flux)
+        print(f"  {evenement:<{largeur}}{(perf_counter() - self.origine) * 1000:8.1f}", file=flux)
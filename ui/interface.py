@@ -1,137 +1,310 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from contextlib import nullcontext
+from tkinter import ttk
+from typing import Any, Callable, Optional
 
-from calculator.safe_eval import evaluer_expression
-from converters.units import convertir_longueur, convertir_masse, convertir_temperature
-from converters.currency import convertir_devise
+from ui.demarrage import ProfilDemarrage
 
-def lancer_interface() -> None:
-    fenetre = tk.Tk()
-    fenetre.title("Calculatrice & Convertisseur")
-    fenetre.geometry("500x400")
+# Seuls tkinter et ttk sont nécessaires à la première image : calculatrice, convertisseurs,
+# historique et processus de calcul sont importés par l'onglet qui s'en sert, à sa construction.
 
-    onglets = ttk.Notebook(fenetre)
-    onglet_calc = ttk.Frame(onglets)
-    onglet_unites = ttk.Frame(onglets)
-    onglet_devises = ttk.Frame(onglets)
 
-    onglets.add(onglet_calc, text="Calculatrice")
-    onglets.add(onglet_unites, text="Convertisseur d'unités")
-    onglets.add(onglet_devises, text="Convertisseur de devises")
-    onglets.pack(expand=1, fill="both")
+def convertir_selon_type(type_u: str, valeur: float, de: str, vers: str) -> float:
+    from converters.units import convertir_longueur, convertir_masse, convertir_temperature
+
+    if type_u == "longueur":
+        return convertir_longueur(valeur, de, vers)
+    elif type_u == "masse":
+        return convertir_masse(valeur, de, vers)
+    elif type_u == "température":
+        return convertir_temperature(valeur, de, vers)
+    else:
+        raise ValueError("Type d'unité inconnu")
+
+
+def afficher_erreur(message: str) -> None:
+    from tkinter import messagebox
+    messagebox.showerror("Erreur", message)
+
+
+def lancer_interface(profil: Optional[ProfilDemarrage] = None) -> None:
+    mesurer = profil.etape if profil is not None else (lambda nom: nullcontext())
+
+    with mesurer("fenêtre et onglets"):
+        fenetre = tk.Tk()
+        fenetre.title("Calculatrice & Convertisseur")
+        fenetre.geometry("500x480")
+
+        onglets = ttk.Notebook(fenetre)
+        onglet_calc = ttk.Frame(onglets)
+        onglet_unites = ttk.Frame(onglets)
+        onglet_devises = ttk.Frame(onglets)
+        onglet_historique = ttk.Frame(onglets)
+
+        onglets.add(onglet_calc, text="Calculatrice")
+        onglets.add(onglet_unites, text="Convertisseur d'unités")
+        onglets.add(onglet_devises, text="Convertisseur de devises")
+        onglets.add(onglet_historique, text="Historique")
+        onglets.pack(expand=1, fill="both")
+
+    # Ressources partagées entre onglets, ouvertes au premier besoin et refermées à la sortie
+    a_fermer: list[Callable[[], None]] = []
+    partage: dict[str, Any] = {}
+
+    def obtenir_historique() -> Any:
+        # Résultats déjà calculés (y compris lors des sessions précédentes) servis sans recalcul
+        if "historique" not in partage:
+            from historique import HistoriqueResultats
+            partage["historique"] = HistoriqueResultats()
+            a_fermer.append(partage["historique"].fermer)
+        return partage["historique"]
+
+    def calcul_asynchrone() -> Any:
+        # Les calculs s'exécutent hors de la boucle Tk : la fenêtre reste réactive.
+        # Le processus de calcul lui-même n'est lancé qu'au premier calcul.
+        from ui.travailleur import CalculAsynchrone
+        calcul = CalculAsynchrone(fenetre)
+        a_fermer.append(calcul.fermer)
+        return calcul
 
     # 🧮 Onglet Calculatrice améliorée
-    champ_expr = tk.Entry(onglet_calc, width=30, font=("Arial", 16), justify="right")
-    champ_expr.grid(row=0, column=0, columnspan=4, pady=10)
+    def construire_calc() -> None:
+        with mesurer("import calculator.safe_eval"):
+            from calculator.safe_eval import evaluer_expression
+        with mesurer("import ui.apercu"):
+            from ui.apercu import ApercuDirect
 
-    label_resultat_calc = tk.Label(onglet_calc, text="Résultat :", font=("Arial", 14))
-    label_resultat_calc.grid(row=1, column=0, columnspan=4)
+        calcul_calc = calcul_asynchrone()
 
-    def ajouter_caractere(caractere: str) -> None:
-        champ_expr.insert(tk.END, caractere)
+        texte_expr = tk.StringVar()
+        champ_expr = tk.Entry(onglet_calc, textvariable=texte_expr, width=30, font=("Arial", 16), justify="right")
+        champ_expr.grid(row=0, column=0, columnspan=4, pady=10)
 
-    def effacer() -> None:
-        champ_expr.delete(0, tk.END)
+        label_resultat_calc = tk.Label(onglet_calc, text="Résultat :", font=("Arial", 14))
+        label_resultat_calc.grid(row=1, column=0, columnspan=4)
 
-    def calculer_expression() -> None:
-        expr = champ_expr.get()
-        try:
-            resultat = evaluer_expression(expr)
-            label_resultat_calc.config(text=f"Résultat : {resultat}")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Expression invalide : {e}")
-
-    boutons = [
-        ("7", 2, 0), ("8", 2, 1), ("9", 2, 2), ("/", 2, 3),
-        ("4", 3, 0), ("5", 3, 1), ("6", 3, 2), ("*", 3, 3),
-        ("1", 4, 0), ("2", 4, 1), ("3", 4, 2), ("-", 4, 3),
-        ("0", 5, 0), (".", 5, 1), ("C", 5, 2), ("+", 5, 3),
-        ("=", 6, 0, 4)
-    ]
-
-    for texte, ligne, colonne, *colspan in boutons:
-        span = colspan[0] if colspan else 1
-        action = (
-            calculer_expression if texte == "=" else
-            effacer if texte == "C" else
-            lambda t=texte: ajouter_caractere(t)
+        label_apercu = tk.Label(onglet_calc, text="", font=("Arial", 10), fg="grey")
+        label_apercu.grid(row=8, column=0, columnspan=4)
+
+        # Aperçu pendant la frappe (clavier comme boutons, via la variable du champ)
+        apercu = ApercuDirect(
+            fenetre,
+            lambda resultat: label_apercu.config(text="" if resultat is None else f"≈ {resultat}"),
+            crochet_mesure=profil.mesure_apercu if profil is not None else None
         )
-        tk.Button(onglet_calc, text=texte, width=6, height=2, font=("Arial", 12),
-                  command=action).grid(row=ligne, column=colonne, columnspan=span, padx=2, pady=2)
+        a_fermer.insert(0, apercu.fermer)
+        texte_expr.trace_add("write", lambda *_: apercu.texte_modifie(texte_expr.get()))
+
+        def ajouter_caractere(caractere: str) -> None:
+            champ_expr.insert(tk.END, caractere)
+
+        def effacer() -> None:
+            champ_expr.delete(0, tk.END)
+
+        def etat_calc(actif: bool) -> None:
+            label_etat_calc.config(text="Calcul en cours…" if actif else "")
+            bouton_annuler_calc.config(state=tk.NORMAL if actif else tk.DISABLED)
+
+        def afficher_resultat_calc(resultat) -> None:
+            label_resultat_calc.config(text=f"Résultat : {resultat}")
+
+        def calculer_expression() -> None:
+            from historique import cle_expression
+
+            expr = champ_expr.get()
+            cle = cle_expression(expr)
+            memorise = obtenir_historique().chercher(cle)
+            if memorise is not None:
+                afficher_resultat_calc(memorise)
+                return
+
+            def succes(resultat) -> None:
+                obtenir_historique().enregistrer(cle, "expression", expr, resultat)
+                afficher_resultat_calc(resultat)
+
+            calcul_calc.lancer(
+                evaluer_expression, (expr,), succes,
+                lambda e: afficher_erreur(f"Expression invalide : {e}"),
+                etat_calc
+            )
+
+        boutons = [
+            ("7", 2, 0), ("8", 2, 1), ("9", 2, 2), ("/", 2, 3),
+            ("4", 3, 0), ("5", 3, 1), ("6", 3, 2), ("*", 3, 3),
+            ("1", 4, 0), ("2", 4, 1), ("3", 4, 2), ("-", 4, 3),
+            ("0", 5, 0), (".", 5, 1), ("C", 5, 2), ("+", 5, 3),
+            ("=", 6, 0, 4)
+        ]
+
+        for texte, ligne, colonne, *colspan in boutons:
+            span = colspan[0] if colspan else 1
+            action = (
+                calculer_expression if texte == "=" else
+                effacer if texte == "C" else
+                lambda t=texte: ajouter_caractere(t)
+            )
+            tk.Button(onglet_calc, text=texte, width=6, height=2, font=("Arial", 12),
+                      command=action).grid(row=ligne, column=colonne, columnspan=span, padx=2, pady=2)
+
+        label_etat_calc = tk.Label(onglet_calc, text="", font=("Arial", 10))
+        label_etat_calc.grid(row=7, column=0, columnspan=3)
+
+        bouton_annuler_calc = tk.Button(onglet_calc, text="Annuler", state=tk.DISABLED, command=calcul_calc.annuler)
+        bouton_annuler_calc.grid(row=7, column=3, padx=2, pady=2)
 
     # 📏 Onglet Unités
-    types_unites = ["longueur", "masse", "température"]
-    unite_type = tk.StringVar(value=types_unites[0])
-    menu_type = ttk.Combobox(onglet_unites, textvariable=unite_type, values=types_unites)
-    menu_type.pack(pady=5)
-
-    champ_valeur = tk.Entry(onglet_unites)
-    champ_valeur.pack(pady=5)
-
-    champ_de = tk.Entry(onglet_unites)
-    champ_de.pack(pady=5)
-    champ_de.insert(0, "m")
-
-    champ_vers = tk.Entry(onglet_unites)
-    champ_vers.pack(pady=5)
-    champ_vers.insert(0, "cm")
-
-    label_resultat_unite = tk.Label(onglet_unites, text="Résultat :")
-    label_resultat_unite.pack()
-
-    def convertir_unite() -> None:
-        try:
-            valeur = float(champ_valeur.get())
-            de = champ_de.get()
-            vers = champ_vers.get()
-            type_u = unite_type.get()
-
-            if type_u == "longueur":
-                resultat = convertir_longueur(valeur, de, vers)
-            elif type_u == "masse":
-                resultat = convertir_masse(valeur, de, vers)
-            elif type_u == "température":
-                resultat = convertir_temperature(valeur, de, vers)
-            else:
-                raise ValueError("Type d'unité inconnu")
+    def construire_unites() -> None:
+        calcul_unites = calcul_asynchrone()
+
+        types_unites = ["longueur", "masse", "température"]
+        unite_type = tk.StringVar(value=types_unites[0])
+        menu_type = ttk.Combobox(onglet_unites, textvariable=unite_type, values=types_unites)
+        menu_type.pack(pady=5)
 
+        champ_valeur = tk.Entry(onglet_unites)
+        champ_valeur.pack(pady=5)
+
+        champ_de = tk.Entry(onglet_unites)
+        champ_de.pack(pady=5)
+        champ_de.insert(0, "m")
+
+        champ_vers = tk.Entry(onglet_unites)
+        champ_vers.pack(pady=5)
+        champ_vers.insert(0, "cm")
+
+        label_resultat_unite = tk.Label(onglet_unites, text="Résultat :")
+        label_resultat_unite.pack()
+
+        def erreur_unite(e: Exception) -> None:
+            afficher_erreur(f"Conversion impossible : {e}")
+
+        def etat_unites(actif: bool) -> None:
+            label_etat_unites.config(text="Calcul en cours…" if actif else "")
+            bouton_annuler_unites.config(state=tk.NORMAL if actif else tk.DISABLED)
+
+        def afficher_resultat_unite(resultat: float) -> None:
             label_resultat_unite.config(text=f"Résultat : {resultat:.4f}")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Conversion impossible : {e}")
 
-    bouton_convertir_unite = tk.Button(onglet_unites, text="Convertir", command=convertir_unite)
-    bouton_convertir_unite.pack(pady=5)
+        def convertir_unite() -> None:
+            from historique import cle_conversion
+
+            try:
+                valeur = float(champ_valeur.get())
+            except ValueError as e:
+                erreur_unite(e)
+                return
+            arguments = (unite_type.get(), valeur, champ_de.get(), champ_vers.get())
+            cle = cle_conversion(*arguments)
+            memorise = obtenir_historique().chercher(cle)
+            if memorise is not None:
+                afficher_resultat_unite(memorise)
+                return
+
+            def succes(resultat: float) -> None:
+                obtenir_historique().enregistrer(cle, arguments[0], f"{valeur} {arguments[2]} -> {arguments[3]}", resultat)
+                afficher_resultat_unite(resultat)
+
+            calcul_unites.lancer(convertir_selon_type, arguments, succes, erreur_unite, etat_unites)
+
+        bouton_convertir_unite = tk.Button(onglet_unites, text="Convertir", command=convertir_unite)
+        bouton_convertir_unite.pack(pady=5)
+
+        label_etat_unites = tk.Label(onglet_unites, text="")
+        label_etat_unites.pack()
+
+        bouton_annuler_unites = tk.Button(onglet_unites, text="Annuler", state=tk.DISABLED,
+                                          command=calcul_unites.annuler)
+        bouton_annuler_unites.pack(pady=5)
 
     # 💱 Onglet Devises
-    champ_montant = tk.Entry(onglet_devises)
-    champ_montant.pack(pady=5)
-    champ_montant.insert(0, "100")
-
-    champ_devise_de = tk.Entry(onglet_devises)
-    champ_devise_de.pack(pady=5)
-    champ_devise_de.insert(0, "EUR")
-
-    champ_devise_vers = tk.Entry(onglet_devises)
-    champ_devise_vers.pack(pady=5)
-    champ_devise_vers.insert(0, "USD")
-
-    label_resultat_devise = tk.Label(onglet_devises, text="Résultat :")
-    label_resultat_devise.pack()
-
-    def convertir_devise_action() -> None:
-        try:
-            montant = float(champ_montant.get())
-            de = champ_devise_de.get().upper()
-            vers = champ_devise_vers.get().upper()
-            resultat = convertir_devise(montant, de, vers)
-            if resultat is not None:
-                label_resultat_devise.config(text=f"{montant} {de} = {resultat:.2f} {vers}")
-            else:
-                raise ValueError("Conversion échouée")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Conversion impossible : {e}")
-
-    bouton_convertir_devise = tk.Button(onglet_devises, text="Convertir", command=convertir_devise_action)
-    bouton_convertir_devise.pack(pady=5)
-
-    fenetre.mainloop()
\ No newline at end of file
+    def construire_devises() -> None:
+        with mesurer("import converters.currency"):
+            from converters.currency import convertir_devise
+
+        champ_montant = tk.Entry(onglet_devises)
+        champ_montant.pack(pady=5)
+        champ_montant.insert(0, "100")
+
+        champ_devise_de = tk.Entry(onglet_devises)
+        champ_devise_de.pack(pady=5)
+        champ_devise_de.insert(0, "EUR")
+
+        champ_devise_vers = tk.Entry(onglet_devises)
+        champ_devise_vers.pack(pady=5)
+        champ_devise_vers.insert(0, "USD")
+
+        label_resultat_devise = tk.Label(onglet_devises, text="Résultat :")
+        label_resultat_devise.pack()
+
+        def convertir_devise_action() -> None:
+            try:
+                montant = float(champ_montant.get())
+                de = champ_devise_de.get().upper()
+                vers = champ_devise_vers.get().upper()
+                resultat = convertir_devise(montant, de, vers)
+                if resultat is not None:
+                    label_resultat_devise.config(text=f"{montant} {de} = {resultat:.2f} {vers}")
+                else:
+                    raise ValueError("Conversion échouée")
+            except Exception as e:
+                afficher_erreur(f"Conversion impossible : {e}")
+
+        bouton_convertir_devise = tk.Button(onglet_devises, text="Convertir", command=convertir_devise_action)
+        bouton_convertir_devise.pack(pady=5)
+
+    # 🕘 Onglet Historique (chargé page par page, à chaque affichage)
+    def construire_historique() -> Callable[[], None]:
+        liste_historique = tk.Listbox(onglet_historique, font=("Courier", 10))
+        liste_historique.pack(expand=1, fill="both", padx=5, pady=5)
+        page_historique = 0
+
+        def charger_page_historique() -> None:
+            nonlocal page_historique
+            for genre, entree, resultat in obtenir_historique().page(page_historique):
+                liste_historique.insert(tk.END, f"[{genre}] {entree} = {resultat}")
+            page_historique += 1
+
+        def rafraichir_historique() -> None:
+            nonlocal page_historique
+            liste_historique.delete(0, tk.END)
+            page_historique = 0
+            charger_page_historique()
+
+        bouton_plus_historique = tk.Button(onglet_historique, text="Plus", command=charger_page_historique)
+        bouton_plus_historique.pack(pady=5)
+        return rafraichir_historique
+
+    # Chaque onglet est construit à sa première sélection ; un constructeur peut renvoyer
+    # une action à répéter à chaque affichage de l'onglet
+    constructeurs: dict[str, Callable[[], Optional[Callable[[], None]]]] = {
+        str(onglet_calc): construire_calc,
+        str(onglet_unites): construire_unites,
+        str(onglet_devises): construire_devises,
+        str(onglet_historique): construire_historique,
+    }
+    a_l_affichage: dict[str, Optional[Callable[[], None]]] = {}
+
+    def onglet_selectionne(_evenement=None) -> None:
+        onglet = onglets.select()
+        if onglet not in a_l_affichage:
+            with mesurer(f"onglet « {onglets.tab(onglet, 'text')} »"):
+                a_l_affichage[onglet] = constructeurs[onglet]()
+        action = a_l_affichage[onglet]
+        if action is not None:
+            action()
+
+    onglet_selectionne()
+    onglets.bind("<<NotebookTabChanged>>", onglet_selectionne)
+
+    def fermer() -> None:
+        for fermeture in a_fermer:
+            fermeture()
+        fenetre.destroy()
+
+    fenetre.protocol("WM_DELETE_WINDOW", fermer)
+    if profil is not None:
+        def premiere_image() -> None:
+            fenetre.update_idletasks()
+            profil.rapport()
+        fenetre.after_idle(premiere_image)
+    fenetre.mainloop()
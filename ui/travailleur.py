@@ -0,0 +1,86 @@
+# ui/travailleur.py
+
+import multiprocessing
+from time import monotonic
+from typing import Any, Callable, Optional
+
+DELAI_CALCUL: float = 5.0   # secondes avant interruption automatique
+PERIODE_MS: int = 50        # fréquence de vérification depuis la boucle Tk
+
+
+class CalculAsynchrone:
+    """
+    Exécute un calcul dans un processus séparé et rapporte le résultat dans la boucle Tk
+    par interrogation périodique (after). Un processus, contrairement à un thread, peut être
+    interrompu même au milieu d'une opération C qui ne rend pas la main (grande puissance).
+    """
+
+    def __init__(self, widget: Any, delai: float = DELAI_CALCUL, periode_ms: int = PERIODE_MS) -> None:
+        self.widget = widget
+        self.delai = delai
+        self.periode_ms = periode_ms
+        # 'spawn' : le processus fils ne reçoit pas une copie de l'état Tk du parent
+        self._contexte = multiprocessing.get_context('spawn')
+        self._pool: Optional[Any] = None
+        self._tache: Optional[Any] = None
+        self._rappels: Optional[tuple[Callable[[Any], None], Callable[[Exception], None], Callable[[bool], None]]] = None
+        self._debut = 0.0
+        self._attente: Optional[str] = None
+
+    @property
+    def en_cours(self) -> bool:
+        return self._tache is not None
+
+    def lancer(self, fonction: Callable[..., Any], arguments: tuple, succes: Callable[[Any], None],
+               echec: Callable[[Exception], None], etat: Callable[[bool], None] = lambda actif: None) -> None:
+        """Lance fonction(*arguments) ; un calcul précédent encore actif est annulé."""
+        if self.en_cours:
+            self.annuler()
+        if self._pool is None:
+            self._pool = self._contexte.Pool(1)
+        self._tache = self._pool.apply_async(fonction, arguments)
+        self._rappels = (succes, echec, etat)
+        self._debut = monotonic()
+        etat(True)
+        self._attente = self.widget.after(self.periode_ms, self._verifier)
+
+    def _terminer(self) -> Callable[[bool], None]:
+        _, _, etat = self._rappels
+        self._tache = self._rappels = self._attente = None
+        return etat
+
+    def _verifier(self) -> None:
+        if self._tache is None:
+            return
+        succes, echec, _ = self._rappels
+
+        if self._tache.ready():
+            tache = self._tache
+            self._terminer()(False)
+            try:
+                resultat = tache.get(0)
+            except Exception as e:
+                echec(e)
+            else:
+                succes(resultat)
+        elif monotonic() - self._debut > self.delai:
+            self.annuler()
+            echec(TimeoutError(f"Calcul interrompu après {self.delai:g} s"))
+        else:
+            self._attente = self.widget.after(self.periode_ms, self._verifier)
+
+    def annuler(self) -> None:
+        """Interrompt le calcul en cours ; le processus est remplacé au prochain lancement."""
+        if self._tache is None:
+            return
+        if self._attente is not None:
+            self.widget.after_cancel(self._attente)
+        self._terminer()(False)
+        self._pool.terminate()
+        self._pool = None
+
+    def fermer(self) -> None:
+        self.annuler()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None